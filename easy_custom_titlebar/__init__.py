@@ -1 +1,10 @@
-from .custom_titlebar import CustomTitleBarWindow, resource_path 
\ No newline at end of file
+from .custom_titlebar import CustomTitleBarWindow, TitlebarRenderer, TitlebarTheme, resource_path 
+from .assets import AssetCache, get_asset_cache
+from .atlas import IconAtlas, get_icon_atlas
+from .fonts import FontRegistry, get_font_registry
+from .backends import WindowBackend, Win32Backend, SDL2Backend, FakeWindowBackend, default_backend
+from .viewport import ScrollViewport
+from .compositor import Compositor
+from .commands import WindowCommandQueue
+from .offscreen import render_titlebar, get_titlebar_renderer
+from .eventtrace import EventRecorder, load_trace, replay_trace
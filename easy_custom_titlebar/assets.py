@@ -0,0 +1,256 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+
+# Default memory budget for decoded and scaled assets (bytes)
+DEFAULT_ASSET_BUDGET = 16 * 1024 * 1024
+
+AssetKey = Tuple[str, Optional[Tuple[int, int]]]
+
+
+class AssetCache:
+	"""
+	Cache of decoded (and optionally scaled) image assets.
+	
+	Each file is decoded once and kept until the byte budget forces it out,
+	least recently used first. Files that are missing or fail to decode are
+	recorded once instead of being re-checked on every lookup. With hot reload
+	enabled, modification times are re-checked at most once per
+	``reload_interval`` seconds and changed files are decoded again.
+	"""
+	
+	def __init__(
+		self,
+		max_bytes: int = DEFAULT_ASSET_BUDGET,
+		hot_reload: bool = False,
+		reload_interval: float = 1.0
+	):
+		"""
+		Initialize the asset cache.
+		
+		Args:
+			max_bytes: Memory budget for cached surfaces in bytes
+			hot_reload: Re-decode files whose modification time changed
+			reload_interval: Minimum seconds between mtime checks of a file
+		"""
+		self.max_bytes = max(0, int(max_bytes))
+		self.hot_reload = bool(hot_reload)
+		self.reload_interval = max(0.0, float(reload_interval))
+		self.current_bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.loads = 0
+		self.evictions = 0
+		self._entries: "OrderedDict[AssetKey, pygame.Surface]" = OrderedDict()
+		self._mtimes: Dict[str, Optional[float]] = {}
+		self._missing: Dict[str, str] = {}
+		self._last_check: Dict[str, float] = {}
+		self._prefetched: Dict[str, Tuple[Optional[pygame.Surface], Optional[float], str]] = {}
+		# Queued prefetches: path -> ticket of its latest request. invalidate()
+		# drops the entry, so a decode already in flight is discarded
+		self._pending: Dict[str, object] = {}
+		self._lock = threading.Lock()
+		self._queue: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+		self._worker: Optional[threading.Thread] = None
+	
+	def get(self, path: str, size: Optional[Tuple[int, int]] = None) -> Optional[pygame.Surface]:
+		"""
+		Get a decoded asset, scaled to ``size`` if given.
+		
+		Args:
+			path: Path of the image file
+			size: Optional (width, height) to smoothscale the image to
+		
+		Returns:
+			The cached surface, or None if the file is missing or unreadable
+		"""
+		if self.hot_reload:
+			self._check_reload(path)
+		if path in self._missing:
+			self.hits += 1
+			return None
+		
+		key = (path, tuple(size) if size is not None else None)
+		surf = self._entries.get(key)
+		if surf is not None:
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return surf
+		
+		self.misses += 1
+		source_key = (path, None)
+		source = self._entries.get(source_key)
+		if source is None:
+			source = self._decode(path)
+			if source is None:
+				return None
+			self._store(source_key, source)
+		else:
+			self._entries.move_to_end(source_key)
+		if key[1] is None:
+			return source
+		
+		surf = pygame.transform.smoothscale(source, key[1])
+		self._store(key, surf)
+		return surf
+	
+	def prefetch(self, paths: Iterable[str]) -> None:
+		"""
+		Decode assets on a background thread ahead of their first use.
+		
+		Args:
+			paths: Paths of the image files to decode
+		"""
+		for path in paths:
+			if not path or path in self._missing or (path, None) in self._entries:
+				continue
+			with self._lock:
+				if path in self._pending or path in self._prefetched:
+					continue
+				ticket = self._pending[path] = object()
+			self._queue.put((path, ticket))
+			self._ensure_worker()
+	
+	def invalidate(self, path: Optional[str] = None) -> None:
+		"""
+		Drop cached surfaces so they are decoded again on next use.
+		
+		Args:
+			path: File to drop, or None to clear the whole cache
+		"""
+		if path is None:
+			self._entries.clear()
+			self._mtimes.clear()
+			self._missing.clear()
+			self.current_bytes = 0
+			with self._lock:
+				self._prefetched.clear()
+				self._pending.clear()
+			return
+		for key in [k for k in self._entries if k[0] == path]:
+			self.current_bytes -= self._surface_bytes(self._entries.pop(key))
+		self._mtimes.pop(path, None)
+		self._missing.pop(path, None)
+		with self._lock:
+			self._prefetched.pop(path, None)
+			self._pending.pop(path, None)
+	
+	def stats(self) -> Dict[str, int]:
+		"""Get cache counters and memory usage."""
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'loads': self.loads,
+			'evictions': self.evictions,
+			'entries': len(self._entries),
+			'missing': len(self._missing),
+			'bytes': self.current_bytes,
+			'max_bytes': self.max_bytes,
+		}
+	
+	def _decode(self, path: str) -> Optional[pygame.Surface]:
+		"""Decode a file, using the prefetched result when available."""
+		with self._lock:
+			prefetched = self._prefetched.pop(path, None)
+			self._pending.pop(path, None)
+		if prefetched is not None:
+			surf, mtime, error = prefetched
+		else:
+			surf, mtime, error = self._load_file(path)
+		
+		if surf is None:
+			self._missing[path] = error
+			print(f"[easy_custom_titlebar] Warning: {error}")
+			return None
+		self.loads += 1
+		self._mtimes[path] = mtime
+		if pygame.display.get_surface() is not None:
+			try:
+				surf = surf.convert_alpha()
+			except pygame.error:
+				pass
+		return surf
+	
+	@staticmethod
+	def _load_file(path: str) -> Tuple[Optional[pygame.Surface], Optional[float], str]:
+		"""Load an image file without touching the cache (thread-safe)."""
+		try:
+			mtime = os.path.getmtime(path)
+		except OSError:
+			return None, None, f"Icon file not found: {path}"
+		try:
+			return pygame.image.load(path), mtime, ""
+		except (pygame.error, OSError) as e:
+			return None, mtime, f"Failed to load icon {path}: {e}"
+	
+	def _store(self, key: AssetKey, surf: pygame.Surface) -> None:
+		"""Insert a surface, evicting least recently used entries over budget."""
+		size = self._surface_bytes(surf)
+		while self._entries and self.current_bytes + size > self.max_bytes:
+			_, evicted = self._entries.popitem(last=False)
+			self.current_bytes -= self._surface_bytes(evicted)
+			self.evictions += 1
+		self._entries[key] = surf
+		self.current_bytes += size
+	
+	@staticmethod
+	def _surface_bytes(surf: pygame.Surface) -> int:
+		"""Approximate memory used by a surface's pixels."""
+		return surf.get_width() * surf.get_height() * surf.get_bytesize()
+	
+	def _check_reload(self, path: str) -> None:
+		"""Invalidate a file whose modification time changed (rate-limited)."""
+		now = time.monotonic()
+		if now - self._last_check.get(path, 0.0) < self.reload_interval:
+			return
+		self._last_check[path] = now
+		try:
+			mtime: Optional[float] = os.path.getmtime(path)
+		except OSError:
+			mtime = None
+		if path in self._missing:
+			if mtime is not None:
+				self.invalidate(path)
+		elif path in self._mtimes and mtime != self._mtimes[path]:
+			self.invalidate(path)
+	
+	def _ensure_worker(self) -> None:
+		"""Start the prefetch thread if it is not running."""
+		if self._worker is not None and self._worker.is_alive():
+			return
+		self._worker = threading.Thread(
+			target=self._prefetch_loop, name="easy_custom_titlebar-prefetch", daemon=True
+		)
+		self._worker.start()
+	
+	def _prefetch_loop(self) -> None:
+		"""Worker thread: decode queued files into the prefetch table."""
+		while True:
+			path, ticket = self._queue.get()
+			result = self._load_file(path)
+			with self._lock:
+				# Stale if invalidated (or taken by get()) while decoding
+				if self._pending.get(path) is ticket:
+					del self._pending[path]
+					self._prefetched[path] = result
+
+
+_shared_cache: Optional[AssetCache] = None
+
+
+def get_asset_cache() -> AssetCache:
+	"""
+	Get the process-wide asset cache shared by all windows.
+	
+	Returns:
+		The shared AssetCache instance
+	"""
+	global _shared_cache
+	if _shared_cache is None:
+		_shared_cache = AssetCache()
+	return _shared_cache
@@ -0,0 +1,138 @@
+import io
+import pkgutil
+import threading
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+try:
+	from importlib.resources import files as _resource_files
+except ImportError:
+	# Python 3.7/3.8
+	_resource_files = None
+
+# Packed image holding every stock button icon, in both color variants
+ATLAS_FILE = "icons_atlas.png"
+
+# Sub-rect (x, y, w, h) of each icon in the atlas, keyed by asset name
+ATLAS_RECTS: Dict[str, Tuple[int, int, int, int]] = {
+	'minimize_white': (0, 0, 24, 24),
+	'maximize_white': (24, 0, 26, 26),
+	'restore_white': (50, 0, 24, 24),
+	'close_white': (74, 0, 24, 24),
+	'minimize_black': (0, 26, 24, 24),
+	'maximize_black': (24, 26, 26, 26),
+	'restore_black': (50, 26, 24, 24),
+	'close_black': (74, 26, 24, 24),
+}
+
+
+def read_asset_bytes(filename: str) -> bytes:
+	"""
+	Read a bundled asset without going through a filesystem path.
+	
+	Works for regular, zipped and frozen installs.
+	
+	Args:
+		filename: Name of the file in the assets folder
+	
+	Returns:
+		The file contents
+	"""
+	if _resource_files is not None:
+		return (_resource_files("easy_custom_titlebar") / "assets" / filename).read_bytes()
+	data = pkgutil.get_data("easy_custom_titlebar", "assets/" + filename)
+	if data is None:
+		raise FileNotFoundError(f"Asset not found: {filename}")
+	return data
+
+
+class IconAtlas:
+	"""
+	The stock button icons, decoded from a single packed image.
+	
+	The atlas is read and decoded once, on first use; each icon is a
+	subsurface of it.
+	"""
+	
+	def __init__(self, filename: str = ATLAS_FILE, rects: Optional[Dict[str, Tuple[int, int, int, int]]] = None):
+		"""
+		Initialize the atlas.
+		
+		Args:
+			filename: Atlas image in the assets folder
+			rects: Sub-rect of each icon (defaults to ATLAS_RECTS)
+		"""
+		self.filename = filename
+		self.rects = dict(ATLAS_RECTS if rects is None else rects)
+		self.decode_count = 0
+		self._surface: Optional[pygame.Surface] = None
+		self._icons: Dict[str, pygame.Surface] = {}
+		self._failed = False
+		self._lock = threading.Lock()
+	
+	def _load(self) -> Optional[pygame.Surface]:
+		"""Read and decode the atlas image (once)."""
+		if self._surface is None and not self._failed:
+			try:
+				data = read_asset_bytes(self.filename)
+				surface = pygame.image.load(io.BytesIO(data), self.filename)
+				if pygame.display.get_surface() is not None:
+					surface = surface.convert_alpha()
+				self._surface = surface
+				self.decode_count += 1
+			except (pygame.error, OSError) as e:
+				print(f"[easy_custom_titlebar] Warning: Failed to load icon atlas: {e}")
+				self._failed = True
+		return self._surface
+	
+	def get(self, name: str) -> Optional[pygame.Surface]:
+		"""
+		Get a stock icon.
+		
+		Args:
+			name: Asset name without extension (e.g. 'close_white')
+		
+		Returns:
+			The icon (shared; do not draw onto it), or None if unavailable
+		"""
+		icon = self._icons.get(name)
+		if icon is not None:
+			return icon
+		rect = self.rects.get(name)
+		if rect is None:
+			return None
+		with self._lock:
+			surface = self._load()
+			if surface is None:
+				return None
+			try:
+				icon = surface.subsurface(rect)
+			except ValueError as e:
+				print(f"[easy_custom_titlebar] Warning: Bad atlas rect for {name}: {e}")
+				return None
+			self._icons[name] = icon
+		return icon
+	
+	def clear(self) -> None:
+		"""Drop the decoded atlas; it is decoded again on next use."""
+		with self._lock:
+			self._surface = None
+			self._icons.clear()
+			self._failed = False
+
+
+_shared_atlas: Optional[IconAtlas] = None
+
+
+def get_icon_atlas() -> IconAtlas:
+	"""
+	Get the process-wide stock icon atlas.
+	
+	Returns:
+		The shared IconAtlas instance
+	"""
+	global _shared_atlas
+	if _shared_atlas is None:
+		_shared_atlas = IconAtlas()
+	return _shared_atlas
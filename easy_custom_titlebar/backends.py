@@ -0,0 +1,319 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Optional, Tuple
+
+import pygame
+
+# pywin32 is imported by the first Win32Backend, so importing the package
+# (or running on another platform) does not pay for it
+win32gui = None
+win32con = None
+win32api = None
+
+
+def _import_win32() -> bool:
+	"""Import the pywin32 modules on first use. Returns False if unavailable."""
+	global win32gui, win32con, win32api
+	if win32gui is None:
+		try:
+			import win32gui as _win32gui
+			import win32con as _win32con
+			import win32api as _win32api
+		except ImportError:
+			return False
+		win32gui, win32con, win32api = _win32gui, _win32con, _win32api
+	return True
+
+# pygame's SDL2 window API is imported by the first SDL2Backend
+Window = None
+
+# Window of pygame.display. SDL keeps a pointer to it in the window's data,
+# which window events resolve, so it must outlive every backend using it
+# until the next lookup replaces it.
+_display_window = None
+
+
+def _import_sdl2() -> bool:
+	"""Import pygame._sdl2.video on first use. Returns False if unavailable."""
+	global Window
+	if Window is None:
+		try:
+			from pygame._sdl2.video import Window as _Window
+		except ImportError:
+			return False
+		Window = _Window
+	return True
+
+
+def _get_display_window(refresh: bool = False):
+	"""Get the Window of pygame.display (``refresh`` after the display was created)."""
+	global _display_window
+	if _display_window is None or refresh:
+		_display_window = Window.from_display_module()
+	return _display_window
+
+WindowRect = Tuple[int, int, int, int]
+
+
+class WindowBackend(ABC):
+	"""
+	Native window-manager operations used by CustomTitleBarWindow.
+	
+	Window rects are (left, top, right, bottom) in screen coordinates. Methods
+	may raise; the window reports failures as warnings. Subclasses implement
+	every abstract method (an incomplete backend cannot be instantiated).
+	"""
+	
+	name = "base"
+	
+	# Whether set_window_rect() resizes the window surface in place, so the
+	# window picks up pygame.display.get_surface() instead of calling set_mode
+	resizes_in_place = False
+	
+	def find_window_handle(self, title: str) -> Optional[int]:
+		"""Find the native handle when pygame does not report one."""
+		return None
+	
+	def apply_styles(self, hwnd: int) -> None:
+		"""Make the window borderless while keeping native min/max behaviour."""
+	
+	@abstractmethod
+	def get_screen_size(self) -> Tuple[int, int]:
+		"""Get the (width, height) of the primary screen."""
+	
+	@abstractmethod
+	def get_window_rect(self, hwnd: int) -> Optional[WindowRect]:
+		"""Get the window rect."""
+	
+	@abstractmethod
+	def move_window(self, hwnd: int, x: int, y: int) -> None:
+		"""Move the window without resizing it."""
+	
+	@abstractmethod
+	def set_window_rect(self, hwnd: int, x: int, y: int, w: int, h: int, bring_to_top: bool = False) -> None:
+		"""Move and resize the window."""
+	
+	@abstractmethod
+	def minimize(self, hwnd: int) -> None:
+		"""Minimize the window."""
+	
+	def destroy(self, hwnd: int) -> None:
+		"""Destroy the native window."""
+
+
+class Win32Backend(WindowBackend):
+	"""Window backend built on pywin32 (Windows only)."""
+	
+	name = "win32"
+	
+	def __init__(self):
+		if not _import_win32():
+			raise RuntimeError("The win32 backend requires Windows and the pywin32 package")
+	
+	def find_window_handle(self, title: str) -> Optional[int]:
+		# Fallback to foreground window
+		try:
+			return win32gui.GetForegroundWindow()
+		except Exception:
+			pass
+		
+		# Last resort: find window by title
+		try:
+			def enum_handler(hwnd, ctx):
+				if win32gui.IsWindowVisible(hwnd):
+					window_text = win32gui.GetWindowText(hwnd)
+					if title and title in window_text:
+						ctx.append(hwnd)
+			
+			handles = []
+			win32gui.EnumWindows(enum_handler, handles)
+			if handles:
+				return handles[0]
+		except Exception:
+			pass
+		
+		return None
+	
+	def apply_styles(self, hwnd: int) -> None:
+		try:
+			style = win32gui.GetWindowLong(hwnd, win32con.GWL_STYLE)
+			style = style & ~win32con.WS_CAPTION & ~win32con.WS_THICKFRAME
+			style = style | win32con.WS_MAXIMIZEBOX | win32con.WS_MINIMIZEBOX | win32con.WS_SYSMENU
+			win32gui.SetWindowLong(hwnd, win32con.GWL_STYLE, style)
+			
+			ex_style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+			ex_style = ex_style | win32con.WS_EX_LAYERED
+			win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, ex_style)
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to set window styles: {e}")
+		
+		# Set rounded corners (Windows 11+)
+		try:
+			from ctypes import windll, wintypes, byref, sizeof
+			DWMWA_WINDOW_CORNER_PREFERENCE = 33
+			DWMWCP_ROUND = 2
+			windll.dwmapi.DwmSetWindowAttribute(
+				wintypes.HWND(hwnd),
+				DWMWA_WINDOW_CORNER_PREFERENCE,
+				byref(wintypes.INT(DWMWCP_ROUND)),
+				sizeof(wintypes.INT)
+			)
+		except (AttributeError, OSError, Exception):
+			# Rounded corners only work on Windows 11+, ignore errors
+			pass
+	
+	def get_screen_size(self) -> Tuple[int, int]:
+		return (
+			win32api.GetSystemMetrics(win32con.SM_CXSCREEN),
+			win32api.GetSystemMetrics(win32con.SM_CYSCREEN),
+		)
+	
+	def get_window_rect(self, hwnd: int) -> Optional[WindowRect]:
+		return win32gui.GetWindowRect(hwnd)
+	
+	def move_window(self, hwnd: int, x: int, y: int) -> None:
+		win32gui.SetWindowPos(hwnd, 0, x, y, 0, 0, win32con.SWP_NOSIZE)
+	
+	def set_window_rect(self, hwnd: int, x: int, y: int, w: int, h: int, bring_to_top: bool = False) -> None:
+		if bring_to_top:
+			win32gui.SetWindowPos(hwnd, win32con.HWND_TOP, x, y, w, h, win32con.SWP_SHOWWINDOW)
+		else:
+			win32gui.SetWindowPos(hwnd, 0, x, y, w, h, 0)
+	
+	def minimize(self, hwnd: int) -> None:
+		win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
+	
+	def destroy(self, hwnd: int) -> None:
+		win32gui.DestroyWindow(hwnd)
+
+
+class SDL2Backend(WindowBackend):
+	"""
+	Window backend built on pygame's SDL2 window API (any platform).
+	
+	Geometry changes go through ``pygame._sdl2.video.Window``, which resizes
+	the window surface in place: the window reuses it rather than recreating
+	the display with ``set_mode``. Window handles are ignored; the backend
+	always acts on the window of ``pygame.display``.
+	"""
+	
+	name = "sdl2"
+	resizes_in_place = True
+	
+	def __init__(self):
+		if not _import_sdl2():
+			raise RuntimeError("The sdl2 backend requires pygame 2 with SDL2 window support")
+	
+	@property
+	def window(self):
+		"""The pygame._sdl2.video.Window of the display."""
+		return _get_display_window()
+	
+	def find_window_handle(self, title: str) -> Optional[int]:
+		return _get_display_window(refresh=True).id
+	
+	def apply_styles(self, hwnd: int) -> None:
+		window = _get_display_window(refresh=True)
+		window.borderless = True
+		# Lets the window manager resize (snap, tiling); handled via WINDOWSIZECHANGED
+		window.resizable = True
+	
+	def get_screen_size(self) -> Tuple[int, int]:
+		return tuple(pygame.display.get_desktop_sizes()[0])
+	
+	def get_window_rect(self, hwnd: int) -> Optional[WindowRect]:
+		x, y = self.window.position
+		w, h = self.window.size
+		return (x, y, x + w, y + h)
+	
+	def move_window(self, hwnd: int, x: int, y: int) -> None:
+		self.window.position = (x, y)
+	
+	def set_window_rect(self, hwnd: int, x: int, y: int, w: int, h: int, bring_to_top: bool = False) -> None:
+		window = self.window
+		if bring_to_top:
+			window.restore()
+		window.position = (x, y)
+		if tuple(window.size) != (w, h):
+			window.size = (w, h)
+		if bring_to_top:
+			window.show()
+			window.focus()
+	
+	def minimize(self, hwnd: int) -> None:
+		self.window.minimize()
+	
+	def destroy(self, hwnd: int) -> None:
+		# pygame.quit() destroys the SDL window; hide it until then
+		self.window.hide()
+
+
+class FakeWindowBackend(WindowBackend):
+	"""
+	In-memory window manager for headless runs and benchmarks.
+	
+	Geometry changes are recorded instead of applied to a real window, and
+	every call is counted in ``calls``. Pair it with ``SDL_VIDEODRIVER=dummy``.
+	"""
+	
+	name = "fake"
+	
+	def __init__(self, screen_size: Tuple[int, int] = (1920, 1080)):
+		"""
+		Initialize the fake backend.
+		
+		Args:
+			screen_size: Reported (width, height) of the primary screen
+		"""
+		self.screen_size = (int(screen_size[0]), int(screen_size[1]))
+		self.rect: WindowRect = (0, 0, 0, 0)
+		self.minimized = False
+		self.destroyed = False
+		self.calls: Counter = Counter()
+	
+	def find_window_handle(self, title: str) -> Optional[int]:
+		self.calls['find_window_handle'] += 1
+		return 1
+	
+	def apply_styles(self, hwnd: int) -> None:
+		self.calls['apply_styles'] += 1
+	
+	def get_screen_size(self) -> Tuple[int, int]:
+		self.calls['get_screen_size'] += 1
+		return self.screen_size
+	
+	def get_window_rect(self, hwnd: int) -> Optional[WindowRect]:
+		self.calls['get_window_rect'] += 1
+		return self.rect
+	
+	def move_window(self, hwnd: int, x: int, y: int) -> None:
+		self.calls['move_window'] += 1
+		left, top, right, bottom = self.rect
+		self.rect = (x, y, x + right - left, y + bottom - top)
+	
+	def set_window_rect(self, hwnd: int, x: int, y: int, w: int, h: int, bring_to_top: bool = False) -> None:
+		self.calls['set_window_rect'] += 1
+		self.rect = (x, y, x + w, y + h)
+		if bring_to_top:
+			self.minimized = False
+	
+	def minimize(self, hwnd: int) -> None:
+		self.calls['minimize'] += 1
+		self.minimized = True
+	
+	def destroy(self, hwnd: int) -> None:
+		self.calls['destroy'] += 1
+		self.destroyed = True
+
+
+def default_backend() -> WindowBackend:
+	"""
+	Create the backend used when none is passed to CustomTitleBarWindow.
+	
+	Returns:
+		A Win32Backend instance, or an SDL2Backend where pywin32 is
+		unavailable (other platforms)
+	"""
+	if _import_win32():
+		return Win32Backend()
+	return SDL2Backend()
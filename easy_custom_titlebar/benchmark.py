@@ -0,0 +1,590 @@
+"""
+Headless performance benchmarks for easy_custom_titlebar.
+
+Runs under the SDL dummy video driver with FakeWindowBackend standing in for
+the native window manager, so it works on any platform.
+
+Usage:
+	python -m easy_custom_titlebar.benchmark --output baseline.json
+	python -m easy_custom_titlebar.benchmark --compare baseline.json
+	python -m easy_custom_titlebar.benchmark --trace field.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from .backends import FakeWindowBackend, SDL2Backend
+from .custom_titlebar import CustomTitleBarWindow, TitlebarTheme
+from .eventtrace import load_trace, replay_trace
+from .offscreen import render_titlebar
+from .viewport import ScrollViewport
+
+# Default allowed slowdown before a case is flagged as a regression
+DEFAULT_THRESHOLD = 0.15
+
+# Steady-state titlebar frames must not retain blocks; anything at or above
+# this average per frame is flagged (single long-lived objects replaced
+# once during tracking stay well below it)
+MAX_TITLEBAR_BLOCKS = 0.5
+
+# Cold start: import the package, create a window and present the first frame.
+# Runs in a fresh interpreter; prints the elapsed time in microseconds.
+_STARTUP_SCRIPT = """
+import time
+start = time.perf_counter_ns()
+import pygame
+import easy_custom_titlebar
+window = easy_custom_titlebar.CustomTitleBarWindow(
+	title="Benchmark window", backend=easy_custom_titlebar.FakeWindowBackend(), fast_startup={fast}
+)
+window.draw_titlebar()
+pygame.display.flip()
+print((time.perf_counter_ns() - start) / 1000.0)
+"""
+
+
+def make_window(buttons: int = 0, **kwargs) -> CustomTitleBarWindow:
+	"""
+	Create a window on the fake backend.
+	
+	Args:
+		buttons: Number of label-only custom buttons to add
+		**kwargs: Extra CustomTitleBarWindow arguments
+	
+	Returns:
+		The window
+	"""
+	custom_buttons = [{'label': str(i % 10), 'callback': lambda: None} for i in range(buttons)]
+	options = dict(width=1200, height=700, title="Benchmark window")
+	options.update(kwargs)
+	if options.get('backend') is None:
+		options['backend'] = FakeWindowBackend()
+	return CustomTitleBarWindow(custom_buttons=custom_buttons, **options)
+
+
+def _measure(func: Callable[[], int], repeat: int) -> Dict[str, float]:
+	"""
+	Time ``func`` ``repeat`` times.
+	
+	``func`` performs a batch of operations and returns how many it ran.
+	
+	Returns:
+		Per-operation timings in microseconds (median, min, mean) and op count
+	"""
+	samples = []
+	ops = 0
+	for _ in range(repeat):
+		start = time.perf_counter_ns()
+		ops = func()
+		elapsed = time.perf_counter_ns() - start
+		samples.append(elapsed / 1000.0 / max(1, ops))
+	samples.sort()
+	return {
+		'median_us': samples[len(samples) // 2],
+		'min_us': samples[0],
+		'mean_us': sum(samples) / len(samples),
+		'ops': ops,
+	}
+
+
+def bench_construct(repeat: int, fast: bool = False) -> Dict[str, float]:
+	"""CustomTitleBarWindow construction."""
+	def run() -> int:
+		for _ in range(5):
+			make_window(fast_startup=fast)
+		return 5
+	return _measure(run, repeat)
+
+
+def bench_startup(repeat: int, fast: bool = False) -> Dict[str, float]:
+	"""Import-to-first-frame time in a fresh interpreter."""
+	env = dict(os.environ)
+	package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+	env['PYGAME_HIDE_SUPPORT_PROMPT'] = "1"
+	script = _STARTUP_SCRIPT.format(fast=bool(fast))
+	samples = []
+	for _ in range(repeat):
+		output = subprocess.run(
+			[sys.executable, "-c", script], env=env, check=True,
+			stdout=subprocess.PIPE, universal_newlines=True
+		).stdout
+		samples.append(float(output.strip().splitlines()[-1]))
+	samples.sort()
+	return {
+		'median_us': samples[len(samples) // 2],
+		'min_us': samples[0],
+		'mean_us': sum(samples) / len(samples),
+		'ops': 1,
+	}
+
+
+def bench_draw_titlebar(buttons: int, repeat: int, frames: int = 200) -> Dict[str, float]:
+	"""draw_titlebar frame time with ``buttons`` custom buttons."""
+	window = make_window(buttons)
+	window.draw_titlebar()
+	
+	def run() -> int:
+		for _ in range(frames):
+			window.draw_titlebar()
+		return frames
+	return _measure(run, repeat)
+
+
+def bench_scale_change(repeat: int, changes: int = 40) -> Dict[str, float]:
+	"""set_scale() followed by the first titlebar frame at the new scale."""
+	window = make_window(5, retained_titlebar=True)
+	scales = (1.0, 1.25, 1.5, 2.0)
+	window.draw_titlebar()
+	
+	def run() -> int:
+		for i in range(changes):
+			window.set_scale(scales[(i + 1) % len(scales)])
+			window.draw_titlebar()
+		return changes
+	rescaled = window.icon_rescale_count
+	result = _measure(run, repeat)
+	result['icons_rescaled_per_change'] = (window.icon_rescale_count - rescaled) / (changes * repeat)
+	return result
+
+
+def bench_offscreen_render(repeat: int, renders: int = 500) -> Dict[str, float]:
+	"""render_titlebar() batch: two themes, 50 titles and every hover target, no window."""
+	surface = pygame.Surface((800, 40))
+	themes = (TitlebarTheme(), TitlebarTheme(titlebar_color="#0a1428", button_icon_color="#4fc3f7"))
+	buttons = [{'label': str(i)} for i in range(3)]
+	targets = (None, 'minimize', 'maximize', 'close', 0, 1, 2)
+	titles = [f"Document {i}" for i in range(50)]
+	
+	def run() -> int:
+		for i in range(renders):
+			render_titlebar(
+				surface, theme=themes[i % 2], title=titles[i % 50], buttons=buttons,
+				hover=targets[i % len(targets)], pressed=i % 5 == 0
+			)
+		return renders
+	return _measure(run, repeat)
+
+
+def bench_steady_frame(repeat: int, frames: int = 200, tracked: int = 200) -> Dict[str, float]:
+	"""
+	A full steady-state frame (titlebar, trivial content, present), plus its allocations.
+	
+	``titlebar_blocks_per_frame`` and ``content_blocks_per_frame`` are the
+	retained blocks per frame from track_allocations() over ``tracked``
+	frames; the titlebar figure must stay (close to) zero.
+	``transient_bytes_per_frame`` is the short-lived memory of a whole frame
+	(None before Python 3.9).
+	"""
+	window = make_window(5)
+	
+	def draw_content(screen, width, height, scroll_y):
+		screen.fill((40, 40, 60), (20, window.titlebar_height + 20, 200, 100))
+	
+	for _ in range(3):
+		window._render_frame(draw_content)
+	
+	def run() -> int:
+		for _ in range(frames):
+			window._render_frame(draw_content)
+		return frames
+	result = _measure(run, repeat)
+	
+	window.track_allocations(tracked)
+	for _ in range(tracked):
+		window._render_frame(draw_content)
+	stats = window.get_allocation_stats()
+	result['titlebar_blocks_per_frame'] = stats['titlebar']['blocks_per_frame']
+	result['content_blocks_per_frame'] = stats['content']['blocks_per_frame']
+	result['transient_bytes_per_frame'] = stats['transient_bytes_per_frame']
+	return result
+
+
+def bench_layered_frame(repeat: int, frames: int = 200) -> Dict[str, float]:
+	"""A layered frame of a static dashboard with one small region invalidated per frame."""
+	window = make_window(5, layered=True)
+	
+	def draw_content(surface, width, height, scroll_y):
+		for i in range(40):
+			pygame.draw.rect(surface, (40, 60 + i * 4, 90), (20 + (i % 8) * 140, 60 + (i // 8) * 120, 120, 100))
+	
+	window._render_frame(draw_content)
+	
+	def run() -> int:
+		for i in range(frames):
+			window.invalidate('content', pygame.Rect(20 + (i % 8) * 140, 60, 120, 100))
+			window._render_frame(draw_content)
+		return frames
+	return _measure(run, repeat)
+
+
+def bench_viewport_scroll(repeat: int, frames: int = 200, rows: int = 100000) -> Dict[str, float]:
+	"""Drawing a scrolled viewport over a 100k-row list, one frame per scroll step."""
+	window = make_window()
+	row_height = 20
+	
+	def draw_tile(surface, top):
+		for row in range(top // row_height, (top + surface.get_height() - 1) // row_height + 1):
+			pygame.draw.rect(surface, (40 + row % 2 * 20, 40, 60), (0, row * row_height - top, surface.get_width(), row_height - 1))
+	
+	viewport = ScrollViewport(rows * row_height, draw_tile)
+	area = pygame.Rect(0, window.titlebar_height, window.width, window.height - window.titlebar_height)
+	
+	def run() -> int:
+		for _ in range(frames):
+			viewport.scroll_by(7)
+			viewport.draw(window.screen, area)
+		return frames
+	return _measure(run, repeat)
+
+
+def _event_stream(kind: str, window: CustomTitleBarWindow, count: int) -> List[pygame.event.Event]:
+	"""Build a synthetic event stream of the given kind."""
+	w, h = window.width, window.height
+	events = []
+	if kind == 'motion':
+		for i in range(count):
+			events.append(pygame.event.Event(
+				pygame.MOUSEMOTION, pos=(50 + i % (w - 100), 100 + i % (h - 200)), rel=(1, 1), buttons=(0, 0, 0)
+			))
+	elif kind == 'click':
+		for i in range(count // 2):
+			pos = (100 + i % 200, window.titlebar_height // 2)
+			events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+			events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=1))
+	elif kind == 'drag':
+		grab = (w // 2, window.titlebar_height // 2)
+		events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=grab, button=1))
+		for i in range(count - 2):
+			events.append(pygame.event.Event(
+				pygame.MOUSEMOTION, pos=(grab[0] + i % 40, grab[1]), rel=(1, 0), buttons=(1, 0, 0)
+			))
+		events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=grab, button=1))
+	elif kind == 'resize':
+		start = (w - 2, h // 2)
+		events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=start, button=1))
+		for i in range(count - 3):
+			events.append(pygame.event.Event(
+				pygame.MOUSEMOTION, pos=(start[0] + i % 50, start[1]), rel=(1, 0), buttons=(1, 0, 0)
+			))
+		# End at the starting width, so every timed round starts on the edge again
+		events.append(pygame.event.Event(pygame.MOUSEMOTION, pos=start, rel=(0, 0), buttons=(1, 0, 0)))
+		events.append(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=start, button=1))
+	return events
+
+
+def bench_handle_event(kind: str, repeat: int, count: int = 500) -> Dict[str, float]:
+	"""handle_event throughput for a motion, click or resize stream."""
+	window = make_window()
+	window.draw_titlebar()
+	events = _event_stream(kind, window, count)
+	
+	def run() -> int:
+		for event in events:
+			window.handle_event(event)
+		return len(events)
+	return _measure(run, repeat)
+
+
+def _trace_window(header: Dict) -> CustomTitleBarWindow:
+	"""Create a window matching the geometry recorded in a trace header."""
+	return make_window(
+		int(header.get('custom_buttons', 0)),
+		width=int(header.get('width', 1200)),
+		height=int(header.get('height', 700)),
+		titlebar_height=int(header.get('titlebar_height', 40)),
+		left_notch_width=int(header.get('left_notch_width', 0)),
+		scale=float(header.get('scale', 1.0)),
+	)
+
+
+def _record_drag_trace(path: str, count: int = 500) -> None:
+	"""Record a synthetic trace: titlebar drag, edge resize and clicks at 250 Hz."""
+	window = make_window(5)
+	window.draw_titlebar()
+	recorder = window.record_events(path)
+	events = _event_stream('drag', window, count // 2)
+	events.extend(_event_stream('resize', window, count // 2))
+	events.extend(_event_stream('click', window, 40))
+	start = time.perf_counter()
+	for i, event in enumerate(events):
+		recorder.record(event, start + i * 0.004)
+	window.stop_recording()
+
+
+def bench_trace(path: str, repeat: int) -> Dict[str, float]:
+	"""
+	Replay a recorded event trace as fast as possible.
+	
+	Every round replays into a fresh window built from the trace header, so
+	state such as a drag in progress starts out as recorded. Timings are the
+	mean handling time per event; ``events`` is the number handled.
+	"""
+	trace = load_trace(path)
+	samples = []
+	events = 0
+	for _ in range(repeat):
+		window = _trace_window(trace[0])
+		window.draw_titlebar()
+		report = replay_trace(window, trace)
+		events = report['events']
+		samples.append(report['total_us'] / max(1, events))
+	samples.sort()
+	return {
+		'median_us': samples[len(samples) // 2],
+		'min_us': samples[0],
+		'mean_us': sum(samples) / len(samples),
+		'ops': events,
+		'events': events,
+	}
+
+
+def bench_window_geometry(kind: str, backend: str, repeat: int, count: int = 500) -> Dict[str, float]:
+	"""
+	Titlebar drag or edge resize through handle_event() on the fake or SDL2 backend.
+	
+	With ``fake`` the geometry is only recorded, but every resize step
+	recreates the display with set_mode (the path of the win32 backend).
+	With ``sdl2`` the SDL window is moved and resized in place and its
+	surface reused. The window is small enough to grow inside the dummy
+	driver's desktop.
+	"""
+	window = make_window(
+		width=800, height=500,
+		backend=SDL2Backend() if backend == 'sdl2' else FakeWindowBackend()
+	)
+	window.draw_titlebar()
+	events = _event_stream(kind, window, count)
+	
+	def run() -> int:
+		for event in events:
+			window.handle_event(event)
+		return len(events)
+	return _measure(run, repeat)
+
+
+def bench_run_loop(repeat: int, frames: int = 60) -> Dict[str, float]:
+	"""Full run() loop iterations, uncapped so the loop's own cost is measured."""
+	def run() -> int:
+		window = make_window(5, target_fps=0)
+		counter = [0]
+		
+		def draw_content(screen, width, height, scroll_y):
+			counter[0] += 1
+			if counter[0] >= frames:
+				window.running = False
+		
+		window.run(draw_content)
+		return frames
+	return _measure(run, repeat)
+
+
+def bench_async_loop(repeat: int, frames: int = 60) -> Dict[str, float]:
+	"""
+	run_async() frames, plus the worst delay seen by a concurrent I/O-style task.
+	
+	``max_io_delay_us`` is how late a task sleeping 1 ms at a time woke up at
+	worst; it should stay below one frame budget.
+	"""
+	io_delays = []
+	
+	async def session() -> None:
+		window = make_window(5)
+		counter = [0]
+		
+		def draw_content(screen, width, height, scroll_y):
+			counter[0] += 1
+			if counter[0] >= frames:
+				window.running = False
+		
+		async def probe() -> None:
+			while window.running:
+				start = time.perf_counter()
+				await asyncio.sleep(0.001)
+				io_delays.append(time.perf_counter() - start - 0.001)
+		
+		probe_task = asyncio.ensure_future(probe())
+		await window.run_async(draw_content)
+		await probe_task
+	
+	def run() -> int:
+		asyncio.run(session())
+		return frames
+	result = _measure(run, repeat)
+	result['max_io_delay_us'] = max(io_delays) * 1e6 if io_delays else 0.0
+	return result
+
+
+def bench_input_latency(repeat: int, input_first: bool = False, frames: int = 30) -> Dict[str, float]:
+	"""
+	Input-to-present latency of pointer motion in run() at the default 60 fps.
+	
+	A pygame timer posts a motion event every 7 ms, so events arrive at all
+	points of the frame. The per-round sample is the median latency reported
+	by get_input_latency_stats(); ``within_frame`` is the fraction of events
+	presented within one frame budget in the last round.
+	"""
+	motion = pygame.event.Event(pygame.MOUSEMOTION, pos=(5, 5), rel=(0, 0), buttons=(0, 0, 0))
+	samples = []
+	within_frame = 0.0
+	for _ in range(repeat):
+		window = make_window(5, profile_frames=True, input_first=input_first)
+		counter = [0]
+		
+		def draw_content(screen, width, height, scroll_y):
+			counter[0] += 1
+			if counter[0] >= frames:
+				window.running = False
+		
+		pygame.time.set_timer(motion, 7)
+		window.run(draw_content)
+		stats = window.get_input_latency_stats().get('MouseMotion', {})
+		samples.append(stats.get('p50_ms', 0.0) * 1000.0)
+		within_frame = stats.get('within_frame', 0.0)
+	samples.sort()
+	return {
+		'median_us': samples[len(samples) // 2],
+		'min_us': samples[0],
+		'mean_us': sum(samples) / len(samples),
+		'ops': frames,
+		'within_frame': within_frame,
+	}
+
+
+def run_benchmarks(repeat: int = 5, traces: Sequence[str] = ()) -> Dict[str, Dict[str, float]]:
+	"""
+	Run every benchmark case.
+	
+	Args:
+		repeat: Number of timed rounds per case
+		traces: Event traces to replay as extra ``trace_<name>`` cases
+	
+	Returns:
+		Mapping of case name to timing results
+	"""
+	results = {
+		'startup': bench_startup(repeat),
+		'startup_fast': bench_startup(repeat, fast=True),
+		'construct': bench_construct(repeat),
+		'construct_fast': bench_construct(repeat, fast=True),
+	}
+	for buttons in (0, 5, 50):
+		results[f'draw_titlebar_{buttons}_buttons'] = bench_draw_titlebar(buttons, repeat)
+	for kind in ('motion', 'click', 'resize'):
+		results[f'handle_event_{kind}'] = bench_handle_event(kind, repeat)
+	for kind in ('drag', 'resize'):
+		for backend in ('fake', 'sdl2'):
+			results[f'{kind}_{backend}'] = bench_window_geometry(kind, backend, repeat)
+	results['steady_frame'] = bench_steady_frame(repeat)
+	results['scale_change'] = bench_scale_change(repeat)
+	results['offscreen_render'] = bench_offscreen_render(repeat)
+	results['viewport_scroll'] = bench_viewport_scroll(repeat)
+	results['layered_frame'] = bench_layered_frame(repeat)
+	with tempfile.TemporaryDirectory() as tmp:
+		drag_trace = os.path.join(tmp, "drag.jsonl")
+		_record_drag_trace(drag_trace)
+		results['trace_drag'] = bench_trace(drag_trace, repeat)
+	for path in traces:
+		name = os.path.splitext(os.path.basename(path))[0]
+		results[f'trace_{name}'] = bench_trace(path, repeat)
+	# run() and run_async() call pygame.quit() when they return, so they go last
+	results['run_loop'] = bench_run_loop(max(1, repeat // 2))
+	results['run_async_loop'] = bench_async_loop(max(1, repeat // 2))
+	results['input_latency'] = bench_input_latency(max(1, repeat // 2))
+	results['input_latency_first'] = bench_input_latency(max(1, repeat // 2), input_first=True)
+	return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+	"""
+	Compare results against a baseline.
+	
+	Args:
+		results: Current results
+		baseline: Baseline results
+		threshold: Allowed relative slowdown (0.15 = 15%)
+	
+	Returns:
+		Names of the cases that regressed (slower, or a steady-state
+		titlebar that retains blocks)
+	"""
+	regressions = []
+	for name, current in results.items():
+		if current.get('titlebar_blocks_per_frame', 0.0) >= MAX_TITLEBAR_BLOCKS:
+			print(f"{name:32s} titlebar retains {current['titlebar_blocks_per_frame']:.2f} blocks/frame  REGRESSION")
+			regressions.append(name)
+			continue
+		base = baseline.get(name)
+		if not base or not base.get('median_us'):
+			print(f"{name:32s} {current['median_us']:12.2f} us   (new)")
+			continue
+		change = current['median_us'] / base['median_us'] - 1.0
+		flag = ""
+		if change > threshold:
+			flag = "  REGRESSION"
+			regressions.append(name)
+		print(f"{name:32s} {current['median_us']:12.2f} us   {change:+7.1%}{flag}")
+	return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""Command-line entry point."""
+	parser = argparse.ArgumentParser(description="Headless easy_custom_titlebar benchmarks")
+	parser.add_argument("--output", "-o", help="Write results to this JSON file")
+	parser.add_argument("--compare", "-c", help="Compare against a baseline JSON file")
+	parser.add_argument("--threshold", "-t", type=float, default=DEFAULT_THRESHOLD,
+		help="Allowed relative slowdown before flagging a regression")
+	parser.add_argument("--repeat", "-r", type=int, default=5, help="Timed rounds per case")
+	parser.add_argument("--trace", action="append", default=[],
+		help="Replay this event trace as an extra case (repeatable)")
+	args = parser.parse_args(argv)
+	
+	results = run_benchmarks(max(1, args.repeat), args.trace)
+	report = {
+		'meta': {
+			'python': platform.python_version(),
+			'pygame': pygame.version.ver,
+			'platform': platform.platform(),
+			'video_driver': os.environ.get("SDL_VIDEODRIVER", ""),
+		},
+		'results': results,
+	}
+	
+	exit_code = 0
+	if args.compare:
+		with open(args.compare, "r", encoding="utf-8") as fh:
+			baseline = json.load(fh).get('results', {})
+		regressions = compare(results, baseline, args.threshold)
+		if regressions:
+			print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+			exit_code = 1
+	else:
+		for name, result in results.items():
+			print(f"{name:32s} {result['median_us']:12.2f} us")
+			if 'titlebar_blocks_per_frame' in result:
+				print(f"{'':32s} {result['titlebar_blocks_per_frame']:12.2f} retained titlebar blocks/frame")
+			if result.get('transient_bytes_per_frame') is not None:
+				print(f"{'':32s} {result['transient_bytes_per_frame']:12.0f} transient bytes/frame")
+			if 'within_frame' in result:
+				print(f"{'':32s} {result['within_frame'] * 100.0:12.1f} % within one frame")
+	
+	if args.output:
+		with open(args.output, "w", encoding="utf-8") as fh:
+			json.dump(report, fh, indent=2)
+	return exit_code
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,104 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class CommandBatch:
+	"""Window commands collected since the last frame, already coalesced."""
+	
+	def __init__(self):
+		self.title: Optional[str] = None
+		self.redraw = False
+		self.buttons: Dict[int, Dict[str, Any]] = {}
+		self.calls: List[Tuple[Callable, tuple]] = []
+
+
+class WindowCommandQueue:
+	"""
+	Thread-safe queue of window changes, applied once per frame on the main thread.
+	
+	Worker threads must not touch pygame directly. They queue changes here
+	instead; the window drains the queue at the start of each loop iteration.
+	Commands are coalesced: only the last title is applied, any number of
+	redraw requests become one, and button updates to the same button are
+	merged.
+	"""
+	
+	def __init__(self, wake: Optional[Callable[[], None]] = None):
+		"""
+		Initialize the queue.
+		
+		Args:
+			wake: Called (from the queuing thread) when the first command of a
+				batch arrives, to wake up a waiting main loop
+		"""
+		self._wake = wake
+		self._lock = threading.Lock()
+		self._batch = CommandBatch()
+		self._pending = False
+		self.commands_queued = 0
+		self.batches_applied = 0
+	
+	def _queued(self) -> bool:
+		"""Count a queued command (lock held). Returns True if it starts a new batch."""
+		self.commands_queued += 1
+		first = not self._pending
+		self._pending = True
+		return first
+	
+	def _notify(self, first: bool) -> None:
+		"""Wake the main loop for the first command of a batch."""
+		if first and self._wake is not None:
+			try:
+				self._wake()
+			except Exception:
+				pass
+	
+	def set_title(self, title: str) -> None:
+		"""Queue a title change."""
+		with self._lock:
+			self._batch.title = str(title) if title else ""
+			first = self._queued()
+		self._notify(first)
+	
+	def request_redraw(self) -> None:
+		"""Queue a redraw."""
+		with self._lock:
+			self._batch.redraw = True
+			first = self._queued()
+		self._notify(first)
+	
+	def update_button(self, index: int, **changes) -> None:
+		"""
+		Queue changes to a custom button's dictionary (e.g. ``label="Saving"``).
+		
+		Args:
+			index: Index of the custom button
+			**changes: Keys to set on the button dictionary
+		"""
+		with self._lock:
+			self._batch.buttons.setdefault(int(index), {}).update(changes)
+			first = self._queued()
+		self._notify(first)
+	
+	def call(self, func: Callable, *args) -> None:
+		"""Queue an arbitrary function to run on the main thread."""
+		with self._lock:
+			self._batch.calls.append((func, args))
+			first = self._queued()
+		self._notify(first)
+	
+	def drain(self) -> Optional[CommandBatch]:
+		"""
+		Take all queued commands.
+		
+		Returns:
+			The pending batch, or None if nothing was queued
+		"""
+		if not self._pending:
+			return None
+		with self._lock:
+			batch = self._batch
+			self._batch = CommandBatch()
+			self._pending = False
+		self.batches_applied += 1
+		return batch
@@ -0,0 +1,214 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pygame
+
+# Layers from bottom to top. The titlebar layer is the window's retained
+# titlebar surface; the compositor owns the layers below it.
+LAYERS = ('background', 'content', 'overlays', 'titlebar')
+COMPOSITED_LAYERS = LAYERS[:-1]
+
+# Merge dirty rects into their bounding box once they cover this much of it
+MERGE_FILL_RATIO = 0.75
+
+LayerPainter = Callable[[pygame.Surface, int, int, float], None]
+
+
+def merge_rects(rects: List[pygame.Rect], fill_ratio: float = MERGE_FILL_RATIO) -> List[pygame.Rect]:
+	"""
+	Merge overlapping or touching rects, and close neighbours whose bounding
+	box would be mostly covered anyway.
+	
+	Args:
+		rects: Rects to merge (not modified)
+		fill_ratio: Merge two rects if their areas cover at least this
+			fraction of their union
+	
+	Returns:
+		Disjoint-ish list of rects covering all inputs
+	"""
+	merged = [pygame.Rect(rect) for rect in rects if rect.width > 0 and rect.height > 0]
+	changed = True
+	while changed and len(merged) > 1:
+		changed = False
+		i = 0
+		while i < len(merged):
+			j = i + 1
+			while j < len(merged):
+				a, b = merged[i], merged[j]
+				union = a.union(b)
+				union_area = union.width * union.height
+				if (a.inflate(2, 2).colliderect(b) or
+				        a.width * a.height + b.width * b.height >= fill_ratio * union_area):
+					merged[i] = union
+					del merged[j]
+					changed = True
+				else:
+					j += 1
+			i += 1
+	return merged
+
+
+class Layer:
+	"""
+	A cached window-sized surface redrawn only where it was invalidated.
+	"""
+	
+	def __init__(self, name: str, painter: Optional[LayerPainter] = None, opaque: bool = False):
+		"""
+		Initialize the layer.
+		
+		Args:
+			name: Layer name
+			painter: Function drawing the layer: (surface, width, height, scroll_y);
+				the surface is clipped to the region being redrawn
+			opaque: The layer covers everything below it
+		"""
+		self.name = name
+		self.painter = painter
+		self.opaque = bool(opaque)
+		self.surface: Optional[pygame.Surface] = None
+		self.dirty: List[pygame.Rect] = []
+
+
+class Compositor:
+	"""
+	Composites the background, content and overlay layers of a window.
+	
+	Each layer keeps its own surface. ``invalidate()`` marks a region of a
+	layer as changed; ``compose()`` repaints only those regions, blends the
+	layers there and returns the merged rects so the caller can present them
+	with ``pygame.display.update(rects)``. Layers without a painter cost
+	nothing, and the background is a plain fill unless it has one.
+	"""
+	
+	def __init__(self, size: Tuple[int, int], background_color: Tuple[int, int, int] = (30, 30, 30)):
+		"""
+		Initialize the compositor.
+		
+		Args:
+			size: Window (width, height)
+			background_color: Fill color of the background layer
+		"""
+		self.size = (int(size[0]), int(size[1]))
+		self.background_color = tuple(background_color)
+		self.layers: Dict[str, Layer] = {name: Layer(name) for name in COMPOSITED_LAYERS}
+		self.layers['background'].opaque = True
+		self.pixels_composited = 0
+		self.pixels_total = 0
+		self.frames = 0
+	
+	def set_painter(self, name: str, painter: Optional[LayerPainter]) -> None:
+		"""
+		Set the function that draws a layer, and invalidate the whole layer.
+		
+		Args:
+			name: 'background', 'content' or 'overlays'
+			painter: Layer painter, or None to leave the layer empty
+		"""
+		layer = self.layers[name]
+		layer.painter = painter
+		if painter is None:
+			layer.surface = None
+		self.invalidate(name)
+	
+	def invalidate(self, name: str, rect: Optional[pygame.Rect] = None) -> None:
+		"""
+		Mark a region of a layer as changed.
+		
+		Args:
+			name: 'background', 'content' or 'overlays'
+			rect: Region in window coordinates (None for the whole layer)
+		"""
+		layer = self.layers[name]
+		full = pygame.Rect((0, 0), self.size)
+		layer.dirty.append(full if rect is None else pygame.Rect(rect).clip(full))
+	
+	def invalidate_all(self) -> None:
+		"""Mark every layer as changed everywhere."""
+		for name in self.layers:
+			self.invalidate(name)
+	
+	def resize(self, size: Tuple[int, int]) -> None:
+		"""Resize all layers (and invalidate them) if the window size changed."""
+		size = (int(size[0]), int(size[1]))
+		if size == self.size:
+			return
+		self.size = size
+		for layer in self.layers.values():
+			layer.surface = None
+		self.invalidate_all()
+	
+	def _layer_surface(self, layer: Layer) -> pygame.Surface:
+		"""Get the surface of a layer, creating it on first use."""
+		if layer.surface is None or layer.surface.get_size() != self.size:
+			if layer.opaque:
+				layer.surface = pygame.Surface(self.size)
+			else:
+				layer.surface = pygame.Surface(self.size, pygame.SRCALPHA)
+		return layer.surface
+	
+	def _paint(self, layer: Layer, rects: List[pygame.Rect], scroll_y: float) -> None:
+		"""Repaint the given regions of a layer."""
+		surface = self._layer_surface(layer)
+		w, h = self.size
+		clear = self.background_color if layer.opaque else (0, 0, 0, 0)
+		for rect in rects:
+			surface.set_clip(rect)
+			surface.fill(clear, rect)
+			try:
+				layer.painter(surface, w, h, scroll_y)
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Error in {layer.name} layer: {e}")
+		surface.set_clip(None)
+	
+	def compose(self, target: pygame.Surface, area: pygame.Rect, scroll_y: float = 0.0) -> List[pygame.Rect]:
+		"""
+		Repaint invalidated layer regions and composite them onto ``target``.
+		
+		Args:
+			target: Surface to composite onto (usually the screen)
+			area: Part of the target owned by the compositor
+			scroll_y: Scroll offset passed to the layer painters
+		
+		Returns:
+			The merged rects that changed on ``target``
+		"""
+		area = pygame.Rect(area)
+		dirty: List[pygame.Rect] = []
+		for layer in self.layers.values():
+			if not layer.dirty:
+				continue
+			regions = merge_rects([rect.clip(area) for rect in layer.dirty])
+			layer.dirty = []
+			if layer.painter is not None and regions:
+				self._paint(layer, regions, scroll_y)
+			dirty.extend(regions)
+		
+		rects = merge_rects(dirty)
+		pixels = 0
+		background = self.layers['background']
+		for rect in rects:
+			area_px = rect.width * rect.height
+			if background.painter is not None:
+				target.blit(background.surface, rect, rect)
+			else:
+				target.fill(self.background_color, rect)
+			pixels += area_px
+			for name in ('content', 'overlays'):
+				layer = self.layers[name]
+				if layer.painter is not None and layer.surface is not None:
+					target.blit(layer.surface, rect, rect)
+					pixels += area_px
+		
+		self.frames += 1
+		self.pixels_composited = pixels
+		self.pixels_total += pixels
+		return rects
+	
+	def stats(self) -> Dict[str, int]:
+		"""Get compositing counters."""
+		return {
+			'frames': self.frames,
+			'pixels_composited': self.pixels_composited,
+			'pixels_total': self.pixels_total,
+		}
@@ -1,22 +1,99 @@
 import pygame
 import sys
 import os
-import win32gui
-import win32con
-import win32api
-from ctypes import windll, wintypes, byref, sizeof
-import importlib.resources
+import time
+import pathlib
+import asyncio
+import inspect
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, List, Dict, Callable, Union
+from .allocations import AllocationTracker
+from .assets import AssetCache, get_asset_cache
+from .commands import WindowCommandQueue
+from .compositor import Compositor, COMPOSITED_LAYERS
+from .eventtrace import EventRecorder
+from .atlas import get_icon_atlas
+from .backends import WindowBackend, default_backend
+from .fonts import get_font_registry
+from .pacing import FramePacer
+from .profiler import FrameProfiler, _percentile
+from .viewport import ScrollViewport
+from .mipmap import MipPyramid
+from .layout import (
+	TitlebarLayout, compute_button_rects,
+	HIT_BUTTON, HIT_DRAG, HIT_RESIZE
+)
+
+try:
+	from importlib.resources import files as _resource_files
+except ImportError:
+	# Python 3.7/3.8
+	_resource_files = None
 
 TITLEBAR_HEIGHT = 40
 BUTTON_WIDTH = 55
 BUTTON_HEIGHT = TITLEBAR_HEIGHT
 PADDING = 8
 TITLE_Y_OFFSET = 5
+RESIZE_BORDER = 5
+UI_FONT_SIZE = 18
 BG_COLOR = (30, 30, 30)
 TITLE_CLIENT_BG = (25, 25, 25)
 TITLE_CLIENT_TEXT = (230, 230, 230)
 BUTTON_HOVER_BG = (150, 150, 150)
+ICON_COLOR = (255, 255, 255)
+
+# Background color and icon mode ('normal', 'hover' or 'pressed') of a button
+ButtonState = Tuple[Tuple[int, int, int], str]
+
+# Target size (px) of each button icon
+ICON_SIZES = {
+	'minimize': 12,
+	'maximize': 8,
+	'restore': 12,
+	'close': 13,
+	'custom': 18
+}
+STANDARD_ICONS = ('minimize', 'maximize', 'restore', 'close')
+
+# Range accepted by set_scale()
+MIN_SCALE = 0.5
+MAX_SCALE = 4.0
+
+# Main loop pacing
+MAX_FPS = 60  # Default target frame rate
+SCROLL_STEP = 10.0  # Pixels per scroll step
+IDLE_TIMEOUT_MS = 500  # Longest on-demand wait before the loop re-checks its state
+PAUSED_POLL_INTERVAL = 0.1  # Event polling interval (s) of run_async() while paused
+RESIZE_REALLOC_RATE = 15.0  # Max display reallocations per second during a coalesced resize
+INPUT_LATENCY_HISTORY = 300  # Input-to-present samples kept per event type
+
+# Posted to wake an on-demand loop blocked in pygame.event.wait
+REDRAW_EVENT = pygame.event.custom_type()
+# Posted by worker threads when an executor button callback finishes
+# (attributes: button, result, error)
+CALLBACK_DONE_EVENT = pygame.event.custom_type()
+
+# Window state events (pygame 2.0.1+) mapped to the state they set
+WINDOW_STATE_EVENTS = {
+	getattr(pygame, name): change for name, change in (
+		('WINDOWMINIMIZED', ('minimized', True)),
+		('WINDOWRESTORED', ('minimized', False)),
+		('WINDOWMAXIMIZED', ('minimized', False)),
+		('WINDOWHIDDEN', ('hidden', True)),
+		('WINDOWSHOWN', ('hidden', False)),
+		('WINDOWFOCUSLOST', ('focused', False)),
+		('WINDOWFOCUSGAINED', ('focused', True)),
+	) if hasattr(pygame, name)
+}
+WINDOW_EXPOSED_EVENT = getattr(pygame, 'WINDOWEXPOSED', None)
+WINDOW_LEAVE_EVENT = getattr(pygame, 'WINDOWLEAVE', None)
+WINDOW_SIZE_CHANGED_EVENT = getattr(pygame, 'WINDOWSIZECHANGED', None)
+
+# Maximum number of rendered title surfaces kept per window
+TITLE_CACHE_SIZE = 32
+TITLE_ELLIPSIS = "..."
 
 # Minimum window dimensions
 MIN_WINDOW_WIDTH = 400
@@ -33,35 +110,62 @@ def resource_path(filename: str) -> str:
 	Returns:
 		Absolute path to the resource file
 	"""
-	try:
-		with importlib.resources.path("easy_custom_titlebar.assets", filename) as p:
-			return str(p)
-	except (ModuleNotFoundError, FileNotFoundError, TypeError) as e:
-		# Fallback to relative path if package resources aren't available
-		fallback_path = os.path.join(os.path.dirname(__file__), "assets", filename)
-		if os.path.exists(fallback_path):
-			return fallback_path
-		# If still not found, return the path anyway (caller should handle the error)
-		return fallback_path
-
-class CustomTitleBarWindow:
+	# Only return a real filesystem path: importlib.resources.path() may hand
+	# back a temporary file that is deleted when its context closes
+	if _resource_files is not None:
+		try:
+			resource = _resource_files("easy_custom_titlebar") / "assets" / filename
+			if isinstance(resource, pathlib.Path):
+				return str(resource)
+		except (ModuleNotFoundError, FileNotFoundError, TypeError):
+			pass
+	# Fallback to the path next to this module (caller should handle a missing file)
+	return os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", filename)
+
+def _fit_text(font: pygame.font.Font, text: str, max_width: int, ellipsis: str = TITLE_ELLIPSIS) -> str:
 	"""
-	A custom titlebar window manager for Pygame on Windows.
+	Truncate text so it fits in ``max_width`` pixels when rendered with ``font``.
 	
-	Provides a borderless window with custom titlebar, drag-to-move,
-	resize support, and customizable buttons.
+	Text is measured with ``Font.size`` (no rendering) and the longest prefix
+	that fits before the ellipsis is found by binary search.
+	
+	Args:
+		font: Font used to render the text
+		text: Text to fit
+		max_width: Available width in pixels
+		ellipsis: Suffix appended to truncated text
+		
+	Returns:
+		The original text if it fits, otherwise a truncated prefix plus ellipsis
+	"""
+	if font.size(text)[0] <= max_width:
+		return text
+	lo, hi = 0, len(text) - 1
+	while lo < hi:
+		mid = (lo + hi + 1) // 2
+		if font.size(text[:mid] + ellipsis)[0] <= max_width:
+			lo = mid
+		else:
+			hi = mid - 1
+	return text[:lo] + ellipsis
+
+class TitlebarTheme:
+	"""
+	Everything that styles a titlebar, independent of any window.
+	
+	Arguments have the same meaning and defaults as the matching
+	CustomTitleBarWindow arguments. Themes are compared by value, so equal
+	themes share one renderer (and its caches) in ``render_titlebar()``.
 	"""
 	
 	def __init__(
 		self,
-		width: int = 1200,
-		height: int = 700,
-		title: str = "",
-		enable_scroll: bool = False,
 		titlebar_color: Optional[Union[Tuple[int, int, int], str]] = None,
 		button_color: Optional[Union[Tuple[int, int, int], str]] = None,
 		button_hover_color: Optional[Union[Tuple[int, int, int], str]] = None,
-		button_icon_color: str = "white",
+		button_icon_color: Union[Tuple[int, int, int], str] = "white",
+		button_icon_hover_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		button_icon_pressed_color: Optional[Union[Tuple[int, int, int], str]] = None,
 		titlebar_border: bool = False,
 		titlebar_border_color: Tuple[int, int, int] = (0, 0, 0),
 		titlebar_border_thickness: int = 1,
@@ -69,151 +173,204 @@ class CustomTitleBarWindow:
 		titlebar_font_size: int = 28,
 		titlebar_font_bold: bool = True,
 		left_notch_width: int = 0,
-		titlebar_height: int = 40,
+		titlebar_height: int = TITLEBAR_HEIGHT,
 		close_button_color: Tuple[int, int, int] = (200, 0, 0),
 		close_button_hover_color: Tuple[int, int, int] = (255, 0, 0),
 		minmax_button_hover_color: Optional[Tuple[int, int, int]] = None,
-		window_icon: Optional[str] = None,
 		minimize_icon: Optional[str] = None,
 		maximize_icon: Optional[str] = None,
 		restore_icon: Optional[str] = None,
 		close_icon: Optional[str] = None,
-		custom_buttons: Optional[List[Dict]] = None
+		scale: float = 1.0
+	):
+		"""Store the theme (see CustomTitleBarWindow for the arguments)."""
+		self.titlebar_color = titlebar_color
+		self.button_color = button_color
+		self.button_hover_color = button_hover_color
+		self.button_icon_color = button_icon_color
+		self.button_icon_hover_color = button_icon_hover_color
+		self.button_icon_pressed_color = button_icon_pressed_color
+		self.titlebar_border = titlebar_border
+		self.titlebar_border_color = titlebar_border_color
+		self.titlebar_border_thickness = titlebar_border_thickness
+		self.titlebar_font_family = titlebar_font_family
+		self.titlebar_font_size = titlebar_font_size
+		self.titlebar_font_bold = titlebar_font_bold
+		self.left_notch_width = left_notch_width
+		self.titlebar_height = titlebar_height
+		self.close_button_color = close_button_color
+		self.close_button_hover_color = close_button_hover_color
+		self.minmax_button_hover_color = minmax_button_hover_color
+		self.minimize_icon = minimize_icon
+		self.maximize_icon = maximize_icon
+		self.restore_icon = restore_icon
+		self.close_icon = close_icon
+		self.scale = scale
+	
+	def key(self) -> Tuple:
+		"""Get a hashable snapshot of the theme."""
+		return tuple(
+			tuple(value) if isinstance(value, list) else value
+			for value in self.__dict__.values()
+		)
+	
+	def __eq__(self, other: object) -> bool:
+		return isinstance(other, TitlebarTheme) and self.key() == other.key()
+	
+	def __hash__(self) -> int:
+		return hash(self.key())
+
+
+def _theme_attribute(name: str) -> property:
+	"""
+	Make a styling attribute that invalidates the titlebar when it changes.
+	
+	The value is stored under ``_<name>``. Assigning a different value bumps
+	the titlebar version, so the cached theme key is rebuilt and the next
+	draw re-renders the titlebar.
+	"""
+	slot = '_' + name
+	
+	def get(self):
+		return self.__dict__[slot]
+	
+	def set(self, value) -> None:
+		attrs = self.__dict__
+		if slot not in attrs or attrs[slot] != value:
+			attrs[slot] = value
+			self._titlebar_version = attrs.get('_titlebar_version', 0) + 1
+	
+	return property(get, set)
+
+
+class TitlebarRenderer:
+	"""
+	Draws a titlebar onto any surface; needs no window or OS handle.
+	
+	Holds the style, metrics, layout and the icon, font and title caches.
+	CustomTitleBarWindow builds on it, and ``render_titlebar()`` uses it to
+	draw titlebars offscreen.
+	"""
+	
+	# Styling attributes: assigning them re-renders the titlebar on the next draw
+	titlebar_color = _theme_attribute('titlebar_color')
+	button_color = _theme_attribute('button_color')
+	button_hover_color = _theme_attribute('button_hover_color')
+	button_icon_color = _theme_attribute('button_icon_color')
+	button_icon_hover_color = _theme_attribute('button_icon_hover_color')
+	button_icon_pressed_color = _theme_attribute('button_icon_pressed_color')
+	close_button_color = _theme_attribute('close_button_color')
+	close_button_hover_color = _theme_attribute('close_button_hover_color')
+	minmax_button_hover_color = _theme_attribute('minmax_button_hover_color')
+	titlebar_border = _theme_attribute('titlebar_border')
+	titlebar_border_color = _theme_attribute('titlebar_border_color')
+	titlebar_border_thickness = _theme_attribute('titlebar_border_thickness')
+	left_notch_width = _theme_attribute('left_notch_width')
+	scale = _theme_attribute('scale')
+	
+	def __init__(
+		self,
+		theme: Optional[TitlebarTheme] = None,
+		title: str = "",
+		custom_buttons: Optional[List[Dict]] = None,
+		asset_cache: Optional[AssetCache] = None,
+		width: int = 0,
+		height: int = 0
 	):
 		"""
-		Initialize the custom titlebar window.
+		Initialize the renderer.
 		
 		Args:
-			width: Window width in pixels (minimum 400)
-			height: Window height in pixels (minimum 300)
-			title: Title text displayed in the titlebar
-			enable_scroll: Enable vertical scrolling support
-			titlebar_color: Background color (RGB tuple or hex string)
-			button_color: Button background color (RGB tuple or hex string)
-			button_hover_color: Button hover color (RGB tuple or hex string)
-			button_icon_color: Icon color ("white" or "black")
-			titlebar_border: Draw border at bottom of titlebar
-			titlebar_border_color: Border color (RGB tuple)
-			titlebar_border_thickness: Border thickness in pixels
-			titlebar_font_family: Font family name
-			titlebar_font_size: Font size in pixels
-			titlebar_font_bold: Use bold font
-			left_notch_width: Width of left notch area
-			titlebar_height: Height of titlebar in pixels
-			close_button_color: Close button color (RGB tuple)
-			close_button_hover_color: Close button hover color (RGB tuple)
-			minmax_button_hover_color: Min/max button hover color (RGB tuple)
-			window_icon: Path to window icon file
-			minimize_icon: Path to custom minimize icon
-			maximize_icon: Path to custom maximize icon
-			restore_icon: Path to custom restore icon
-			close_icon: Path to custom close icon
+			theme: Titlebar style (defaults to TitlebarTheme())
+			title: Title text
 			custom_buttons: List of custom button dictionaries
+			asset_cache: Cache for custom button icons (defaults to the shared cache)
+			width: Titlebar width in pixels
+			height: Height used for the resize border of the layout
 		"""
-		# Validate inputs
-		width = max(MIN_WINDOW_WIDTH, int(width))
-		height = max(MIN_WINDOW_HEIGHT, int(height))
-		titlebar_height = max(20, int(titlebar_height))
-		left_notch_width = max(0, int(left_notch_width))
-		titlebar_border_thickness = max(1, int(titlebar_border_thickness))
-		titlebar_font_size = max(8, int(titlebar_font_size))
-		
-		# Initialize pygame
-		if not pygame.get_init():
-			pygame.init()
-		
-		self.width = width
-		self.height = height
+		if theme is None:
+			theme = TitlebarTheme()
+		self.width = int(width)
+		self.height = int(height)
 		self.title = str(title) if title else ""
-		self.enable_scroll = bool(enable_scroll)
-		self.titlebar_border = bool(titlebar_border)
-		self.titlebar_border_color = tuple(titlebar_border_color)
-		self.titlebar_border_thickness = titlebar_border_thickness
-		self.titlebar_font_family = str(titlebar_font_family)
-		self.titlebar_font_size = titlebar_font_size
-		self.titlebar_font_bold = bool(titlebar_font_bold)
-		self.left_notch_width = left_notch_width
-		self._titlebar_height = titlebar_height
-		self.custom_buttons = list(custom_buttons) if custom_buttons else []
+		self.is_maximized = False
+		self.titlebar_border = bool(theme.titlebar_border)
+		self.titlebar_border_color = tuple(theme.titlebar_border_color)
+		self.titlebar_border_thickness = max(1, int(theme.titlebar_border_thickness))
+		self.titlebar_font_family = str(theme.titlebar_font_family)
+		self.titlebar_font_size = max(8, int(theme.titlebar_font_size))
+		self.titlebar_font_bold = bool(theme.titlebar_font_bold)
+		self.left_notch_width = max(0, int(theme.left_notch_width))
 		
-		# Validate custom buttons structure
-		for i, btn in enumerate(self.custom_buttons):
-			if not isinstance(btn, dict):
-				raise TypeError(f"Custom button at index {i} must be a dictionary")
+		# Titlebar metrics: logical sizes times the UI scale (see _update_metrics)
+		self.scale = 1.0
+		self._logical_titlebar_height = max(20, int(theme.titlebar_height))
+		self._update_metrics(theme.scale)
 		
-		# Set window/taskbar icon if provided
-		if window_icon is not None:
-			try:
-				if os.path.exists(window_icon):
-					icon_surface = pygame.image.load(window_icon)
-					pygame.display.set_icon(icon_surface)
-				else:
-					print(f"[easy_custom_titlebar] Warning: Window icon file not found: {window_icon}")
-			except (pygame.error, FileNotFoundError, OSError) as e:
-				print(f"[easy_custom_titlebar] Failed to set window icon: {e}")
 		# Handle titlebar color (accept hex or tuple)
-		self.titlebar_color = self._parse_color(titlebar_color, TITLE_CLIENT_BG)
+		self.titlebar_color = self._parse_color(theme.titlebar_color, TITLE_CLIENT_BG)
 		# Handle button color
-		self.button_color = self._parse_color(button_color, self.titlebar_color)
+		self.button_color = self._parse_color(theme.button_color, self.titlebar_color)
 		# Handle button hover color
-		self.button_hover_color = self._parse_color(button_hover_color, BUTTON_HOVER_BG)
-		# Handle icon color
-		icon_color_lower = str(button_icon_color).lower() if button_icon_color else "white"
-		self.button_icon_color = "white" if icon_color_lower == "white" else "black"
+		self.button_hover_color = self._parse_color(theme.button_hover_color, BUTTON_HOVER_BG)
+		# Handle icon colors (stock icons are tinted from a white mask)
+		self.button_icon_color = self._parse_icon_color(theme.button_icon_color, ICON_COLOR)
+		self.button_icon_hover_color = self._parse_icon_color(theme.button_icon_hover_color, None)
+		self.button_icon_pressed_color = self._parse_icon_color(theme.button_icon_pressed_color, None)
+		self.close_button_color = tuple(theme.close_button_color)
+		self.close_button_hover_color = tuple(theme.close_button_hover_color)
+		self.minmax_button_hover_color = (
+			tuple(theme.minmax_button_hover_color) if theme.minmax_button_hover_color is not None
+			else BUTTON_HOVER_BG
+		)
 		
-		# Create window
-		try:
-			self.screen = pygame.display.set_mode((self.width, self.height), pygame.NOFRAME)
-			pygame.display.set_caption(self.title)
-		except pygame.error as e:
-			raise RuntimeError(f"Failed to create window: {e}")
+		# Button states, reused every frame so a steady-state titlebar
+		# retains nothing: the states of the last and the next draw, and
+		# the (color, mode) pairs keyed by color, then mode
+		self._titlebar_states: List[ButtonState] = []
+		self._spare_states: List[ButtonState] = []
+		self._state_pairs: Dict[Tuple[int, int, int], Dict[str, ButtonState]] = {}
+		# Theme key, rebuilt only when the titlebar version changes (styling
+		# attributes bump it when assigned, see _theme_attribute)
+		self._titlebar_version = 0
+		self._theme_key_version = -1
+		self._theme_key_cache: Tuple = ()
 		
-		# Get window handle - more reliable method
-		self.hwnd = self._get_window_handle()
-		if not self.hwnd:
-			raise RuntimeError("Failed to acquire window handle")
+		# Rendered title surfaces keyed by (title, font, color, available width)
+		self._title_cache: Dict[Tuple, pygame.Surface] = {}
+		self.title_render_count = 0
 		
-		self._init_window_styles()
-		self._center_window()
-		# Window state
-		self.dragging = False
-		self.drag_offset = (0, 0)
-		self.resizing = False
-		self.resize_edge: Optional[str] = None
-		self.is_maximized = False
-		self.original_size = (self.width, self.height)
-		self.original_pos = (0, 0)
-		self.RESIZE_BORDER = 5
-		self.resize_start_size: Optional[Tuple[int, int]] = None
-		self.resize_start_pos: Optional[Tuple[int, int]] = None
-		self.resize_mouse_start: Optional[Tuple[int, int]] = None
-		self.scroll_y = 0.0
-		self.running = True
+		# Fonts are shared across windows through the font registry and
+		# resolved on first use
+		self.fonts = get_font_registry()
+		self._font: Optional[pygame.font.Font] = None
+		self._header_font: Optional[pygame.font.Font] = None
 		
-		# Initialize fonts
-		try:
-			self.FONT = pygame.font.SysFont("Consolas", 18)
-			self.HEADER_FONT = pygame.font.SysFont(
-				self.titlebar_font_family,
-				self.titlebar_font_size,
-				bold=self.titlebar_font_bold
-			)
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Failed to load font, using default: {e}")
-			self.FONT = pygame.font.Font(None, 18)
-			self.HEADER_FONT = pygame.font.Font(None, self.titlebar_font_size)
+		# Button images (white masks or custom icons) are decoded on first use
+		self._icon_overrides: Dict[str, Optional[str]] = {
+			'minimize': theme.minimize_icon,
+			'maximize': theme.maximize_icon,
+			'restore': theme.restore_icon,
+			'close': theme.close_icon,
+		}
+		self.btn_imgs: Dict[str, pygame.Surface] = {}
+		self._untinted_icons = set()
 		
-		# Load button images (allow custom overrides)
-		self.btn_imgs = self._load_button_images(
-			minimize_icon, maximize_icon, restore_icon, close_icon
-		)
+		# Mip pyramids of the button images, scaled masks keyed by (name, size)
+		# and tinted icons keyed by (name, color, size); custom icons are
+		# cached with color None
+		self._icon_pyramids: Dict[str, MipPyramid] = {}
+		self._mask_cache: Dict[Tuple[str, int], pygame.Surface] = {}
+		self._icon_cache: Dict[Tuple[str, Optional[Tuple[int, int, int]], int], pygame.Surface] = {}
+		self.icon_rescale_count = 0
+		self.icon_tint_count = 0
 		
-		self.close_button_color = tuple(close_button_color)
-		self.close_button_hover_color = tuple(close_button_hover_color)
-		self.minmax_button_hover_color = (
-			tuple(minmax_button_hover_color) if minmax_button_hover_color is not None
-			else BUTTON_HOVER_BG
-		)
+		self.asset_cache = asset_cache if asset_cache is not None else get_asset_cache()
+		self.custom_buttons: List[Dict] = []
+		self._buttons_version = 0
+		self._layout: Optional[TitlebarLayout] = None
+		self._layout_key: Optional[Tuple] = None
+		self.set_custom_buttons(custom_buttons)
 	
 	def _parse_color(self, color: Optional[Union[Tuple[int, int, int], str]], default: Tuple[int, int, int]) -> Tuple[int, int, int]:
 		"""Parse color from hex string or tuple, return RGB tuple."""
@@ -230,201 +387,1035 @@ class CustomTitleBarWindow:
 			return tuple(int(c) for c in color[:3])
 		return default
 	
-	def _get_window_handle(self) -> Optional[int]:
-		"""Get the window handle more reliably."""
+	def _parse_icon_color(
+		self,
+		color: Optional[Union[Tuple[int, int, int], str]],
+		default: Optional[Tuple[int, int, int]]
+	) -> Optional[Tuple[int, int, int]]:
+		"""Parse an icon color: RGB tuple, hex string or color name (e.g. "white")."""
+		if isinstance(color, str) and color and not color.startswith("#"):
+			try:
+				return tuple(pygame.Color(color.lower()))[:3]
+			except ValueError:
+				print(f"[easy_custom_titlebar] Warning: Unknown icon color: {color}")
+				return default
+		return self._parse_color(color, default)
+	
+	def _load_custom_icon(self, path: str) -> Optional[pygame.Surface]:
+		"""Load a user-supplied icon file, or return None if it cannot be loaded."""
 		try:
-			# Try to get handle from pygame window
-			hwnd_str = pygame.display.get_wm_info().get('window')
-			if hwnd_str:
-				return int(hwnd_str)
-		except (AttributeError, KeyError, ValueError):
-			pass
+			if os.path.exists(path):
+				icon = pygame.image.load(path)
+				return icon.convert_alpha() if pygame.display.get_surface() is not None else icon
+			else:
+				print(f"[easy_custom_titlebar] Warning: Custom icon file not found: {path}")
+		except (pygame.error, FileNotFoundError, OSError) as e:
+			print(f"[easy_custom_titlebar] Failed to load custom icon {path}: {e}")
+		return None
+	
+	def _load_icon(self, path: Optional[str], fallback: str) -> pygame.Surface:
+		"""Load a single icon, falling back to the bundled asset."""
+		if path is not None:
+			icon = self._load_custom_icon(path)
+			if icon is not None:
+				return icon
 		
-		# Fallback to foreground window
-		try:
-			return win32gui.GetForegroundWindow()
-		except Exception:
-			pass
+		# Default icons come from the packed atlas
+		icon = get_icon_atlas().get(os.path.splitext(fallback)[0])
+		if icon is not None:
+			return icon
 		
-		# Last resort: find window by title
+		# Fall back to the individual asset file
 		try:
-			def enum_handler(hwnd, ctx):
-				if win32gui.IsWindowVisible(hwnd):
-					window_text = win32gui.GetWindowText(hwnd)
-					if self.title and self.title in window_text:
-						ctx.append(hwnd)
-			
-			handles = []
-			win32gui.EnumWindows(enum_handler, handles)
-			if handles:
-				return handles[0]
-		except Exception:
-			pass
+			icon_path = resource_path(fallback)
+			if os.path.exists(icon_path):
+				icon = pygame.image.load(icon_path)
+				return icon.convert_alpha() if pygame.display.get_surface() is not None else icon
+			else:
+				raise FileNotFoundError(f"Default icon not found: {icon_path}")
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Error loading default icon {fallback}: {e}")
+			# Create a placeholder surface if all else fails
+			surf = pygame.Surface((16, 16), pygame.SRCALPHA)
+			pygame.draw.rect(surf, (255, 255, 255), (0, 0, 16, 16))
+			return surf
+	
+	def _button_image(self, name: str) -> pygame.Surface:
+		"""
+		Get a standard button image, decoding it on first use.
 		
-		return None
+		This is the white mask of the stock icon, or the custom icon set for
+		this button (which is never tinted).
+		"""
+		image = self.btn_imgs.get(name)
+		if image is None:
+			path = self._icon_overrides.get(name)
+			image = self._load_custom_icon(path) if path is not None else None
+			if image is not None:
+				self._untinted_icons.add(name)
+			else:
+				self._untinted_icons.discard(name)
+				image = self._load_icon(None, f'{name}_white.png')
+			self.btn_imgs[name] = image
+		return image
 	
-	def _load_button_images(self, minimize_icon, maximize_icon, restore_icon, close_icon) -> Dict[str, pygame.Surface]:
-		"""Load all button icon images with fallback handling."""
-		def load_icon(path: Optional[str], fallback: str) -> pygame.Surface:
-			if path is not None:
-				try:
-					if os.path.exists(path):
-						return pygame.image.load(path).convert_alpha()
-					else:
-						print(f"[easy_custom_titlebar] Warning: Custom icon file not found: {path}")
-				except (pygame.error, FileNotFoundError, OSError) as e:
-					print(f"[easy_custom_titlebar] Failed to load custom icon {path}: {e}")
+	def _icon_color(self, mode: str = 'normal') -> Tuple[int, int, int]:
+		"""Get the icon tint for a button state ('normal', 'hover' or 'pressed')."""
+		color = self.button_icon_color
+		if mode != 'normal' and self.button_icon_hover_color is not None:
+			color = self.button_icon_hover_color
+		if mode == 'pressed' and self.button_icon_pressed_color is not None:
+			color = self.button_icon_pressed_color
+		return color
+	
+	def _scaled_icon(self, name: str, mode: str = 'normal') -> Optional[pygame.Surface]:
+		"""
+		Get a standard button icon scaled to its target size and tinted for a state.
+		
+		The white mask is scaled once per size, starting from the nearest
+		level of its mip pyramid, and tinted with a single ``BLEND_RGBA_MULT``
+		fill per color. Results are cached by (name, color, size), so
+		steady-state frames never rescale or recolor. Cache misses increment
+		``icon_rescale_count`` and ``icon_tint_count``.
+		
+		Args:
+			name: Icon name ('minimize', 'maximize', 'restore' or 'close')
+			mode: Button state ('normal', 'hover' or 'pressed')
 			
-			# Load default icon
-			try:
-				icon_path = resource_path(fallback)
-				if os.path.exists(icon_path):
-					return pygame.image.load(icon_path).convert_alpha()
-				else:
-					raise FileNotFoundError(f"Default icon not found: {icon_path}")
-			except Exception as e:
-				print(f"[easy_custom_titlebar] Error loading default icon {fallback}: {e}")
-				# Create a placeholder surface if all else fails
-				surf = pygame.Surface((16, 16), pygame.SRCALPHA)
-				pygame.draw.rect(surf, (255, 255, 255), (0, 0, 16, 16))
-				return surf
+		Returns:
+			Scaled icon surface, or None if the icon is unavailable
+		"""
+		size = self.icon_sizes[name]
+		color = None if name in self._untinted_icons else self._icon_color(mode)
+		key = (name, color, size)
+		icon = self._icon_cache.get(key)
+		if icon is None:
+			mask = self._mask_cache.get((name, size))
+			if mask is None:
+				pyramid = self._icon_pyramids.get(name)
+				if pyramid is None:
+					source = self._button_image(name)
+					if source is None:
+						return None
+					pyramid = self._icon_pyramids[name] = MipPyramid(source)
+				mask = pyramid.scale((size, size))
+				self.icon_rescale_count += 1
+				self._mask_cache[(name, size)] = mask
+				if name in self._untinted_icons:
+					# The image turned out to be a custom icon
+					color = None
+					key = (name, color, size)
+			if color is None:
+				icon = mask
+			else:
+				icon = mask.copy()
+				icon.fill(color + (255,), special_flags=pygame.BLEND_RGBA_MULT)
+				self.icon_tint_count += 1
+			self._icon_cache[key] = icon
+		return icon
+	
+	def _rebuild_icon_cache(self) -> None:
+		"""Drop all tinted icons and prepare the active icon set for every button state."""
+		self._icon_cache.clear()
+		for name in STANDARD_ICONS:
+			for mode in ('normal', 'hover', 'pressed'):
+				self._scaled_icon(name, mode)
+	
+	def set_button_icon_color(
+		self,
+		button_icon_color: Union[Tuple[int, int, int], str],
+		hover_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		pressed_color: Optional[Union[Tuple[int, int, int], str]] = None
+	) -> None:
+		"""
+		Recolor the standard button icons.
 		
-		return {
-			'minimize_white': load_icon(minimize_icon, 'minimize_white.png'),
-			'maximize_white': load_icon(maximize_icon, 'maximize_white.png'),
-			'restore_white': load_icon(restore_icon, 'restore_white.png'),
-			'close_white': load_icon(close_icon, 'close_white.png'),
-			'minimize_black': load_icon(minimize_icon, 'minimize_black.png'),
-			'maximize_black': load_icon(maximize_icon, 'maximize_black.png'),
-			'restore_black': load_icon(restore_icon, 'restore_black.png'),
-			'close_black': load_icon(close_icon, 'close_black.png'),
+		Each icon is tinted once per new color; scaled masks are reused.
+		
+		Args:
+			button_icon_color: Icon color (RGB tuple, hex string or color name)
+			hover_color: Icon color while hovered (None = button_icon_color)
+			pressed_color: Icon color while pressed (None = the hover color)
+		"""
+		colors = (
+			self._parse_icon_color(button_icon_color, ICON_COLOR),
+			self._parse_icon_color(hover_color, None),
+			self._parse_icon_color(pressed_color, None),
+		)
+		if colors != (self.button_icon_color, self.button_icon_hover_color, self.button_icon_pressed_color):
+			self.button_icon_color, self.button_icon_hover_color, self.button_icon_pressed_color = colors
+			self._rebuild_icon_cache()
+			self._invalidate_titlebar()
+	
+	def set_button_icons(
+		self,
+		minimize_icon: Optional[str] = None,
+		maximize_icon: Optional[str] = None,
+		restore_icon: Optional[str] = None,
+		close_icon: Optional[str] = None
+	) -> None:
+		"""
+		Replace one or more standard button icons.
+		
+		Icons passed as None keep their current image.
+		
+		Args:
+			minimize_icon: Path to custom minimize icon
+			maximize_icon: Path to custom maximize icon
+			restore_icon: Path to custom restore icon
+			close_icon: Path to custom close icon
+		"""
+		overrides = {
+			'minimize': minimize_icon,
+			'maximize': maximize_icon,
+			'restore': restore_icon,
+			'close': close_icon,
 		}
+		changed = False
+		for name, path in overrides.items():
+			if path is None:
+				continue
+			self._icon_overrides[name] = path
+			self.btn_imgs.pop(name, None)
+			self._icon_pyramids.pop(name, None)
+			for key in [key for key in self._mask_cache if key[0] == name]:
+				del self._mask_cache[key]
+			changed = True
+		if changed:
+			self._rebuild_icon_cache()
+			self._invalidate_titlebar()
+
+	def set_custom_buttons(self, custom_buttons: Optional[List[Dict]]) -> None:
+		"""
+		Replace the custom titlebar buttons.
+		
+		Button icons are decoded ahead of time on a background thread.
+		
+		Args:
+			custom_buttons: List of custom button dictionaries
+		"""
+		buttons = list(custom_buttons) if custom_buttons else []
+		
+		# Validate custom buttons structure
+		for i, btn in enumerate(buttons):
+			if not isinstance(btn, dict):
+				raise TypeError(f"Custom button at index {i} must be a dictionary")
+		
+		self.custom_buttons = buttons
+		self._buttons_version += 1
+		self.asset_cache.prefetch(btn['icon'] for btn in buttons if btn.get('icon'))
+		self._invalidate_titlebar()
 
 	@property
 	def titlebar_height(self) -> int:
 		"""Get the titlebar height."""
 		return self._titlebar_height
 
-	def _init_window_styles(self) -> None:
-		"""Initialize and apply window styles."""
-		try:
-			style = win32gui.GetWindowLong(self.hwnd, win32con.GWL_STYLE)
-			style = style & ~win32con.WS_CAPTION & ~win32con.WS_THICKFRAME
-			style = style | win32con.WS_MAXIMIZEBOX | win32con.WS_MINIMIZEBOX | win32con.WS_SYSMENU
-			win32gui.SetWindowLong(self.hwnd, win32con.GWL_STYLE, style)
-			
-			ex_style = win32gui.GetWindowLong(self.hwnd, win32con.GWL_EXSTYLE)
-			ex_style = ex_style | win32con.WS_EX_LAYERED
-			win32gui.SetWindowLong(self.hwnd, win32con.GWL_EXSTYLE, ex_style)
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Failed to set window styles: {e}")
-		
-		# Set rounded corners (Windows 11+)
-		try:
-			DWMWA_WINDOW_CORNER_PREFERENCE = 33
-			DWMWCP_ROUND = 2
-			windll.dwmapi.DwmSetWindowAttribute(
-				wintypes.HWND(self.hwnd),
-				DWMWA_WINDOW_CORNER_PREFERENCE,
-				byref(wintypes.INT(DWMWCP_ROUND)),
-				sizeof(wintypes.INT)
+	def _update_metrics(self, scale: float) -> None:
+		"""Derive every scaled titlebar size from the logical sizes and ``scale``."""
+		self.scale = min(MAX_SCALE, max(MIN_SCALE, float(scale)))
+		self._titlebar_height = max(1, round(self._logical_titlebar_height * self.scale))
+		self.button_width = max(1, round(BUTTON_WIDTH * self.scale))
+		self.button_padding = round(PADDING * self.scale)
+		self.title_y_offset = round(TITLE_Y_OFFSET * self.scale)
+		self.RESIZE_BORDER = max(1, round(RESIZE_BORDER * self.scale))
+		self.icon_sizes = {name: max(1, round(size * self.scale)) for name, size in ICON_SIZES.items()}
+		self.ui_font_size = max(1, round(UI_FONT_SIZE * self.scale))
+		self.title_font_size = max(1, round(self.titlebar_font_size * self.scale))
+	
+	@property
+	def FONT(self) -> pygame.font.Font:
+		"""Small UI font (Consolas 18 at scale 1), resolved on first use."""
+		if self._font is None:
+			self._font = self.fonts.get("Consolas", self.ui_font_size)
+		return self._font
+	
+	@FONT.setter
+	def FONT(self, font: pygame.font.Font) -> None:
+		self._font = font
+	
+	@property
+	def HEADER_FONT(self) -> pygame.font.Font:
+		"""Titlebar font, resolved on first use."""
+		if self._header_font is None:
+			self._header_font = self.fonts.get(
+				self.titlebar_font_family,
+				self.title_font_size,
+				bold=self.titlebar_font_bold
 			)
-		except (AttributeError, OSError, Exception):
-			# Rounded corners only work on Windows 11+, ignore errors
-			pass
-
-	def _center_window(self) -> None:
-		"""Center the window on the screen."""
-		try:
-			screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-			screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-			x = max(0, (screen_width - self.width) // 2)
-			y = max(0, (screen_height - self.height) // 2)
-			win32gui.SetWindowPos(self.hwnd, 0, x, y, self.width, self.height, 0)
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Failed to center window: {e}")
-
-	def set_title(self, title: str) -> None:
+		return self._header_font
+	
+	@HEADER_FONT.setter
+	def HEADER_FONT(self, font: pygame.font.Font) -> None:
+		self._header_font = font
+	
+	def _get_layout(self, w: Optional[int] = None, h: Optional[int] = None) -> TitlebarLayout:
 		"""
-		Set the window title.
+		Get the titlebar layout, rebuilding it only when its inputs changed.
 		
 		Args:
-			title: New title text
+			w: Width (defaults to the current width)
+			h: Height (defaults to the current height)
+			
+		Returns:
+			Layout shared by drawing and event handling
 		"""
-		self.title = str(title)
-		try:
-			pygame.display.set_caption(self.title)
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Failed to set title: {e}")
+		key = (
+			self.width if w is None else w,
+			self.height if h is None else h,
+			self.titlebar_height,
+			self.left_notch_width,
+			self.RESIZE_BORDER,
+			self.button_width,
+			self.button_padding,
+			self._buttons_version,
+		)
+		if key != self._layout_key:
+			self._layout = TitlebarLayout(
+				key[0], key[1], self.titlebar_height, self.left_notch_width,
+				[btn.get('left') for btn in self.custom_buttons],
+				self.RESIZE_BORDER, self.button_width, self.button_padding
+			)
+			self._layout_key = key
+		return self._layout
 
-	def handle_event(self, event: pygame.event.Event) -> bool:
+	def get_button_rects(self, window_width: int, x_offset: int = 0) -> Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect]:
 		"""
-		Handle pygame events for window interaction.
+		Calculate button rectangle positions.
 		
 		Args:
-			event: Pygame event object
+			window_width: Width of the window area
+			x_offset: Horizontal offset for buttons
+			
+		Returns:
+			Tuple of (custom_rects, min_rect, max_rect, close_rect)
+		"""
+		return compute_button_rects(
+			window_width, self.titlebar_height,
+			[btn.get('left') for btn in self.custom_buttons if isinstance(btn, dict)],
+			self.button_width, self.button_padding, x_offset=x_offset
+		)
+
+	def _button_background(self, rect: pygame.Rect, kind: str, mouse_pos: Tuple[int, int], mouse_pressed: bool) -> Tuple[int, int, int]:
+		"""Get button background color based on hover/press state."""
+		if not rect.collidepoint(mouse_pos):
+			return self.button_color
+		
+		if kind == 'close':
+			return self.close_button_hover_color if not mouse_pressed else self.close_button_color
+		elif kind == 'custom':
+			return self.button_hover_color
+		else:
+			return (80, 80, 80) if mouse_pressed else self.minmax_button_hover_color
+	
+	def _button_state(self, rect: pygame.Rect, kind: str, mouse_pos: Tuple[int, int], mouse_pressed: bool) -> ButtonState:
+		"""Get the (background color, icon mode) of a button; pairs are shared, not rebuilt."""
+		if not rect.collidepoint(mouse_pos):
+			mode = 'normal'
+		else:
+			mode = 'pressed' if mouse_pressed else 'hover'
+		color = self._button_background(rect, kind, mouse_pos, mouse_pressed)
+		pairs = self._state_pairs.get(color)
+		if pairs is None:
+			pairs = self._state_pairs[color] = {}
+		pair = pairs.get(mode)
+		if pair is None:
+			pair = pairs[mode] = (color, mode)
+		return pair
+	
+	def _button_states_at(
+		self,
+		rects: Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect],
+		mouse_pos: Tuple[int, int],
+		mouse_pressed: bool
+	) -> List[ButtonState]:
+		"""
+		Get the background color and icon mode of every button for a mouse state.
+		
+		Returns:
+			(color, mode) for the custom buttons followed by minimize, maximize
+			and close; mode is 'normal', 'hover' or 'pressed'. The list is
+			reused: it is only valid until the next-but-one call.
+		"""
+		custom_rects, min_rect, max_rect, close_rect = rects
+		# Alternate between two lists so the previous frame's states stay intact
+		states = self._spare_states
+		self._spare_states = self._titlebar_states
+		count = min(len(custom_rects), len(self.custom_buttons))
+		if len(states) != count + 3:
+			# Resized only when the buttons change, so steady frames keep the
+			# list's storage; the slots are filled below
+			states[:] = [None] * (count + 3)
+		for i in range(count):
+			states[i] = self._button_state(custom_rects[i], 'custom', mouse_pos, mouse_pressed)
+		states[count] = self._button_state(min_rect, 'minimize', mouse_pos, mouse_pressed)
+		states[count + 1] = self._button_state(max_rect, 'maximize', mouse_pos, mouse_pressed)
+		states[count + 2] = self._button_state(close_rect, 'close', mouse_pos, mouse_pressed)
+		return states
+	
+	def _theme_key(self) -> Tuple:
+		"""
+		Get a hashable snapshot of everything that styles the titlebar.
+		
+		The snapshot is rebuilt only when the titlebar version changed:
+		_invalidate_titlebar() and every assignment of a different value to a
+		styling attribute bump it.
+		"""
+		if self._theme_key_version != self._titlebar_version:
+			self._theme_key_version = self._titlebar_version
+			self._theme_key_cache = self._build_theme_key()
+		return self._theme_key_cache
+	
+	def _build_theme_key(self) -> Tuple:
+		"""Snapshot everything that styles the titlebar."""
+		return (
+			self._titlebar_version,
+			self.titlebar_color,
+			self.button_color,
+			self.button_hover_color,
+			self.button_icon_color,
+			self.button_icon_hover_color,
+			self.button_icon_pressed_color,
+			self.close_button_color,
+			self.close_button_hover_color,
+			self.minmax_button_hover_color,
+			self.titlebar_border,
+			self.titlebar_border_color,
+			self.titlebar_border_thickness,
+			self.left_notch_width,
+			self.titlebar_height,
+			self.scale,
+		)
+	
+	def _invalidate_titlebar(self) -> None:
+		"""Force a full titlebar re-render on the next draw."""
+		self._titlebar_version += 1
+	
+	def _title_surface(self, max_width: int) -> pygame.Surface:
+		"""
+		Get the rendered (and if needed truncated) title surface.
+		
+		Surfaces are cached by (title, font, color, available width), so the
+		title is only rendered again when one of those changes.
+		
+		Args:
+			max_width: Width available for the title in pixels
+			
+		Returns:
+			Rendered title surface
+		"""
+		font = self.HEADER_FONT
+		key = (self.title, font, TITLE_CLIENT_TEXT, max_width)
+		title_surf = self._title_cache.get(key)
+		if title_surf is None:
+			text = _fit_text(font, self.title, max_width)
+			title_surf = font.render(text, True, TITLE_CLIENT_TEXT)
+			self.title_render_count += 1
+			if len(self._title_cache) >= TITLE_CACHE_SIZE:
+				self._title_cache.pop(next(iter(self._title_cache)))
+			self._title_cache[key] = title_surf
+		return title_surf
+	
+	def _render_titlebar(
+		self,
+		surface: pygame.Surface,
+		w: int,
+		rects: Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect],
+		states: List[ButtonState],
+		clip: Optional[pygame.Rect] = None
+	) -> None:
+		"""
+		Render the titlebar background, title and buttons onto a surface.
+		
+		Args:
+			surface: Target surface (the screen or the retained titlebar surface)
+			w: Window width
+			rects: Button rects as returned by get_button_rects
+			states: Button colors and icon modes as returned by _button_states
+			clip: Optional rect limiting which pixels are touched
+		"""
+		custom_rects, min_rect, max_rect, close_rect = rects
+		surface.set_clip(clip)
+		try:
+			# Draw left notch (transparent or BG_COLOR)
+			if self.left_notch_width > 0:
+				pygame.draw.rect(surface, BG_COLOR, (0, 0, self.left_notch_width, self.titlebar_height))
+				pygame.draw.rect(
+					surface, self.titlebar_color,
+					(self.left_notch_width, 0, w - self.left_notch_width, self.titlebar_height)
+				)
+			else:
+				pygame.draw.rect(surface, self.titlebar_color, (0, 0, w, self.titlebar_height))
+			
+			# Draw title text
+			try:
+				title_x = self.button_padding * 2 + self.left_notch_width
+				# Ensure title doesn't overlap buttons
+				max_title_width = close_rect.x - title_x - self.button_padding
+				title_surf = self._title_surface(max_title_width)
+				title_y = self.titlebar_height // 2 - title_surf.get_height() // 2 + self.title_y_offset
+				surface.blit(title_surf, (title_x, title_y))
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Warning: Failed to render title: {e}")
+			
+			# Draw custom buttons
+			for i, rect in enumerate(custom_rects):
+				if i >= len(self.custom_buttons):
+					continue
+				pygame.draw.rect(surface, states[i][0], rect)
+				btn = self.custom_buttons[i]
+				if 'icon' in btn and btn['icon']:
+					try:
+						icon_img = self.asset_cache.get(
+							btn['icon'], (self.icon_sizes['custom'], self.icon_sizes['custom'])
+						)
+						if icon_img:
+							icon_rect = icon_img.get_rect(center=rect.center)
+							surface.blit(icon_img, icon_rect)
+					except Exception as e:
+						pass
+				elif 'label' in btn and btn['label']:
+					try:
+						label_surf = self.fonts.render(
+							str(btn['label']), self.titlebar_font_family, self.ui_font_size, (255, 255, 255), bold=True
+						)
+						label_rect = label_surf.get_rect(center=rect.center)
+						surface.blit(label_surf, label_rect)
+					except Exception:
+						pass
+			
+			# Draw standard buttons
+			min_bg, max_bg, close_bg = states[-3:]
+			try:
+				# Minimize button
+				pygame.draw.rect(surface, min_bg[0], min_rect)
+				min_icon = self._scaled_icon('minimize', min_bg[1])
+				if min_icon:
+					min_icon_rect = min_icon.get_rect(center=min_rect.center)
+					surface.blit(min_icon, min_icon_rect)
+				
+				# Maximize/Restore button
+				pygame.draw.rect(surface, max_bg[0], max_rect)
+				max_icon = self._scaled_icon('restore' if self.is_maximized else 'maximize', max_bg[1])
+				if max_icon:
+					max_icon_rect = max_icon.get_rect(center=max_rect.center)
+					surface.blit(max_icon, max_icon_rect)
+				
+				# Close button
+				pygame.draw.rect(surface, close_bg[0], close_rect)
+				close_icon = self._scaled_icon('close', close_bg[1])
+				if close_icon:
+					close_icon_rect = close_icon.get_rect(center=close_rect.center)
+					surface.blit(close_icon, close_icon_rect)
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Warning: Failed to draw buttons: {e}")
+			
+			# Draw border if enabled
+			if self.titlebar_border:
+				try:
+					pygame.draw.line(
+						surface, self.titlebar_border_color,
+						(0, self.titlebar_height - 1), (w, self.titlebar_height - 1),
+						self.titlebar_border_thickness
+					)
+				except Exception:
+					pass
+		finally:
+			surface.set_clip(None)
+
+
+class CustomTitleBarWindow(TitlebarRenderer):
+	"""
+	A custom titlebar window manager for Pygame on Windows.
+	
+	Provides a borderless window with custom titlebar, drag-to-move,
+	resize support, and customizable buttons.
+	"""
+	
+	def __init__(
+		self,
+		width: int = 1200,
+		height: int = 700,
+		title: str = "",
+		enable_scroll: bool = False,
+		titlebar_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		button_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		button_hover_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		button_icon_color: Union[Tuple[int, int, int], str] = "white",
+		button_icon_hover_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		button_icon_pressed_color: Optional[Union[Tuple[int, int, int], str]] = None,
+		titlebar_border: bool = False,
+		titlebar_border_color: Tuple[int, int, int] = (0, 0, 0),
+		titlebar_border_thickness: int = 1,
+		titlebar_font_family: str = "Consolas",
+		titlebar_font_size: int = 28,
+		titlebar_font_bold: bool = True,
+		left_notch_width: int = 0,
+		titlebar_height: int = 40,
+		close_button_color: Tuple[int, int, int] = (200, 0, 0),
+		close_button_hover_color: Tuple[int, int, int] = (255, 0, 0),
+		minmax_button_hover_color: Optional[Tuple[int, int, int]] = None,
+		window_icon: Optional[str] = None,
+		minimize_icon: Optional[str] = None,
+		maximize_icon: Optional[str] = None,
+		restore_icon: Optional[str] = None,
+		close_icon: Optional[str] = None,
+		custom_buttons: Optional[List[Dict]] = None,
+		asset_cache: Optional[AssetCache] = None,
+		retained_titlebar: bool = False,
+		on_demand_redraw: bool = False,
+		coalesce_resize: bool = False,
+		resize_realloc_rate: float = RESIZE_REALLOC_RATE,
+		backend: Optional[WindowBackend] = None,
+		profile_frames: bool = False,
+		perf_hud: bool = False,
+		frame_callback: Optional[Callable[[Dict], None]] = None,
+		fast_startup: bool = False,
+		layered: bool = False,
+		callback_workers: int = 0,
+		target_fps: float = MAX_FPS,
+		precise_pacing: bool = False,
+		background_fps: Optional[float] = None,
+		pause_when_hidden: bool = True,
+		frame_budget_mode: bool = False,
+		scale: float = 1.0,
+		input_first: bool = False,
+		late_input_poll: bool = False
+	):
+		"""
+		Initialize the custom titlebar window.
+		
+		Args:
+			width: Window width in pixels (minimum 400)
+			height: Window height in pixels (minimum 300)
+			title: Title text displayed in the titlebar
+			enable_scroll: Enable vertical scrolling support
+			titlebar_color: Background color (RGB tuple or hex string)
+			button_color: Button background color (RGB tuple or hex string)
+			button_hover_color: Button hover color (RGB tuple or hex string)
+			button_icon_color: Icon color (RGB tuple, hex string or color name)
+			button_icon_hover_color: Icon color while a button is hovered
+				(defaults to button_icon_color)
+			button_icon_pressed_color: Icon color while a button is pressed
+				(defaults to the hover color)
+			titlebar_border: Draw border at bottom of titlebar
+			titlebar_border_color: Border color (RGB tuple)
+			titlebar_border_thickness: Border thickness in pixels
+			titlebar_font_family: Font family name
+			titlebar_font_size: Font size in pixels
+			titlebar_font_bold: Use bold font
+			left_notch_width: Width of left notch area
+			titlebar_height: Height of titlebar in pixels
+			close_button_color: Close button color (RGB tuple)
+			close_button_hover_color: Close button hover color (RGB tuple)
+			minmax_button_hover_color: Min/max button hover color (RGB tuple)
+			window_icon: Path to window icon file
+			minimize_icon: Path to custom minimize icon
+			maximize_icon: Path to custom maximize icon
+			restore_icon: Path to custom restore icon
+			close_icon: Path to custom close icon
+			custom_buttons: List of custom button dictionaries
+			asset_cache: Cache for custom button icons (defaults to the shared cache)
+			retained_titlebar: Keep the titlebar in an offscreen surface and only
+				repaint/present the parts that changed
+			on_demand_redraw: Only redraw when an event arrives or a redraw is
+				requested, instead of at a fixed target_fps
+			coalesce_resize: Apply at most one window geometry update per frame
+				during a live resize and show a stretched preview in between
+			resize_realloc_rate: Max display surface reallocations per second
+				while a coalesced resize is in progress
+			backend: Native window-manager backend (defaults to win32)
+			profile_frames: Time each phase of every frame in run() (see get_frame_stats)
+			perf_hud: Show FPS and a frame-time sparkline in the notch or the
+				bottom-right corner (implies profile_frames)
+			frame_callback: Called after every frame with its per-phase timings
+				in ms (implies profile_frames)
+			fast_startup: Only initialise the display subsystem, create the window
+				directly at its centred position and defer icon scaling to the
+				first draw
+			layered: Composite background, content, overlay and titlebar layers
+				and only redraw/present invalidated regions (see invalidate());
+				implies retained_titlebar
+			callback_workers: Run custom button callbacks on a thread pool of
+				this many workers instead of inside handle_event (0 = synchronous)
+			target_fps: Frame rate of the main loop (0 = uncapped)
+			precise_pacing: Pace frames with ``Clock.tick_busy_loop`` (accurate,
+				busy-waits) instead of ``Clock.tick`` (sleeps, low CPU)
+			background_fps: Frame rate while the window is not focused
+				(None = target_fps, 0 = stop rendering)
+			pause_when_hidden: Stop rendering while the window is minimized or
+				hidden, until it is restored
+			frame_budget_mode: Skip draw_content for one frame after a frame
+				that overran its budget (the titlebar is still updated)
+			scale: UI scale (e.g. the monitor's DPI scale) applied to the
+				titlebar height, buttons, icons and fonts; see set_scale()
+			input_first: Drain and apply input at the start of each frame, before
+				rendering, and take button hover/press state from the events
+				instead of polling the mouse
+			late_input_poll: Apply pointer motion that arrived while a frame was
+				drawn just before presenting it (implies input_first)
+		"""
+		# Validate inputs
+		width = max(MIN_WINDOW_WIDTH, int(width))
+		height = max(MIN_WINDOW_HEIGHT, int(height))
+		
+		# Initialize pygame (fonts are initialised on first use by the font registry)
+		self.fast_startup = bool(fast_startup)
+		if self.fast_startup:
+			if not pygame.display.get_init():
+				pygame.display.init()
+		elif not pygame.get_init():
+			pygame.init()
+		
+		self.backend = backend if backend is not None else default_backend()
+		
+		# Style, metrics, layout and the icon, font and title caches
+		super().__init__(
+			TitlebarTheme(
+				titlebar_color=titlebar_color,
+				button_color=button_color,
+				button_hover_color=button_hover_color,
+				button_icon_color=button_icon_color,
+				button_icon_hover_color=button_icon_hover_color,
+				button_icon_pressed_color=button_icon_pressed_color,
+				titlebar_border=titlebar_border,
+				titlebar_border_color=titlebar_border_color,
+				titlebar_border_thickness=titlebar_border_thickness,
+				titlebar_font_family=titlebar_font_family,
+				titlebar_font_size=titlebar_font_size,
+				titlebar_font_bold=titlebar_font_bold,
+				left_notch_width=left_notch_width,
+				titlebar_height=titlebar_height,
+				close_button_color=close_button_color,
+				close_button_hover_color=close_button_hover_color,
+				minmax_button_hover_color=minmax_button_hover_color,
+				minimize_icon=minimize_icon,
+				maximize_icon=maximize_icon,
+				restore_icon=restore_icon,
+				close_icon=close_icon,
+				scale=scale,
+			),
+			title=title,
+			custom_buttons=custom_buttons,
+			asset_cache=asset_cache,
+			width=width,
+			height=height,
+		)
+		self.enable_scroll = bool(enable_scroll)
+		
+		# Retained titlebar state: the offscreen surface, the rects repainted
+		# by the last draw (reused every frame) and the presented regions
+		self.retained_titlebar = bool(retained_titlebar) or bool(layered)
+		self.titlebar_pixels_repainted = 0
+		self._titlebar_surface: Optional[pygame.Surface] = None
+		self._titlebar_key: Optional[Tuple] = None
+		self._titlebar_dirty_rects: List[pygame.Rect] = []
+		self._repainted: List[pygame.Rect] = []
+		self._full_present = True
+		self._cursor_edge: Optional[str] = None
+		
+		# Set window/taskbar icon if provided
+		if window_icon is not None:
+			try:
+				if os.path.exists(window_icon):
+					icon_surface = pygame.image.load(window_icon)
+					pygame.display.set_icon(icon_surface)
+				else:
+					print(f"[easy_custom_titlebar] Warning: Window icon file not found: {window_icon}")
+			except (pygame.error, FileNotFoundError, OSError) as e:
+				print(f"[easy_custom_titlebar] Failed to set window icon: {e}")
+		
+		# Create window (in fast startup mode directly at its centred position)
+		window_pos = self._centered_position() if self.fast_startup else None
+		previous_pos = os.environ.get("SDL_VIDEO_WINDOW_POS")
+		try:
+			if window_pos is not None:
+				os.environ["SDL_VIDEO_WINDOW_POS"] = f"{window_pos[0]},{window_pos[1]}"
+			self.screen = pygame.display.set_mode((self.width, self.height), pygame.NOFRAME)
+			pygame.display.set_caption(self.title)
+		except pygame.error as e:
+			raise RuntimeError(f"Failed to create window: {e}")
+		finally:
+			if window_pos is not None:
+				if previous_pos is None:
+					os.environ.pop("SDL_VIDEO_WINDOW_POS", None)
+				else:
+					os.environ["SDL_VIDEO_WINDOW_POS"] = previous_pos
+		
+		# Get window handle - more reliable method
+		self.hwnd = self._get_window_handle()
+		if not self.hwnd:
+			raise RuntimeError("Failed to acquire window handle")
+		
+		self._init_window_styles()
+		if window_pos is None:
+			self._center_window()
+		# Window state
+		self.dragging = False
+		self.drag_offset = (0, 0)
+		self._drag_origin: Optional[Tuple[int, int]] = None
+		self._drag_bounds = (0, 0, 0)
+		self._drag_stats = {'motion_events': 0, 'coalesced': 0, 'window_moves': 0}
+		self.motion_events_coalesced = 0
+		self.resizing = False
+		self.resize_edge: Optional[str] = None
+		self.original_size = (self.width, self.height)
+		self.original_pos = (0, 0)
+		self.resize_start_size: Optional[Tuple[int, int]] = None
+		self.resize_start_pos: Optional[Tuple[int, int]] = None
+		self.resize_mouse_start: Optional[Tuple[int, int]] = None
+		self.coalesce_resize = bool(coalesce_resize)
+		self.resize_realloc_rate = max(0.1, float(resize_realloc_rate))
+		self._pending_resize_pos: Optional[Tuple[int, int]] = None
+		self._resize_geometry: Optional[Tuple[int, int, int, int]] = None
+		self._resize_snapshot: Optional[pygame.Surface] = None
+		self._last_realloc = 0.0
+		self._resize_stats = {'motion_events': 0, 'geometry_updates': 0, 'reallocations': 0, 'surfaces_reused': 0}
+		self.scroll_y = 0.0
+		self.scroll_viewport: Optional[ScrollViewport] = None
+		
+		# Layered compositing (None unless enabled)
+		self.compositor: Optional[Compositor] = None
+		self.pixels_composited = 0
+		self._draw_content: Optional[Callable] = None
+		self._composited_scroll: Optional[float] = None
+		if layered:
+			self.compositor = Compositor((self.width, self.height), BG_COLOR)
+			self.compositor.set_painter('content', self._paint_content_layer)
+		self.running = True
+		
+		# Redraw scheduling
+		self.on_demand_redraw = bool(on_demand_redraw)
+		self.frame_count = 0
+		self._redraw_requested = True
+		self._animation_interval: Optional[float] = None
+		self._next_animation_frame = 0.0
+		self._run_started: Optional[Tuple[float, float, int]] = None
+		
+		# Frame pacing and background throttling
+		self.target_fps = max(0.0, float(target_fps or 0))
+		self.precise_pacing = bool(precise_pacing)
+		self.background_fps = None if background_fps is None else max(0.0, float(background_fps))
+		self.pause_when_hidden = bool(pause_when_hidden)
+		self.frame_budget_mode = bool(frame_budget_mode)
+		self._window_state = {'minimized': False, 'hidden': False, 'focused': True}
+		self._frame_overran = False
+		self._paused_since: Optional[float] = None
+		self._pacing_stats = {'content_skipped': 0, 'frames_skipped': 0, 'pauses': 0, 'paused_seconds': 0.0}
+		
+		# Input-first pipeline: pointer (position, left button down) as of the
+		# last applied event, None until the first one
+		self.input_first = bool(input_first) or bool(late_input_poll)
+		self.late_input_poll = bool(late_input_poll)
+		self._pointer: Optional[Tuple[Tuple[int, int], bool]] = None
+		# Input-to-present latency while profiling: receive time (ns) of the
+		# oldest unpresented event of each type, and samples per event type
+		self._unpresented_input: Dict[int, int] = {}
+		self._input_latency: Dict[int, deque] = {}
+		# Event trace being recorded (None when not recording)
+		self.event_recorder: Optional[EventRecorder] = None
+		
+		# Frame profiling (None when disabled, so the loop only pays for a None check)
+		self.perf_hud = bool(perf_hud)
+		self.profiler: Optional[FrameProfiler] = None
+		if profile_frames or self.perf_hud or frame_callback is not None:
+			self.profiler = FrameProfiler(self._frame_budget() * 1000.0, callback=frame_callback)
+		self._hud_label: Tuple[str, Optional[pygame.Surface]] = ("", None)
+		
+		# Allocation tracking (debug mode, see track_allocations)
+		self.alloc_tracker: Optional[AllocationTracker] = None
+		self._tracking: Optional[AllocationTracker] = None
+		
+		# Off-thread button callbacks and the thread-safe command queue
+		self.callback_workers = max(0, int(callback_workers))
+		self._executor: Optional[ThreadPoolExecutor] = None
+		self._busy_buttons = set()
+		self.commands = WindowCommandQueue(wake=self._wake_loop)
+		
+		# run_async() state: pending async callbacks and loop blocking times
+		self._async_tasks = set()
+		self._loop_blocks: deque = deque(maxlen=300)
+		self._async_stats = {'iterations': 0, 'over_budget': 0, 'max_block_ns': 0}
+		
+		# Stock icons are scaled and tinted once the display exists
+		if not self.fast_startup:
+			self._rebuild_icon_cache()
+	
+	def _get_window_handle(self) -> Optional[int]:
+		"""Get the window handle more reliably."""
+		try:
+			# Try to get handle from pygame window
+			hwnd_str = pygame.display.get_wm_info().get('window')
+			if hwnd_str:
+				return int(hwnd_str)
+		except (AttributeError, KeyError, ValueError):
+			pass
+		
+		# Fall back to the backend's own lookup
+		try:
+			return self.backend.find_window_handle(self.title)
+		except Exception:
+			return None
+	
+	def _apply_metrics(self, scale: float) -> bool:
+		"""
+		Recompute the titlebar metrics and everything derived from them in one pass.
+		
+		Fonts are resolved again, icons are rescaled from their mip pyramids
+		(sources are not decoded again) and the layout and hit-test geometry
+		are rebuilt on their next use.
+		
+		Returns:
+			True if any size changed
+		"""
+		before = (self.scale, self._titlebar_height)
+		self._update_metrics(scale)
+		if (self.scale, self._titlebar_height) == before:
+			return False
+		self._font = None
+		self._header_font = None
+		self._mask_cache.clear()
+		if self.fast_startup:
+			self._icon_cache.clear()
+		else:
+			self._rebuild_icon_cache()
+		self._hud_label = ("", None)
+		if self.compositor is not None:
+			self.compositor.invalidate_all()
+		self._invalidate_titlebar()
+		self.request_redraw()
+		return True
+	
+	def set_scale(self, scale: float) -> None:
+		"""
+		Change the UI scale (e.g. when the window moves to a monitor with another DPI).
+		
+		The titlebar height, button sizes, icons, fonts, resize border and
+		hit-test geometry are all updated at once. The left notch width and
+		custom button ``left`` positions are window pixels and not scaled.
+		
+		Args:
+			scale: New scale (clamped to MIN_SCALE..MAX_SCALE; 1.0 = unscaled)
+		"""
+		self._apply_metrics(scale)
+	
+	def set_titlebar_height(self, titlebar_height: int) -> None:
+		"""
+		Change the titlebar height at runtime.
+		
+		Args:
+			titlebar_height: Height in pixels before scaling (minimum 20)
+		"""
+		self._logical_titlebar_height = max(20, int(titlebar_height))
+		self._apply_metrics(self.scale)
+	
+	def _init_window_styles(self) -> None:
+		"""Initialize and apply window styles."""
+		try:
+			self.backend.apply_styles(self.hwnd)
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to set window styles: {e}")
+
+	def _centered_position(self) -> Optional[Tuple[int, int]]:
+		"""Get the top-left position that centers the window, or None if unknown."""
+		try:
+			screen_width, screen_height = self.backend.get_screen_size()
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to get screen size: {e}")
+			return None
+		return max(0, (screen_width - self.width) // 2), max(0, (screen_height - self.height) // 2)
+	
+	def _center_window(self) -> None:
+		"""Center the window on the screen."""
+		try:
+			pos = self._centered_position()
+			if pos is not None:
+				self.backend.set_window_rect(self.hwnd, pos[0], pos[1], self.width, self.height)
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to center window: {e}")
+
+	def set_title(self, title: str) -> None:
+		"""
+		Set the window title.
+		
+		Args:
+			title: New title text
+		"""
+		self.title = str(title)
+		try:
+			pygame.display.set_caption(self.title)
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to set title: {e}")
+
+	def handle_event(self, event: pygame.event.Event) -> bool:
+		"""
+		Handle pygame events for window interaction.
+		
+		Args:
+			event: Pygame event object
 			
 		Returns:
 			True if event was handled, False otherwise
 		"""
+		if self.event_recorder is not None:
+			self.event_recorder.record(event)
+		return self._handle_event(event)
+	
+	def _handle_event(self, event: pygame.event.Event) -> bool:
+		"""Handle an event for window interaction (drag, resize, window controls)."""
 		try:
 			if event.type == pygame.MOUSEBUTTONDOWN:
 				if event.button == 1:
-					mouse_pos = pygame.mouse.get_pos()
+					mouse_pos = getattr(event, 'pos', None) or pygame.mouse.get_pos()
+					layout = self._get_layout()
+					region, target = layout.hit_test(mouse_pos)
 					
 					# Check for resize area
-					if self.is_resize_area(mouse_pos):
+					if region == HIT_RESIZE:
 						self.resizing = True
-						self.resize_edge = self.get_resize_edge(mouse_pos)
+						self.resize_edge = target
 						if self.hwnd and self.resize_edge:
 							try:
-								rect = win32gui.GetWindowRect(self.hwnd)
+								rect = self.backend.get_window_rect(self.hwnd)
 								if rect:
 									self.resize_start_size = (rect[2] - rect[0], rect[3] - rect[1])
 									self.resize_start_pos = (rect[0], rect[1])
 									self.resize_mouse_start = mouse_pos
+									self._begin_resize_gesture()
 									return True
 							except Exception as e:
 								print(f"[easy_custom_titlebar] Warning: Resize init failed: {e}")
 								self.resizing = False
 								self.resize_edge = None
+						region, target = layout.hit_test(mouse_pos, include_resize=False)
 					
-					# Check titlebar area for dragging or button clicks
-					try:
-						w = self.screen.get_size()[0]
-					except (AttributeError, pygame.error):
-						return False
-					
-					if self.left_notch_width > 0:
-						custom_rects, min_rect, max_rect, close_rect = self.get_button_rects(
-							w - self.left_notch_width, x_offset=self.left_notch_width
-						)
-					else:
-						custom_rects, min_rect, max_rect, close_rect = self.get_button_rects(w)
-					
-					if mouse_pos[1] < self.titlebar_height:
-						# Custom button clicks
-						for i, rect in enumerate(custom_rects):
-							if i < len(self.custom_buttons) and rect.collidepoint(mouse_pos):
-								btn = self.custom_buttons[i]
-								if isinstance(btn, dict) and 'callback' in btn and callable(btn['callback']):
-									try:
-										btn['callback']()
-									except Exception as e:
-										print(f"[easy_custom_titlebar] Warning: Custom button callback error: {e}")
-									return True
-						
-						# Start dragging if not clicking on standard buttons
-						if not (min_rect.collidepoint(mouse_pos) or
-						        max_rect.collidepoint(mouse_pos) or
-						        close_rect.collidepoint(mouse_pos)):
-							self.dragging = True
-							self.drag_offset = (mouse_pos[0], mouse_pos[1])
+					# Custom button clicks
+					if region == HIT_BUTTON and isinstance(target, int) and target < len(self.custom_buttons):
+						btn = self.custom_buttons[target]
+						if isinstance(btn, dict) and 'callback' in btn and callable(btn['callback']):
+							try:
+								if self.callback_workers and not asyncio.iscoroutinefunction(btn['callback']):
+									self._submit_callback(target, btn['callback'])
+								else:
+									self._invoke_callback(btn['callback'])
+							except Exception as e:
+								print(f"[easy_custom_titlebar] Warning: Custom button callback error: {e}")
 							return True
+						region = HIT_DRAG
+					
+					# Start dragging if not clicking on standard buttons
+					if region == HIT_DRAG:
+						self.dragging = True
+						self.drag_offset = (mouse_pos[0], mouse_pos[1])
+						self._begin_drag_gesture()
+						return True
 			
 			elif event.type == pygame.MOUSEBUTTONUP:
 				if event.button == 1:
+					if self.resizing and self.coalesce_resize:
+						self._flush_pending_resize(final=True)
 					self.dragging = False
+					self._drag_origin = None
 					self.resizing = False
 					self.resize_edge = None
 					self.resize_start_size = None
@@ -433,6 +1424,7 @@ class CustomTitleBarWindow:
 			
 			elif event.type == pygame.MOUSEMOTION:
 				if self.dragging:
+					self._drag_stats['motion_events'] += 1
 					self.handle_drag(event.pos)
 				elif self.resizing:
 					self.handle_resize(event.pos)
@@ -443,19 +1435,122 @@ class CustomTitleBarWindow:
 		
 		return False
 
+	def _invoke_callback(self, callback: Callable) -> None:
+		"""Call a button callback; coroutines are scheduled on the running event loop."""
+		result = callback()
+		if inspect.isawaitable(result):
+			self._schedule_awaitable(result)
+	
+	def _submit_callback(self, index: int, callback: Callable) -> None:
+		"""
+		Run a button callback on the worker pool.
+		
+		Each button has at most one callback in flight; clicks while it runs
+		are ignored. The result comes back as a CALLBACK_DONE_EVENT.
+		"""
+		if index in self._busy_buttons:
+			return
+		if self._executor is None:
+			self._executor = ThreadPoolExecutor(
+				max_workers=self.callback_workers, thread_name_prefix="easy_custom_titlebar"
+			)
+		self._busy_buttons.add(index)
+		self._executor.submit(self._run_callback_in_worker, index, callback)
+	
+	@staticmethod
+	def _run_callback_in_worker(index: int, callback: Callable) -> None:
+		"""Worker thread: run the callback and post its outcome to the main loop."""
+		result, error = None, None
+		try:
+			result = callback()
+		except Exception as e:
+			error = e
+		try:
+			pygame.event.post(pygame.event.Event(CALLBACK_DONE_EVENT, button=index, result=result, error=error))
+		except pygame.error:
+			pass
+	
+	def _finish_callback(self, event: pygame.event.Event) -> None:
+		"""Main thread: handle a CALLBACK_DONE_EVENT."""
+		index = getattr(event, 'button', None)
+		self._busy_buttons.discard(index)
+		error = getattr(event, 'error', None)
+		if error is not None:
+			print(f"[easy_custom_titlebar] Warning: Custom button callback error: {error}")
+		elif isinstance(index, int) and index < len(self.custom_buttons):
+			on_result = self.custom_buttons[index].get('on_result')
+			if callable(on_result):
+				try:
+					on_result(getattr(event, 'result', None))
+				except Exception as e:
+					print(f"[easy_custom_titlebar] Warning: Custom button on_result error: {e}")
+		self.request_redraw()
+	
+	def _wake_loop(self) -> None:
+		"""Wake a loop blocked in pygame.event.wait (safe from any thread)."""
+		try:
+			pygame.event.post(pygame.event.Event(REDRAW_EVENT))
+		except pygame.error:
+			pass
+	
+	def _apply_commands(self) -> None:
+		"""Apply the commands queued by other threads since the last frame."""
+		batch = self.commands.drain()
+		if batch is None:
+			return
+		if batch.title is not None:
+			self.set_title(batch.title)
+		if batch.buttons:
+			buttons = [dict(btn) for btn in self.custom_buttons]
+			for index, changes in batch.buttons.items():
+				if 0 <= index < len(buttons):
+					buttons[index].update(changes)
+			self.set_custom_buttons(buttons)
+		for func, args in batch.calls:
+			try:
+				func(*args)
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Warning: Queued command error: {e}")
+		self._redraw_requested = True
+	
+	def _schedule_awaitable(self, awaitable) -> None:
+		"""Run an awaitable returned by a callback as a task on the running loop."""
+		try:
+			asyncio.get_running_loop()
+		except RuntimeError:
+			print("[easy_custom_titlebar] Warning: Async button callbacks require run_async(); callback skipped")
+			if hasattr(awaitable, 'close'):
+				awaitable.close()
+			return
+		task = asyncio.ensure_future(awaitable)
+		self._async_tasks.add(task)
+		task.add_done_callback(self._async_callback_done)
+	
+	def _async_callback_done(self, task: "asyncio.Future") -> None:
+		"""Report errors of a finished async callback and redraw."""
+		self._async_tasks.discard(task)
+		if task.cancelled():
+			return
+		error = task.exception()
+		if error is not None:
+			print(f"[easy_custom_titlebar] Warning: Custom button callback error: {error}")
+		self.request_redraw()
+	
 	def update_cursor(self, pos: Tuple[int, int]) -> None:
 		"""Update mouse cursor based on position."""
 		try:
-			if self.is_resize_area(pos):
-				edge = self.get_resize_edge(pos)
-				if edge in ['left', 'right']:
-					pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZEWE)
-				elif edge in ['top', 'bottom']:
-					pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZENS)
-				elif edge in ['topleft', 'bottomright']:
-					pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZENWSE)
-				elif edge in ['topright', 'bottomleft']:
-					pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZENESW)
+			edge = self.get_resize_edge(pos)
+			if edge == self._cursor_edge:
+				return
+			self._cursor_edge = edge
+			if edge in ['left', 'right']:
+				pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZEWE)
+			elif edge in ['top', 'bottom']:
+				pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZENS)
+			elif edge in ['topleft', 'bottomright']:
+				pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZENWSE)
+			elif edge in ['topright', 'bottomleft']:
+				pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_SIZENESW)
 			else:
 				pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
 		except Exception as e:
@@ -464,428 +1559,1384 @@ class CustomTitleBarWindow:
 
 	def is_resize_area(self, pos: Tuple[int, int]) -> bool:
 		"""Check if position is in window resize border area."""
-		try:
-			x, y = pos
-			w, h = self.screen.get_size()
-			return (x < self.RESIZE_BORDER or x > w - self.RESIZE_BORDER or
-			        y < self.RESIZE_BORDER or y > h - self.RESIZE_BORDER)
-		except (AttributeError, pygame.error, TypeError):
-			return False
+		return self.get_resize_edge(pos) is not None
 
 	def get_resize_edge(self, pos: Tuple[int, int]) -> Optional[str]:
 		"""Get which edge the resize position is on."""
 		try:
-			x, y = pos
-			w, h = self.screen.get_size()
-			
-			if x < self.RESIZE_BORDER:
-				if y < self.RESIZE_BORDER:
-					return 'topleft'
-				elif y > h - self.RESIZE_BORDER:
-					return 'bottomleft'
-				return 'left'
-			elif x > w - self.RESIZE_BORDER:
-				if y < self.RESIZE_BORDER:
-					return 'topright'
-				elif y > h - self.RESIZE_BORDER:
-					return 'bottomright'
-				return 'right'
-			elif y < self.RESIZE_BORDER:
-				return 'top'
-			elif y > h - self.RESIZE_BORDER:
-				return 'bottom'
-		except (AttributeError, pygame.error, TypeError):
-			pass
-		return None
+			return self._get_layout().resize_edge(pos)
+		except (AttributeError, pygame.error, TypeError, ValueError):
+			return None
 
+	def _begin_drag_gesture(self) -> None:
+		"""Capture the window origin and screen bounds once at the start of a drag."""
+		self._drag_stats = {'motion_events': 0, 'coalesced': 0, 'window_moves': 0}
+		self._drag_origin = None
+		if not self.hwnd:
+			return
+		try:
+			rect = self.backend.get_window_rect(self.hwnd)
+			if rect:
+				self._drag_origin = (rect[0], rect[1])
+				self._drag_bounds = (rect[2] - rect[0],) + tuple(self.backend.get_screen_size())
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Drag failed: {e}")
+	
 	def handle_drag(self, pos: Tuple[int, int]) -> None:
-		"""Handle window dragging."""
+		"""
+		Handle window dragging.
+		
+		The window origin is tracked locally from the start of the drag, so a
+		move costs a single native call.
+		"""
 		if not self.is_maximized and self.hwnd:
 			try:
-				rect = win32gui.GetWindowRect(self.hwnd)
-				if rect:
-					x = rect[0] + (pos[0] - self.drag_offset[0])
-					y = rect[1] + (pos[1] - self.drag_offset[1])
-					# Ensure window stays on screen
-					screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-					screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-					window_width = rect[2] - rect[0]
-					window_height = rect[3] - rect[1]
-					x = max(-window_width + 50, min(x, screen_width - 50))
-					y = max(0, min(y, screen_height - 50))
-					win32gui.SetWindowPos(self.hwnd, 0, x, y, 0, 0, win32con.SWP_NOSIZE)
+				if self._drag_origin is None:
+					self._begin_drag_gesture()
+					if self._drag_origin is None:
+						return
+				origin_x, origin_y = self._drag_origin
+				window_width, screen_width, screen_height = self._drag_bounds
+				x = origin_x + (pos[0] - self.drag_offset[0])
+				y = origin_y + (pos[1] - self.drag_offset[1])
+				# Ensure window stays on screen
+				x = max(-window_width + 50, min(x, screen_width - 50))
+				y = max(0, min(y, screen_height - 50))
+				if (x, y) != self._drag_origin:
+					self.backend.move_window(self.hwnd, x, y)
+					self._drag_origin = (x, y)
+					self._drag_stats['window_moves'] += 1
 			except Exception as e:
 				print(f"[easy_custom_titlebar] Warning: Drag failed: {e}")
+	
+	def get_drag_stats(self) -> Dict[str, int]:
+		"""
+		Get counters for the current (or last) drag gesture.
+		
+		Returns:
+			Dict with motion_events (handled), coalesced (dropped as stale)
+			and window_moves (native move calls)
+		"""
+		return dict(self._drag_stats)
+	
+	def _coalesce_motion(self, events: List[pygame.event.Event]) -> List[pygame.event.Event]:
+		"""
+		Collapse each run of consecutive MOUSEMOTION events into its latest position.
+		
+		Relative motion is summed, and ordering relative to other events is kept.
+		
+		Args:
+			events: Events drained from the queue
+			
+		Returns:
+			The compressed event list
+		"""
+		if len(events) < 2:
+			return events
+		result: List[pygame.event.Event] = []
+		run: List[pygame.event.Event] = []
+		for event in events + [None]:
+			if event is not None and event.type == pygame.MOUSEMOTION:
+				run.append(event)
+				continue
+			if len(run) == 1:
+				result.append(run[0])
+			elif run:
+				last = run[-1]
+				rel = (sum(e.rel[0] for e in run), sum(e.rel[1] for e in run))
+				result.append(pygame.event.Event(pygame.MOUSEMOTION, dict(last.dict, rel=rel)))
+				self.motion_events_coalesced += len(run) - 1
+				if self.dragging:
+					self._drag_stats['coalesced'] += len(run) - 1
+			run = []
+			if event is not None:
+				result.append(event)
+		return result
 
-	def handle_resize(self, pos: Tuple[int, int]) -> None:
-		"""Handle window resizing."""
+	def _compute_resize_geometry(self, pos: Tuple[int, int]) -> Optional[Tuple[int, int, int, int]]:
+		"""
+		Compute the window rect for the current resize gesture.
+		
+		Args:
+			pos: Mouse position in window coordinates
+			
+		Returns:
+			(x, y, w, h), or None if no resize is in progress
+		"""
 		if (self.is_maximized or not self.hwnd or not self.resize_start_size or
 		    not self.resize_start_pos or not self.resize_mouse_start or not self.resize_edge):
+			return None
+		
+		start_x, start_y = self.resize_start_pos
+		start_w, start_h = self.resize_start_size
+		mouse_start_x, mouse_start_y = self.resize_mouse_start
+		dx = pos[0] - mouse_start_x
+		dy = pos[1] - mouse_start_y
+		x, y = start_x, start_y
+		w, h = start_w, start_h
+		
+		# Get screen bounds
+		screen_width, screen_height = self.backend.get_screen_size()
+		
+		if self.resize_edge in ['left', 'topleft', 'bottomleft']:
+			new_width = start_w - dx
+			if new_width >= MIN_WINDOW_WIDTH and x + dx >= 0:
+				x = start_x + dx
+				w = new_width
+		if self.resize_edge in ['right', 'topright', 'bottomright']:
+			new_width = start_w + dx
+			if new_width >= MIN_WINDOW_WIDTH and x + new_width <= screen_width:
+				w = new_width
+		if self.resize_edge in ['top', 'topleft', 'topright']:
+			new_height = start_h - dy
+			if new_height >= MIN_WINDOW_HEIGHT and y + dy >= 0:
+				y = start_y + dy
+				h = new_height
+		if self.resize_edge in ['bottom', 'bottomleft', 'bottomright']:
+			new_height = start_h + dy
+			if new_height >= MIN_WINDOW_HEIGHT and y + new_height <= screen_height:
+				h = new_height
+		
+		# Ensure minimum size
+		return x, y, max(MIN_WINDOW_WIDTH, w), max(MIN_WINDOW_HEIGHT, h)
+	
+	def _resize_display(self, size: Tuple[int, int]) -> bool:
+		"""
+		Give the display surface a new size.
+		
+		With a backend that resizes in place the window surface already has
+		the new size and is only picked up again; otherwise the display is
+		recreated with ``set_mode``.
+		
+		Returns:
+			True if the existing window surface was reused
+		
+		Raises:
+			pygame.error: If the display could not be recreated
+		"""
+		if self.backend.resizes_in_place:
+			surface = pygame.display.get_surface()
+			if surface is not None and surface.get_size() == tuple(size):
+				self.screen = surface
+				return True
+		self.screen = pygame.display.set_mode(size, pygame.NOFRAME)
+		return False
+	
+	def _reallocate_display(self, size: Tuple[int, int]) -> bool:
+		"""
+		Recreate (or, with an in-place backend, pick up) the display surface at a new size.
+		
+		Returns:
+			True on success
+		"""
+		try:
+			reused = self._resize_display(size)
+		except pygame.error as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to resize display: {e}")
+			return False
+		self._resize_stats['surfaces_reused' if reused else 'reallocations'] += 1
+		self._invalidate_titlebar()
+		return True
+	
+	def handle_resize(self, pos: Tuple[int, int]) -> None:
+		"""
+		Handle window resizing.
+		
+		With ``coalesce_resize`` the position is only recorded here and applied
+		once per frame by the main loop.
+		"""
+		self._resize_stats['motion_events'] += 1
+		if self.coalesce_resize:
+			self._pending_resize_pos = pos
+			return
+		
+		try:
+			geometry = self._compute_resize_geometry(pos)
+			if geometry is None:
+				return
+			x, y, w, h = geometry
+			
+			# Update window
+			self.backend.set_window_rect(self.hwnd, x, y, w, h)
+			self._resize_stats['geometry_updates'] += 1
+			self.width = w
+			self.height = h
+			self._reallocate_display((w, h))
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Resize failed: {e}")
+	
+	def _begin_resize_gesture(self) -> None:
+		"""Reset per-gesture resize counters and capture the preview snapshot."""
+		self._resize_stats = {'motion_events': 0, 'geometry_updates': 0, 'reallocations': 0, 'surfaces_reused': 0}
+		self._pending_resize_pos = None
+		self._resize_geometry = None
+		self._last_realloc = time.perf_counter()
+		if self.coalesce_resize and not self.backend.resizes_in_place:
+			try:
+				self._resize_snapshot = self.screen.copy()
+			except (AttributeError, pygame.error):
+				self._resize_snapshot = None
+	
+	def _flush_pending_resize(self, final: bool = False) -> None:
+		"""
+		Apply the latest coalesced resize position.
+		
+		Called once per frame: the native window geometry is updated at most
+		once, and the display surface is reallocated at most
+		``resize_realloc_rate`` times per second, showing a stretched copy of
+		the last full frame. ``final`` (mouse-up) forces the full-resolution
+		reallocation. A backend that resizes in place has already resized the
+		window surface, so it is picked up on every update.
+		"""
+		pos = self._pending_resize_pos
+		self._pending_resize_pos = None
+		try:
+			if pos is not None:
+				geometry = self._compute_resize_geometry(pos)
+				if geometry is not None and geometry != self._resize_geometry:
+					x, y, w, h = geometry
+					self.backend.set_window_rect(self.hwnd, x, y, w, h)
+					self._resize_stats['geometry_updates'] += 1
+					self._resize_geometry = geometry
+					self.width = w
+					self.height = h
+			
+			if self._resize_geometry is None:
+				return
+			size = self._resize_geometry[2:]
+			now = time.perf_counter()
+			if size == self.screen.get_size():
+				return
+			if final or self.backend.resizes_in_place:
+				self._reallocate_display(size)
+				self._resize_snapshot = None
+			elif now - self._last_realloc >= 1.0 / self.resize_realloc_rate:
+				if self._reallocate_display(size):
+					self._last_realloc = now
+					if self._resize_snapshot is not None:
+						self.screen.blit(pygame.transform.scale(self._resize_snapshot, size), (0, 0))
+						pygame.display.flip()
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Resize failed: {e}")
+	
+	def get_resize_stats(self) -> Dict[str, int]:
+		"""
+		Get counters for the current (or last) resize gesture.
+		
+		Maximize and restore add to the same counters until the next
+		gesture starts.
+		
+		Returns:
+			Dict with motion_events, geometry_updates, reallocations (display
+			recreated with set_mode) and surfaces_reused (resized in place)
+		"""
+		return dict(self._resize_stats)
+
+	def maximize_window(self) -> None:
+		"""Maximize or restore the window."""
+		if not self.hwnd:
+			return
+		
+		try:
+			if not self.is_maximized:
+				rect = self.backend.get_window_rect(self.hwnd)
+				if rect:
+					self.original_size = (rect[2] - rect[0], rect[3] - rect[1])
+					self.original_pos = (rect[0], rect[1])
+				x, y = 0, 0
+				w, h = self.backend.get_screen_size()
+				self.backend.set_window_rect(self.hwnd, x, y, w, h, bring_to_top=True)
+				self.width = w
+				self.height = h
+				self._reallocate_display((w, h))
+			else:
+				self.backend.set_window_rect(
+					self.hwnd,
+					self.original_pos[0], self.original_pos[1],
+					self.original_size[0], self.original_size[1],
+					bring_to_top=True
+				)
+				self.width = self.original_size[0]
+				self.height = self.original_size[1]
+				self._reallocate_display(self.original_size)
+			self.is_maximized = not self.is_maximized
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Maximize/restore failed: {e}")
+
+	def minimize_window(self) -> None:
+		"""Minimize the window."""
+		if self.hwnd:
+			try:
+				self.backend.minimize(self.hwnd)
+				self._set_window_state('minimized', True)
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Warning: Minimize failed: {e}")
+
+	def close_window(self) -> None:
+		"""Close the window and clean up resources."""
+		self.running = False
+		if self.hwnd:
+			try:
+				self.backend.destroy(self.hwnd)
+			except Exception:
+				pass
+
+	def _button_states(self, rects: Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect]) -> List[ButtonState]:
+		"""
+		Get the background color and icon mode of every button for the current mouse state.
+		
+		With ``input_first`` the mouse state is the one of the last applied
+		event, so the frame matches the input that was processed for it.
+		
+		Returns:
+			The states as returned by _button_states_at
+		"""
+		if self.input_first and self._pointer is not None:
+			mouse_pos, mouse_pressed = self._pointer
+		else:
+			mouse_pos = pygame.mouse.get_pos()
+			pressed = pygame.mouse.get_pressed()
+			mouse_pressed = bool(pressed[0]) if pressed else False
+		return self._button_states_at(rects, mouse_pos, mouse_pressed)
+	
+	def _invalidate_titlebar(self) -> None:
+		"""Force a full titlebar re-render and a full-screen present on the next frame."""
+		self._titlebar_version += 1
+		self._full_present = True
+	
+	def _present(self, content_drawn: bool) -> None:
+		"""
+		Show the frame on screen.
+		
+		In retained mode only the repainted titlebar regions (and the content
+		area, if it was drawn) are presented; otherwise the whole screen is flipped.
+		
+		Args:
+			content_drawn: Whether the content area was redrawn this frame
+		"""
+		if not self.retained_titlebar or self._full_present:
+			pygame.display.flip()
+		else:
+			rects = self._titlebar_dirty_rects
+			if content_drawn:
+				w, h = self.screen.get_size()
+				rects.append(pygame.Rect(0, self.titlebar_height, w, h - self.titlebar_height))
+			if rects:
+				pygame.display.update(rects)
+		self._titlebar_dirty_rects.clear()
+		self._full_present = False
+		if self._unpresented_input:
+			self._record_input_latency()
+	
+	def draw_titlebar(self) -> Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect]:
+		"""
+		Draw the titlebar and all buttons.
+		
+		The returned rects belong to the cached layout and must not be modified.
+		In retained mode the titlebar is kept in an offscreen surface and only
+		the regions whose inputs changed are repainted and copied to the screen.
+		
+		Returns:
+			Tuple of (custom_rects, min_rect, max_rect, close_rect)
+		"""
+		try:
+			w, h = self.screen.get_size()
+		except (AttributeError, pygame.error):
+			return [], pygame.Rect(0, 0, 0, 0), pygame.Rect(0, 0, 0, 0), pygame.Rect(0, 0, 0, 0)
+		
+		if w != self.width or h != self.height:
+			self.width, self.height = w, h
+		layout = self._get_layout()
+		rects = layout.rects
+		states = self._button_states(rects)
+		
+		if not self.retained_titlebar:
+			self._titlebar_states = states
+			self.screen.fill(BG_COLOR)
+			self._render_titlebar(self.screen, w, rects, states)
+			self.titlebar_pixels_repainted = w * self.titlebar_height
+			return rects
+		
+		dirty = self._repainted
+		dirty.clear()
+		# Reuse the last key while its parts are unchanged (the theme key is cached)
+		theme_key = self._theme_key()
+		key = self._titlebar_key
+		if (key is None or key[3] is not theme_key or key[1] != w or
+		        key[2] != self.is_maximized or key[0] != self.title):
+			key = (self.title, w, self.is_maximized, theme_key)
+		surface = self._titlebar_surface
+		if (surface is None or key is not self._titlebar_key or
+		        len(states) != len(self._spare_states)):
+			if surface is None or surface.get_size() != (w, self.titlebar_height):
+				surface = self._titlebar_surface = pygame.Surface((w, self.titlebar_height))
+			self._render_titlebar(surface, w, rects, states)
+			dirty.append(surface.get_rect())
+		else:
+			# Only repaint buttons whose hover/press state changed (the
+			# previous states are in the spare list)
+			button_rects = layout.button_rects
+			previous = self._spare_states
+			for i in range(len(states)):
+				if previous[i] != states[i]:
+					rect = button_rects[i]
+					self._render_titlebar(surface, w, rects, states, clip=rect)
+					dirty.append(rect)
+		self._titlebar_key = key
+		self._titlebar_states = states
+		
+		pixels = 0
+		for rect in dirty:
+			self.screen.blit(surface, rect, rect)
+			pixels += rect.w * rect.h
+		self._titlebar_dirty_rects.extend(dirty)
+		self.titlebar_pixels_repainted = pixels
+		return rects
+	
+	def request_redraw(self) -> None:
+		"""
+		Ask for the window to be redrawn on the next loop iteration.
+		
+		Only needed with ``on_demand_redraw``; safe to call from any thread.
+		"""
+		if not self._redraw_requested:
+			self._redraw_requested = True
+			try:
+				pygame.event.post(pygame.event.Event(REDRAW_EVENT))
+			except pygame.error:
+				pass
+	
+	def set_animation_rate(self, fps: Optional[float]) -> None:
+		"""
+		Request continuous frames at a bounded rate while on-demand redraw is on.
+		
+		Use this while an animation is running or ``draw_content`` needs
+		continuous frames.
+		
+		Args:
+			fps: Frames per second (capped at target_fps), or None/0 to stop
+		"""
+		if fps:
+			if self.target_fps > 0:
+				fps = min(float(fps), self.target_fps)
+			self._animation_interval = 1.0 / float(fps)
+			self._next_animation_frame = time.perf_counter()
+			self.request_redraw()
+		else:
+			self._animation_interval = None
+	
+	def get_redraw_stats(self) -> Dict[str, float]:
+		"""
+		Get frame and CPU usage statistics for the current run() call.
+		
+		Returns:
+			Dict with frames, wall_seconds, cpu_seconds, frames_per_minute and cpu_percent
+		"""
+		if self._run_started is None:
+			return {'frames': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+			        'frames_per_minute': 0.0, 'cpu_percent': 0.0}
+		wall_start, cpu_start, frames_start = self._run_started
+		wall = max(1e-9, time.perf_counter() - wall_start)
+		cpu = time.process_time() - cpu_start
+		frames = self.frame_count - frames_start
+		return {
+			'frames': frames,
+			'wall_seconds': wall,
+			'cpu_seconds': cpu,
+			'frames_per_minute': frames * 60.0 / wall,
+			'cpu_percent': 100.0 * cpu / wall,
+		}
+	
+	def _frame_budget(self) -> float:
+		"""Time available per frame in seconds (one 60 fps frame when uncapped)."""
+		return 1.0 / (self.target_fps or MAX_FPS)
+	
+	def set_target_fps(self, fps: float) -> None:
+		"""
+		Change the frame rate of the main loop.
+		
+		Args:
+			fps: Target frames per second (0 = uncapped)
+		"""
+		self.target_fps = max(0.0, float(fps or 0))
+		if self.profiler is not None:
+			self.profiler.frame_budget_ns = int(self._frame_budget() * 1e9)
+	
+	def _is_paused(self) -> bool:
+		"""Whether the loop should currently stop rendering."""
+		state = self._window_state
+		if self.pause_when_hidden and (state['minimized'] or state['hidden']):
+			return True
+		return not state['focused'] and self.background_fps == 0
+	
+	def _effective_fps(self) -> float:
+		"""Frame rate the loop should run at right now (0 = uncapped)."""
+		if not self._window_state['focused'] and self.background_fps:
+			if self.target_fps > 0:
+				return min(self.target_fps, self.background_fps)
+			return self.background_fps
+		return self.target_fps
+	
+	def _set_window_state(self, key: str, value: bool) -> None:
+		"""Update the minimized/hidden/focused state, pausing or resuming rendering."""
+		was_paused = self._is_paused()
+		self._window_state[key] = value
+		paused = self._is_paused()
+		if paused and not was_paused:
+			self._paused_since = time.perf_counter()
+			self._pacing_stats['pauses'] += 1
+		elif was_paused and not paused:
+			if self._paused_since is not None:
+				self._pacing_stats['paused_seconds'] += time.perf_counter() - self._paused_since
+				self._paused_since = None
+			# The window contents may have been discarded while hidden
+			self._invalidate_titlebar()
+			self.request_redraw()
+	
+	def _handle_window_state(self, event: pygame.event.Event) -> bool:
+		"""
+		Track minimize/restore, show/hide and focus changes, and in-place window resizes.
+		
+		Returns:
+			True if the event was a window state event
+		"""
+		change = WINDOW_STATE_EVENTS.get(event.type)
+		if change is not None:
+			self._set_window_state(*change)
+			return True
+		if event.type == WINDOW_EXPOSED_EVENT:
+			self._invalidate_titlebar()
+			self._redraw_requested = True
+			return True
+		if event.type == WINDOW_SIZE_CHANGED_EVENT and self.backend.resizes_in_place:
+			self._window_size_changed()
+			return True
+		return False
+	
+	def _window_size_changed(self) -> None:
+		"""Pick up the resized window surface (in-place backends; also resizes by the window manager)."""
+		surface = pygame.display.get_surface()
+		if surface is None:
 			return
+		size = surface.get_size()
+		if surface is self.screen and size == (self.width, self.height):
+			return
+		self.screen = surface
+		self.width, self.height = size
+		self._invalidate_titlebar()
+		self._redraw_requested = True
+	
+	def _tick(self, clock: pygame.time.Clock) -> None:
+		"""Wait for the next frame according to the current frame rate and pacing mode."""
+		fps = self._effective_fps()
+		if fps <= 0:
+			clock.tick()
+		elif self.precise_pacing:
+			clock.tick_busy_loop(fps)
+		else:
+			clock.tick(fps)
+	
+	def _wait_while_paused(self) -> List[pygame.event.Event]:
+		"""
+		Block until an event arrives while rendering is paused.
+		
+		Returns:
+			The events received (possibly empty)
+		"""
+		event = pygame.event.wait(IDLE_TIMEOUT_MS)
+		if event.type == pygame.NOEVENT:
+			return []
+		return [event] + pygame.event.get()
+	
+	def _skip_overrun_content(self) -> bool:
+		"""Whether this frame skips draw_content because the previous one overran."""
+		if not (self.frame_budget_mode and self._frame_overran):
+			return False
+		self._frame_overran = False
+		self._pacing_stats['content_skipped'] += 1
+		return True
+	
+	def _can_skip_content_only(self) -> bool:
+		"""
+		Whether the titlebar can be redrawn while the previous content stays on screen.
+		
+		Only a retained titlebar leaves the content area alone; otherwise a
+		frame without content has to be skipped entirely.
+		"""
+		if self.retained_titlebar and self.compositor is None and not self._full_present:
+			return True
+		self._pacing_stats['frames_skipped'] += 1
+		self._redraw_requested = True
+		return False
+	
+	def get_pacing_stats(self) -> Dict:
+		"""
+		Get frame pacing and background throttling state.
+		
+		Returns:
+			Dict with target_fps, current_fps (0 when paused or uncapped), paused,
+			minimized, hidden, focused, pauses, paused_seconds, content_skipped
+			(frames drawn without draw_content) and frames_skipped (frames not
+			drawn at all) by frame_budget_mode
+		"""
+		paused = self._is_paused()
+		paused_seconds = self._pacing_stats['paused_seconds']
+		if self._paused_since is not None:
+			paused_seconds += time.perf_counter() - self._paused_since
+		return {
+			'target_fps': self.target_fps,
+			'current_fps': 0.0 if paused else self._effective_fps(),
+			'paused': paused,
+			'minimized': self._window_state['minimized'],
+			'hidden': self._window_state['hidden'],
+			'focused': self._window_state['focused'],
+			'pauses': self._pacing_stats['pauses'],
+			'paused_seconds': paused_seconds,
+			'content_skipped': self._pacing_stats['content_skipped'],
+			'frames_skipped': self._pacing_stats['frames_skipped'],
+		}
+	
+	def get_frame_stats(self) -> Dict:
+		"""
+		Get rolling per-phase frame timings (requires profile_frames).
+		
+		Phases are ``titlebar``, ``content``, ``hud``, ``present``, ``events``
+		and ``sleep`` (frame pacing or waiting for input). ``work`` is the
+		frame time excluding ``sleep``; a frame is dropped when its work
+		exceeds the frame budget.
 		
+		Returns:
+			Dict with frames, dropped_frames, fps, budget_ms, and p50/p95/p99/max
+			in ms for total, work and each phase (empty if profiling is off)
+		"""
+		if self.profiler is None:
+			return {}
+		return self.profiler.stats()
+	
+	def set_frame_callback(self, callback: Optional[Callable[[Dict], None]]) -> None:
+		"""
+		Set a function called after every frame with its timings.
+		
+		The callback receives a dict with the time of each phase, ``total`` and
+		``work`` in ms, plus ``frame`` (index) and ``dropped`` (bool). Setting a
+		callback turns profiling on.
+		
+		Args:
+			callback: Function to call, or None to remove it
+		"""
+		if self.profiler is None:
+			if callback is None:
+				return
+			self.profiler = FrameProfiler(self._frame_budget() * 1000.0)
+		self.profiler.callback = callback
+	
+	def track_allocations(self, frames: int = 120) -> None:
+		"""
+		Trace memory allocations of the next ``frames`` frames (debug mode).
+		
+		Blocks still allocated after the last frame (retained blocks) are
+		attributed to the titlebar (draw_titlebar), the content (viewport,
+		draw_content, layers and the HUD), present, or other work in the loop
+		such as event handling. A steady-state titlebar retains no blocks.
+		Short-lived allocations are reported per frame as transient bytes.
+		Tracing with tracemalloc slows frames down; results are available
+		from get_allocation_stats() once the frames have been drawn.
+		
+		Args:
+			frames: Number of frames to trace
+		"""
+		cls = type(self)
+		phases = (
+			('titlebar', (cls.draw_titlebar,)),
+			('present', (cls._present,)),
+			('content', (cls._render_frame, cls._render_frame_async, cls._composite_frame,
+			             cls._begin_frame, cls._end_frame)),
+		)
+		self.alloc_tracker = self._tracking = AllocationTracker(frames, phases)
+	
+	def get_allocation_stats(self) -> Dict:
+		"""
+		Get the results of track_allocations().
+		
+		Returns:
+			Dict with frames, done, transient_bytes_per_frame and
+			max_transient_bytes (None before Python 3.9) and, for 'titlebar',
+			'present', 'content' and 'other', the retained blocks_per_frame,
+			bytes_per_frame and the top allocation sites (the phases are only
+			there once tracking finished; empty if it was never started)
+		"""
+		if self.alloc_tracker is None:
+			return {}
+		return self.alloc_tracker.stats()
+	
+	def record_events(self, path: str) -> EventRecorder:
+		"""
+		Record the events the window receives to a trace file (JSONL).
+		
+		Every event drained by ``run()``/``run_async()`` or passed to
+		``handle_event()`` is written with the time it was received, plus a
+		header with the window geometry, so the trace can be replayed with
+		``eventtrace.replay_trace()``. Recording costs a few microseconds per
+		event; any previous recording is stopped first.
+		
+		Args:
+			path: Trace file to create (overwritten if it exists)
+		
+		Returns:
+			The recorder (see EventRecorder.events_recorded)
+		"""
+		self.stop_recording()
+		header = {
+			'width': self.width,
+			'height': self.height,
+			'titlebar_height': self._logical_titlebar_height,
+			'scale': self.scale,
+			'left_notch_width': self.left_notch_width,
+			'custom_buttons': len(self.custom_buttons),
+		}
+		self.event_recorder = EventRecorder(path, header, skip_types=(REDRAW_EVENT, CALLBACK_DONE_EVENT))
+		return self.event_recorder
+	
+	def stop_recording(self) -> int:
+		"""
+		Stop recording events and close the trace file.
+		
+		Returns:
+			Number of events recorded (0 if not recording)
+		"""
+		recorder = self.event_recorder
+		if recorder is None:
+			return 0
+		self.event_recorder = None
+		recorder.close()
+		return recorder.events_recorded
+	
+	def _hud_rect(self) -> pygame.Rect:
+		"""Where the performance HUD goes: the notch if it fits, else the bottom-right corner."""
+		if self.left_notch_width >= 60:
+			return pygame.Rect(0, 0, self.left_notch_width, self.titlebar_height)
+		w, h = self.screen.get_size()
+		hud_w, hud_h = 130, 40
+		return pygame.Rect(w - hud_w - 4, h - hud_h - 4, hud_w, hud_h)
+	
+	def _draw_perf_hud(self) -> None:
+		"""Draw FPS and a sparkline of recent frame work times."""
+		profiler = self.profiler
 		try:
-			start_x, start_y = self.resize_start_pos
-			start_w, start_h = self.resize_start_size
-			mouse_start_x, mouse_start_y = self.resize_mouse_start
-			dx = pos[0] - mouse_start_x
-			dy = pos[1] - mouse_start_y
-			x, y = start_x, start_y
-			w, h = start_w, start_h
+			rect = self._hud_rect()
+			in_notch = rect.top == 0
+			self.screen.fill(self.titlebar_color if in_notch else BG_COLOR, rect)
 			
-			# Get screen bounds
-			screen_width = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-			screen_height = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
+			# Re-render the FPS label only when the value changes
+			text = f"{profiler.fps():.0f} fps"
+			if text != self._hud_label[0]:
+				self._hud_label = (text, self.FONT.render(text, True, TITLE_CLIENT_TEXT))
+			label = self._hud_label[1]
+			self.screen.blit(label, (rect.left + 4, rect.top + 2))
 			
-			if self.resize_edge in ['left', 'topleft', 'bottomleft']:
-				new_width = start_w - dx
-				if new_width >= MIN_WINDOW_WIDTH and x + dx >= 0:
-					x = start_x + dx
-					w = new_width
-			if self.resize_edge in ['right', 'topright', 'bottomright']:
-				new_width = start_w + dx
-				if new_width >= MIN_WINDOW_WIDTH and x + new_width <= screen_width:
-					w = new_width
-			if self.resize_edge in ['top', 'topleft', 'topright']:
-				new_height = start_h - dy
-				if new_height >= MIN_WINDOW_HEIGHT and y + dy >= 0:
-					y = start_y + dy
-					h = new_height
-			if self.resize_edge in ['bottom', 'bottomleft', 'bottomright']:
-				new_height = start_h + dy
-				if new_height >= MIN_WINDOW_HEIGHT and y + new_height <= screen_height:
-					h = new_height
+			# Sparkline of frame work, scaled so the budget sits at mid-height
+			graph_top = rect.top + 4 + label.get_height()
+			graph_h = max(4, rect.bottom - 2 - graph_top)
+			samples = profiler.recent_work(rect.width - 8)
+			if len(samples) > 1:
+				scale = graph_h / (2.0 * profiler.frame_budget_ns)
+				bottom = graph_top + graph_h
+				budget_y = bottom - graph_h // 2
+				pygame.draw.line(self.screen, (90, 90, 90), (rect.left + 4, budget_y), (rect.right - 4, budget_y))
+				points = [
+					(rect.left + 4 + i, bottom - min(graph_h, int(value * scale)))
+					for i, value in enumerate(samples)
+				]
+				pygame.draw.lines(self.screen, (80, 200, 120), False, points)
 			
-			# Ensure minimum size
-			w = max(MIN_WINDOW_WIDTH, w)
-			h = max(MIN_WINDOW_HEIGHT, h)
-			
-			# Update window
-			win32gui.SetWindowPos(self.hwnd, 0, x, y, w, h, 0)
-			self.width = w
-			self.height = h
-			try:
-				pygame.display.set_mode((w, h), pygame.NOFRAME)
-			except pygame.error as e:
-				print(f"[easy_custom_titlebar] Warning: Failed to resize display: {e}")
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Resize failed: {e}")
-
-	def maximize_window(self) -> None:
-		"""Maximize or restore the window."""
-		if not self.hwnd:
-			return
+			if self.retained_titlebar:
+				self._titlebar_dirty_rects.append(rect)
+		except (pygame.error, AttributeError) as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to draw performance HUD: {e}")
+			self.perf_hud = False
+	
+	def set_scroll_viewport(self, viewport: Optional[ScrollViewport]) -> None:
+		"""
+		Show a virtualized scroll viewport in the content area.
 		
-		try:
-			if not self.is_maximized:
-				rect = win32gui.GetWindowRect(self.hwnd)
-				if rect:
-					self.original_size = (rect[2] - rect[0], rect[3] - rect[1])
-					self.original_pos = (rect[0], rect[1])
-				x, y = 0, 0
-				w = win32api.GetSystemMetrics(win32con.SM_CXSCREEN)
-				h = win32api.GetSystemMetrics(win32con.SM_CYSCREEN)
-				win32gui.SetWindowPos(self.hwnd, win32con.HWND_TOP, x, y, w, h, win32con.SWP_SHOWWINDOW)
-				self.width = w
-				self.height = h
-				try:
-					pygame.display.set_mode((w, h), pygame.NOFRAME)
-				except pygame.error as e:
-					print(f"[easy_custom_titlebar] Warning: Failed to maximize display: {e}")
-			else:
-				win32gui.SetWindowPos(
-					self.hwnd, win32con.HWND_TOP,
-					self.original_pos[0], self.original_pos[1],
-					self.original_size[0], self.original_size[1],
-					win32con.SWP_SHOWWINDOW
-				)
-				self.width = self.original_size[0]
-				self.height = self.original_size[1]
-				try:
-					pygame.display.set_mode(self.original_size, pygame.NOFRAME)
-				except pygame.error as e:
-					print(f"[easy_custom_titlebar] Warning: Failed to restore display: {e}")
-			self.is_maximized = not self.is_maximized
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Maximize/restore failed: {e}")
-
-	def minimize_window(self) -> None:
-		"""Minimize the window."""
-		if self.hwnd:
-			try:
-				win32gui.ShowWindow(self.hwnd, win32con.SW_MINIMIZE)
-			except Exception as e:
-				print(f"[easy_custom_titlebar] Warning: Minimize failed: {e}")
-
-	def close_window(self) -> None:
-		"""Close the window and clean up resources."""
-		self.running = False
-		if self.hwnd:
-			try:
-				win32gui.DestroyWindow(self.hwnd)
-			except Exception:
-				pass
-
-	def get_button_rects(self, window_width: int, x_offset: int = 0) -> Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect]:
+		run() draws the viewport below the titlebar before calling
+		``draw_content``, routes mouse wheel and scrolling keys to it and keeps
+		``scroll_y`` in sync with it. Scrolling is enabled even if
+		``enable_scroll`` is False.
+		
+		Args:
+			viewport: The viewport, or None to go back to plain scroll_y
 		"""
-		Calculate button rectangle positions.
+		self.scroll_viewport = viewport
+		if viewport is not None:
+			self.scroll_y = viewport.scroll_y
+		self._redraw_requested = True
+	
+	def invalidate(self, layer: str = 'content', rect: Optional[pygame.Rect] = None) -> None:
+		"""
+		Mark a region of a layer as changed (requires layered mode).
+		
+		Only invalidated regions are repainted and presented. In layered mode
+		``draw_content`` runs only for invalidated content regions, with the
+		surface clipped to the region.
 		
 		Args:
-			window_width: Width of the window area
-			x_offset: Horizontal offset for buttons
-			
-		Returns:
-			Tuple of (custom_rects, min_rect, max_rect, close_rect)
+			layer: 'background', 'content', 'overlays' or 'titlebar'
+			rect: Region in window coordinates (None for the whole layer)
+		"""
+		if layer == 'titlebar':
+			self._invalidate_titlebar()
+		elif self.compositor is not None:
+			if layer not in COMPOSITED_LAYERS:
+				raise ValueError(f"Unknown layer: {layer}")
+			self.compositor.invalidate(layer, rect)
+		self.request_redraw()
+	
+	def set_layer_painter(self, layer: str, painter: Optional[Callable]) -> None:
 		"""
-		top_y = 0
-		window_width = max(BUTTON_WIDTH * 3, int(window_width))
-		x_offset = int(x_offset)
+		Set the function that draws the background or overlays layer.
 		
-		# Standard buttons (always locked to the right)
-		close_x = window_width - BUTTON_WIDTH
-		close_rect = pygame.Rect(close_x + x_offset, top_y, BUTTON_WIDTH, self.titlebar_height)
+		Painters take (surface, width, height, scroll_y), like ``draw_content``,
+		and are called only for invalidated regions of their layer.
 		
-		max_x = close_x - PADDING - BUTTON_WIDTH
-		max_rect = pygame.Rect(max_x + x_offset, top_y, BUTTON_WIDTH, self.titlebar_height)
+		Args:
+			layer: 'background' or 'overlays'
+			painter: Layer painter, or None to clear the layer
+		"""
+		if self.compositor is None:
+			raise RuntimeError("Layer painters require layered=True")
+		if layer not in ('background', 'overlays'):
+			raise ValueError(f"Layer has no user painter: {layer}")
+		self.compositor.set_painter(layer, painter)
+		self.request_redraw()
+	
+	def _paint_content_layer(self, surface: pygame.Surface, w: int, h: int, scroll_y: float) -> None:
+		"""Content layer painter: the scroll viewport, then draw_content."""
+		if self.scroll_viewport is not None:
+			self.scroll_viewport.draw(surface, pygame.Rect(0, self.titlebar_height, w, h - self.titlebar_height))
+		if self._draw_content is not None:
+			self._draw_content(surface, w, h, scroll_y)
+	
+	def _composite_frame(self, w: int, h: int) -> None:
+		"""Titlebar plus layered content: repaint and present only what changed."""
+		compositor = self.compositor
+		profiler = self.profiler
+		tracking = self._tracking
+		if tracking is not None:
+			tracking.start_frame()
+		compositor.resize((w, h))
+		if self._full_present:
+			compositor.invalidate_all()
 		
-		min_x = max_x - PADDING - BUTTON_WIDTH
-		min_rect = pygame.Rect(min_x + x_offset, top_y, BUTTON_WIDTH, self.titlebar_height)
+		self.draw_titlebar()
+		if profiler is not None:
+			profiler.mark('titlebar')
 		
-		# Custom buttons
-		custom_rects = []
-		packed_index = 0
-		for btn in self.custom_buttons:
-			if not isinstance(btn, dict):
-				continue
-			if 'left' in btn and btn['left'] is not None:
-				try:
-					custom_x = x_offset + int(btn['left'])
-				except (ValueError, TypeError):
-					custom_x = min_x - (packed_index + 1) * (BUTTON_WIDTH + PADDING) + x_offset
-					packed_index += 1
-			else:
-				custom_x = min_x - (packed_index + 1) * (BUTTON_WIDTH + PADDING) + x_offset
-				packed_index += 1
-			custom_rects.append(pygame.Rect(custom_x, top_y, BUTTON_WIDTH, self.titlebar_height))
+		viewport = self.scroll_viewport
+		if viewport is not None:
+			if viewport.update():
+				self._redraw_requested = True
+			self.scroll_y = viewport.scroll_y
+		if self.scroll_y != self._composited_scroll:
+			self._composited_scroll = self.scroll_y
+			compositor.invalidate('content')
 		
-		return custom_rects, min_rect, max_rect, close_rect
-
-	def draw_titlebar(self) -> Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect]:
+		area = pygame.Rect(0, self.titlebar_height, w, h - self.titlebar_height)
+		rects = compositor.compose(self.screen, area, self.scroll_y)
+		self._titlebar_dirty_rects.extend(rects)
+		self.pixels_composited = compositor.pixels_composited + self.titlebar_pixels_repainted
+		if profiler is not None:
+			profiler.mark('content')
+		if self.late_input_poll:
+			self._late_input_poll()
+			if profiler is not None:
+				profiler.mark('events')
+		if profiler is not None and self.perf_hud:
+			self._draw_perf_hud()
+			profiler.mark('hud')
+		
+		self._present(False)
+		if profiler is not None:
+			profiler.mark('present')
+		self._end_tracked_frame()
+		self.frame_count += 1
+	
+	def _render_frame(self, draw_content: Optional[Callable]) -> bool:
 		"""
-		Draw the titlebar and all buttons.
+		Draw the titlebar and user content and present the frame.
 		
 		Returns:
-			Tuple of (custom_rects, min_rect, max_rect, close_rect)
+			False if the display is gone and the loop should stop
 		"""
 		try:
 			w, h = self.screen.get_size()
 		except (AttributeError, pygame.error):
-			return [], pygame.Rect(0, 0, 0, 0), pygame.Rect(0, 0, 0, 0), pygame.Rect(0, 0, 0, 0)
+			return False
 		
-		self.screen.fill(BG_COLOR)
+		self._redraw_requested = False
+		has_content = callable(draw_content)
+		if has_content and self._skip_overrun_content():
+			if not self._can_skip_content_only():
+				# Keep the previous frame on screen
+				return True
+			has_content = False
 		
-		# Draw left notch (transparent or BG_COLOR)
-		if self.left_notch_width > 0:
-			pygame.draw.rect(self.screen, BG_COLOR, (0, 0, self.left_notch_width, self.titlebar_height))
-			pygame.draw.rect(
-				self.screen, self.titlebar_color,
-				(self.left_notch_width, 0, w - self.left_notch_width, self.titlebar_height)
-			)
-			custom_rects, min_rect, max_rect, close_rect = self.get_button_rects(
-				w - self.left_notch_width, x_offset=self.left_notch_width
-			)
-		else:
-			pygame.draw.rect(self.screen, self.titlebar_color, (0, 0, w, self.titlebar_height))
-			custom_rects, min_rect, max_rect, close_rect = self.get_button_rects(w)
+		if self.compositor is not None:
+			self._draw_content = draw_content if callable(draw_content) else None
+			self._composite_frame(w, h)
+			return True
 		
-		# Draw title text
-		try:
-			title_surf = self.HEADER_FONT.render(self.title, True, TITLE_CLIENT_TEXT)
-			title_y = self.titlebar_height // 2 - title_surf.get_height() // 2 + TITLE_Y_OFFSET
-			title_x = PADDING * 2 + self.left_notch_width
-			# Ensure title doesn't overlap buttons
-			max_title_width = close_rect.x - title_x - PADDING
-			if title_surf.get_width() > max_title_width:
-				# Truncate title if too long
-				title_surf = self.HEADER_FONT.render(
-					self.title[:max(0, int(len(self.title) * max_title_width / title_surf.get_width()))] + "...",
-					True, TITLE_CLIENT_TEXT
-				)
-			self.screen.blit(title_surf, (title_x, title_y))
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Failed to render title: {e}")
+		content_drawn = self._begin_frame(w, h, has_content)
 		
-		mouse_pos = pygame.mouse.get_pos()
-		mouse_pressed = pygame.mouse.get_pressed()[0] if pygame.mouse.get_pressed() else False
+		# Draw user content
+		if has_content:
+			try:
+				draw_content(self.screen, w, h, self.scroll_y)
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Error in draw_content: {e}")
 		
-		def btn_bg(rect: pygame.Rect, kind: str) -> Tuple[int, int, int]:
-			"""Get button background color based on state."""
-			if not rect.collidepoint(mouse_pos):
-				return self.button_color if kind != 'close' else self.button_color
-			
-			if kind == 'close':
-				return self.close_button_hover_color if not mouse_pressed else self.close_button_color
-			elif kind == 'custom':
-				return self.button_hover_color
-			else:
-				return (80, 80, 80) if mouse_pressed else self.minmax_button_hover_color
-		
-		icon_sizes = {
-			'minimize': 12,
-			'maximize': 8,
-			'restore': 12,
-			'close': 13,
-			'custom': 18
-		}
-		icon_color = self.button_icon_color
+		self._end_frame(content_drawn)
+		return True
+	
+	def _begin_frame(self, w: int, h: int, has_content: bool) -> bool:
+		"""
+		Clear the frame and draw the titlebar and scroll viewport.
 		
-		# Draw custom buttons
-		for i, rect in enumerate(custom_rects):
-			if i >= len(self.custom_buttons):
-				continue
-			pygame.draw.rect(self.screen, btn_bg(rect, 'custom'), rect)
-			btn = self.custom_buttons[i]
-			if 'icon' in btn and btn['icon']:
-				try:
-					if os.path.exists(btn['icon']):
-						icon_img = pygame.image.load(btn['icon']).convert_alpha()
-						icon_img = pygame.transform.smoothscale(
-							icon_img, (icon_sizes['custom'], icon_sizes['custom'])
-						)
-						icon_rect = icon_img.get_rect(center=rect.center)
-						self.screen.blit(icon_img, icon_rect)
-				except Exception as e:
-					pass
-			elif 'label' in btn and btn['label']:
-				try:
-					font = pygame.font.SysFont(self.titlebar_font_family, 18, bold=True)
-					label_surf = font.render(str(btn['label']), True, (255, 255, 255))
-					label_rect = label_surf.get_rect(center=rect.center)
-					self.screen.blit(label_surf, label_rect)
-				except Exception:
-					pass
+		Args:
+			w: Screen width
+			h: Screen height
+			has_content: Whether draw_content will draw this frame
 		
-		# Draw standard buttons
-		try:
-			# Minimize button
-			pygame.draw.rect(self.screen, btn_bg(min_rect, 'minimize'), min_rect)
-			min_img = self.btn_imgs.get(f'minimize_{icon_color}')
-			if min_img:
-				min_icon = pygame.transform.smoothscale(
-					min_img, (icon_sizes['minimize'], icon_sizes['minimize'])
-				)
-				min_icon_rect = min_icon.get_rect(center=min_rect.center)
-				self.screen.blit(min_icon, min_icon_rect)
+		Returns:
+			Whether the content area is redrawn this frame
+		"""
+		if self._tracking is not None:
+			self._tracking.start_frame()
+		viewport = self.scroll_viewport
+		if self.retained_titlebar:
+			# The titlebar region is only touched when it changes (and the
+			# viewport covers the whole content area)
+			if self._full_present:
+				self.screen.fill(BG_COLOR)
+			elif has_content and viewport is None:
+				self.screen.fill(BG_COLOR, (0, self.titlebar_height, w, h - self.titlebar_height))
+		
+		# Draw titlebar
+		self.draw_titlebar()
+		if self.profiler is not None:
+			self.profiler.mark('titlebar')
+		
+		# Draw the scroll viewport (user content goes on top of it)
+		if viewport is not None:
+			moving = viewport.update()
+			viewport.draw(self.screen, pygame.Rect(0, self.titlebar_height, w, h - self.titlebar_height))
+			self.scroll_y = viewport.scroll_y
+			if moving:
+				# Keep frames coming until kinetic scrolling settles
+				self._redraw_requested = True
+			return True
+		return has_content
+	
+	def _end_frame(self, content_drawn: bool) -> None:
+		"""Draw the performance HUD and present the frame."""
+		profiler = self.profiler
+		if profiler is not None:
+			profiler.mark('content')
+		if self.late_input_poll:
+			self._late_input_poll()
+			if profiler is not None:
+				profiler.mark('events')
+		if profiler is not None and self.perf_hud:
+			self._draw_perf_hud()
+			profiler.mark('hud')
+		
+		self._present(content_drawn)
+		if profiler is not None:
+			profiler.mark('present')
+		self._end_tracked_frame()
+		self.frame_count += 1
+	
+	def _end_tracked_frame(self) -> None:
+		"""Count a tracked frame, and stop tracking after the last one."""
+		tracking = self._tracking
+		if tracking is not None and tracking.end_frame():
+			self._tracking = None
+	
+	def _wait_for_events(self) -> List[pygame.event.Event]:
+		"""
+		Block until an event arrives, a redraw is requested or an animation frame is due.
+		
+		Returns:
+			The events received (possibly empty)
+		"""
+		if self._redraw_requested:
+			return pygame.event.get()
+		
+		timeout = IDLE_TIMEOUT_MS
+		if self._animation_interval is not None:
+			remaining = self._next_animation_frame - time.perf_counter()
+			if remaining <= 0:
+				self._next_animation_frame = time.perf_counter() + self._animation_interval
+				self._redraw_requested = True
+				return pygame.event.get()
+			timeout = min(timeout, max(1, int(remaining * 1000)))
+		
+		event = pygame.event.wait(timeout)
+		if event.type == pygame.NOEVENT:
+			return []
+		self._redraw_requested = True
+		return [event] + pygame.event.get()
+	
+	def _track_pointer(self, event: pygame.event.Event) -> None:
+		"""Update the event-derived pointer state used for hover with input_first."""
+		etype = event.type
+		if etype == pygame.MOUSEMOTION:
+			self._pointer = (event.pos, bool(event.buttons[0]))
+		elif etype in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+			if event.button == 1:
+				self._pointer = (event.pos, etype == pygame.MOUSEBUTTONDOWN)
+		elif etype == WINDOW_LEAVE_EVENT:
+			self._pointer = ((-1, -1), False)
+	
+	def _stamp_input(self, events: List[pygame.event.Event]) -> None:
+		"""Note when events were received, for the event trace and input-to-present latency."""
+		if self.event_recorder is not None:
+			self.event_recorder.record_all(events)
+		if self.profiler is None or not events:
+			return
+		now = time.perf_counter_ns()
+		pending = self._unpresented_input
+		for event in events:
+			if event.type not in pending:
+				pending[event.type] = now
+	
+	def _record_input_latency(self) -> None:
+		"""Record the latency of every event type reflected by the frame just presented."""
+		now = time.perf_counter_ns()
+		for etype, received in self._unpresented_input.items():
+			samples = self._input_latency.get(etype)
+			if samples is None:
+				samples = self._input_latency[etype] = deque(maxlen=INPUT_LATENCY_HISTORY)
+			samples.append(now - received)
+		self._unpresented_input.clear()
+	
+	def _read_input(self, events: List[pygame.event.Event]) -> None:
+		"""Apply a batch of drained events, coalescing motion and pending resizes."""
+		self._stamp_input(events)
+		self._process_events(self._coalesce_motion(events))
+		if self.resizing and self.coalesce_resize:
+			self._flush_pending_resize()
+	
+	def _poll_input(self) -> None:
+		"""Drain and apply input for run(), blocking while paused or idle on demand."""
+		if self._is_paused():
+			events = self._wait_while_paused()
+		elif self.on_demand_redraw:
+			events = self._wait_for_events()
+			if self.profiler is not None:
+				# Time spent blocked waiting for input is idle time
+				self.profiler.mark('sleep')
+		else:
+			events = pygame.event.get()
+		self._read_input(events)
+	
+	def _poll_input_nowait(self) -> None:
+		"""Drain and apply input for run_async(), without blocking."""
+		events = pygame.event.get()
+		if events and self.on_demand_redraw:
+			self._redraw_requested = True
+		self._read_input(events)
+	
+	def _late_input_poll(self) -> None:
+		"""
+		Apply pointer motion that arrived while the frame was drawn, just before presenting.
+		
+		Only motion is taken from the queue (other events wait for the next
+		frame), and nothing is done during a live resize, so the frame being
+		presented keeps its size. The titlebar is refreshed for the new hover
+		state; in retained mode only the buttons whose state changed.
+		"""
+		if self.resizing:
+			return
+		events = pygame.event.get(pygame.MOUSEMOTION)
+		if not events:
+			return
+		self._stamp_input(events)
+		self._process_events(self._coalesce_motion(events))
+		if not self.running:
+			return
+		if self.retained_titlebar:
+			self.draw_titlebar()
+		else:
+			rects = self._get_layout().rects
+			states = self._button_states(rects)
+			self._titlebar_states = states
+			if states != self._spare_states:
+				self._render_titlebar(self.screen, self.width, rects, states)
+	
+	def get_input_latency_stats(self) -> Dict[str, Dict[str, float]]:
+		"""
+		Get input-to-present latency per event type (requires profile_frames).
+		
+		pygame events carry no timestamp, so an event is stamped when the loop
+		drains it from the queue; the latency runs from there to the present
+		of the first frame rendered after it was applied. Per frame, the
+		oldest event of each type is sampled.
+		
+		Returns:
+			Dict keyed by event name (e.g. 'MouseButtonDown') with count,
+			p50_ms, p95_ms, max_ms and within_frame (fraction presented within
+			one frame budget)
+		"""
+		budget_ns = self._frame_budget() * 1e9
+		result = {}
+		for etype, samples in self._input_latency.items():
+			values = sorted(samples)
+			result[pygame.event.event_name(etype)] = {
+				'count': len(values),
+				'p50_ms': _percentile(values, 50) / 1e6,
+				'p95_ms': _percentile(values, 95) / 1e6,
+				'max_ms': values[-1] / 1e6,
+				'within_frame': sum(1 for value in values if value <= budget_ns) / len(values),
+			}
+		return result
+	
+	def _process_events(self, events: List[pygame.event.Event]) -> None:
+		"""Apply a batch of events: window controls, button clicks and scrolling."""
+		for event in events:
+			if self.input_first:
+				self._track_pointer(event)
+			if event.type == pygame.QUIT:
+				self.running = False
+				return
+			if event.type == CALLBACK_DONE_EVENT:
+				self._finish_callback(event)
+				continue
+			if self._handle_window_state(event):
+				continue
 			
-			# Maximize/Restore button
-			pygame.draw.rect(self.screen, btn_bg(max_rect, 'maximize'), max_rect)
-			if not self.is_maximized:
-				max_img = self.btn_imgs.get(f'maximize_{icon_color}')
-				icon_key = 'maximize'
-			else:
-				max_img = self.btn_imgs.get(f'restore_{icon_color}')
-				icon_key = 'restore'
+			# Handle window controls (drag, resize, etc.)
+			if self._handle_event(event):
+				continue
 			
-			if max_img:
-				max_icon = pygame.transform.smoothscale(
-					max_img, (icon_sizes[icon_key], icon_sizes[icon_key])
-				)
-				max_icon_rect = max_icon.get_rect(center=max_rect.center)
-				self.screen.blit(max_icon, max_icon_rect)
+			# Handle button clicks
+			if event.type == pygame.MOUSEBUTTONDOWN:
+				if event.button == 1:
+					try:
+						region, target = self._get_layout().hit_test(event.pos, include_resize=False)
+						if target == 'close':
+							self.close_window()
+							return
+						elif target == 'maximize':
+							self.maximize_window()
+						elif target == 'minimize':
+							self.minimize_window()
+					except Exception as e:
+						print(f"[easy_custom_titlebar] Warning: Button click error: {e}")
 			
-			# Close button
-			pygame.draw.rect(self.screen, btn_bg(close_rect, 'close'), close_rect)
-			close_img = self.btn_imgs.get(f'close_{icon_color}')
-			if close_img:
-				close_icon = pygame.transform.smoothscale(
-					close_img, (icon_sizes['close'], icon_sizes['close'])
-				)
-				close_icon_rect = close_icon.get_rect(center=close_rect.center)
-				self.screen.blit(close_icon, close_icon_rect)
-		except Exception as e:
-			print(f"[easy_custom_titlebar] Warning: Failed to draw buttons: {e}")
-		
-		# Draw border if enabled
-		if self.titlebar_border:
-			try:
-				pygame.draw.line(
-					self.screen, self.titlebar_border_color,
-					(0, self.titlebar_height - 1), (w, self.titlebar_height - 1),
-					self.titlebar_border_thickness
-				)
-			except Exception:
-				pass
-		
-		return custom_rects, min_rect, max_rect, close_rect
-
+			# Handle scrolling
+			if self.scroll_viewport is not None:
+				if self.scroll_viewport.handle_event(event):
+					self.scroll_y = self.scroll_viewport.scroll_y
+			elif self.enable_scroll:
+				if event.type == pygame.MOUSEBUTTONDOWN:
+					if event.button == 4:  # Scroll up
+						self.scroll_y = max(0.0, self.scroll_y - SCROLL_STEP)
+					elif event.button == 5:  # Scroll down
+						self.scroll_y = self.scroll_y + SCROLL_STEP
+				elif event.type == pygame.KEYDOWN:
+					if event.key == pygame.K_UP:
+						self.scroll_y = max(0.0, self.scroll_y - SCROLL_STEP)
+					elif event.key == pygame.K_DOWN:
+						self.scroll_y = self.scroll_y + SCROLL_STEP
+	
 	def run(self, draw_content: Optional[Callable] = None) -> None:
 		"""
 		Run the main window loop.
 		
+		By default the window is redrawn at ``target_fps``. With
+		``on_demand_redraw`` the loop sleeps in ``pygame.event.wait`` and only
+		redraws when an event arrives, ``request_redraw()`` is called or an
+		animation rate is set. While the window is minimized or hidden (and
+		with ``background_fps=0``, unfocused) the loop blocks on input without
+		rendering until the window is restored.
+		
+		Input is read after presenting, so it shows up in the next frame. With
+		``input_first`` it is read (or, on demand, waited for) before rendering
+		instead, so each frame reflects all input received before it started.
+		
 		Args:
 			draw_content: Optional function to draw content below titlebar.
 				Should accept (screen, width, height, scroll_y) parameters.
 		"""
 		clock = pygame.time.Clock()
-		scroll_step = 10.0  # Pixels per scroll step
+		self._run_started = (time.perf_counter(), time.process_time(), self.frame_count)
 		
 		try:
 			while self.running:
-				try:
-					w, h = self.screen.get_size()
-				except (AttributeError, pygame.error):
-					break
-				
-				# Draw titlebar
-				custom_rects, min_btn, max_btn, close_btn = self.draw_titlebar()
+				# Read every frame: set_frame_callback() may enable profiling mid-run
+				profiler = self.profiler
+				if profiler is not None:
+					profiler.start_frame()
+				self._apply_commands()
+				if self.input_first:
+					# Apply input before rendering, so this frame reflects it
+					self._poll_input()
+					if not self.running:
+						break
+				if profiler is not None:
+					profiler.mark('events')
+				started = time.perf_counter()
+				rendered = False
+				paused = self._is_paused()
+				# A coalesced live resize presents its own stretched preview
+				previewing = self.resizing and self.coalesce_resize
+				if not paused and not previewing and (not self.on_demand_redraw or self._redraw_requested):
+					if not self._render_frame(draw_content):
+						break
+					rendered = True
+					# Measured before polling: waiting for input (on demand or
+					# paused) is idle time, not part of the frame
+					self._frame_overran = time.perf_counter() - started > self._frame_budget()
 				
-				# Draw user content
-				if draw_content and callable(draw_content):
-					try:
-						draw_content(self.screen, w, h, self.scroll_y)
-					except Exception as e:
-						print(f"[easy_custom_titlebar] Error in draw_content: {e}")
+				# Handle events
+				if not self.input_first:
+					self._poll_input()
+					if profiler is not None:
+						profiler.mark('events')
 				
-				pygame.display.flip()
+				if rendered or previewing:
+					self._tick(clock)
+					if profiler is not None:
+						profiler.mark('sleep')
+						profiler.end_frame()
+		except KeyboardInterrupt:
+			self.running = False
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Fatal error in main loop: {e}")
+			import traceback
+			traceback.print_exc()
+		finally:
+			self._cleanup()
+	
+	async def _render_frame_async(self, draw_content: Callable) -> bool:
+		"""
+		Like _render_frame, awaiting an async draw_content.
+		
+		Returns:
+			False if the display is gone and the loop should stop
+		"""
+		try:
+			w, h = self.screen.get_size()
+		except (AttributeError, pygame.error):
+			return False
+		
+		self._redraw_requested = False
+		if self._skip_overrun_content():
+			if not self._can_skip_content_only():
+				return True
+			self._end_frame(self._begin_frame(w, h, False))
+			return True
+		
+		content_drawn = self._begin_frame(w, h, True)
+		try:
+			await draw_content(self.screen, w, h, self.scroll_y)
+		except asyncio.CancelledError:
+			raise
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Error in draw_content: {e}")
+		self._end_frame(content_drawn)
+		return True
+	
+	async def run_async(self, draw_content: Optional[Callable] = None) -> None:
+		"""
+		Run the main window loop as an asyncio coroutine.
+		
+		Each iteration draws, pumps pygame events (before drawing with
+		``input_first``) and then awaits a frame pacer instead of sleeping in
+		``clock.tick``, so other tasks and I/O callbacks on the same event loop
+		run between frames. ``draw_content``
+		and custom button callbacks may be coroutine functions; async button
+		callbacks run as tasks and trigger a redraw when they finish.
+		
+		With ``on_demand_redraw`` the loop still wakes up at the frame rate to
+		poll for events (SDL cannot be awaited), but only redraws when needed.
+		While rendering is paused it polls every PAUSED_POLL_INTERVAL seconds.
+		``precise_pacing`` does not apply: frames are always paced by the
+		event loop.
+		
+		Args:
+			draw_content: Optional (async) function to draw content below titlebar.
+				Should accept (screen, width, height, scroll_y) parameters.
+		"""
+		async_draw = asyncio.iscoroutinefunction(draw_content)
+		if async_draw and self.compositor is not None:
+			raise ValueError("Layered mode paints regions synchronously; use a regular draw_content")
+		
+		pacer = FramePacer(self._effective_fps())
+		stats = self._async_stats
+		self._run_started = (time.perf_counter(), time.process_time(), self.frame_count)
+		
+		try:
+			while self.running:
+				resumed = time.perf_counter_ns()
+				# Read every frame: set_frame_callback() may enable profiling mid-run
+				profiler = self.profiler
+				if profiler is not None:
+					profiler.start_frame()
+				self._apply_commands()
+				if self.input_first:
+					self._poll_input_nowait()
+					if not self.running:
+						break
+				if profiler is not None:
+					profiler.mark('events')
+				rendered = False
+				paused = self._is_paused()
+				previewing = self.resizing and self.coalesce_resize
+				if self.on_demand_redraw and self._animation_interval is not None:
+					if time.perf_counter() >= self._next_animation_frame:
+						self._next_animation_frame = time.perf_counter() + self._animation_interval
+						self._redraw_requested = True
+				if not paused and not previewing and (not self.on_demand_redraw or self._redraw_requested):
+					if async_draw:
+						if not await self._render_frame_async(draw_content):
+							break
+					elif not self._render_frame(draw_content):
+						break
+					rendered = True
 				
 				# Handle events
-				for event in pygame.event.get():
-					if event.type == pygame.QUIT:
-						self.running = False
-						break
-					
-					# Handle window controls (drag, resize, etc.)
-					if self.handle_event(event):
-						continue
-					
-					# Handle button clicks
-					if event.type == pygame.MOUSEBUTTONDOWN:
-						if event.button == 1:
-							try:
-								mx, my = event.pos
-								if close_btn.collidepoint(mx, my):
-									self.close_window()
-									break
-								elif max_btn.collidepoint(mx, my):
-									self.maximize_window()
-								elif min_btn.collidepoint(mx, my):
-									self.minimize_window()
-							except Exception as e:
-								print(f"[easy_custom_titlebar] Warning: Button click error: {e}")
-					
-					# Handle scrolling
-					if self.enable_scroll:
-						if event.type == pygame.MOUSEBUTTONDOWN:
-							if event.button == 4:  # Scroll up
-								self.scroll_y = max(0.0, self.scroll_y - scroll_step)
-							elif event.button == 5:  # Scroll down
-								self.scroll_y = self.scroll_y + scroll_step
-						elif event.type == pygame.KEYDOWN:
-							if event.key == pygame.K_UP:
-								self.scroll_y = max(0.0, self.scroll_y - scroll_step)
-							elif event.key == pygame.K_DOWN:
-								self.scroll_y = self.scroll_y + scroll_step
+				if not self.input_first:
+					self._poll_input_nowait()
+					if profiler is not None:
+						profiler.mark('events')
 				
-				clock.tick(60)
+				# Time this iteration kept the event loop from running other callbacks
+				blocked = time.perf_counter_ns() - resumed
+				budget_ns = int(self._frame_budget() * 1e9)
+				self._loop_blocks.append(blocked)
+				stats['iterations'] += 1
+				if rendered:
+					self._frame_overran = blocked > budget_ns
+				if blocked > budget_ns:
+					stats['over_budget'] += 1
+				if blocked > stats['max_block_ns']:
+					stats['max_block_ns'] = blocked
+				
+				if self._is_paused():
+					await asyncio.sleep(PAUSED_POLL_INTERVAL)
+					continue
+				fps = self._effective_fps()
+				if fps != pacer.fps:
+					pacer.set_fps(fps)
+				await pacer.wait()
+				if profiler is not None and (rendered or previewing):
+					profiler.mark('sleep')
+					profiler.end_frame()
+		except asyncio.CancelledError:
+			self.running = False
+			raise
 		except KeyboardInterrupt:
 			self.running = False
 		except Exception as e:
@@ -893,12 +2944,47 @@ class CustomTitleBarWindow:
 			import traceback
 			traceback.print_exc()
 		finally:
+			for task in list(self._async_tasks):
+				task.cancel()
 			self._cleanup()
 	
+	def get_async_stats(self) -> Dict[str, float]:
+		"""
+		Get event-loop blocking statistics for run_async().
+		
+		Each loop iteration (draw, event handling) runs without yielding to
+		other tasks, except inside an async draw_content. The blocking time is
+		measured per iteration, so it is an upper bound on how long pending I/O
+		callbacks had to wait.
+		
+		Returns:
+			Dict with iterations, budget_ms, max_block_ms, p95_block_ms and
+			over_budget (iterations that blocked longer than one frame)
+		"""
+		blocks = sorted(self._loop_blocks)
+		p95 = blocks[int(round(0.95 * (len(blocks) - 1)))] if blocks else 0
+		return {
+			'iterations': self._async_stats['iterations'],
+			'budget_ms': self._frame_budget() * 1000.0,
+			'max_block_ms': self._async_stats['max_block_ns'] / 1e6,
+			'p95_block_ms': p95 / 1e6,
+			'over_budget': self._async_stats['over_budget'],
+		}
+	
 	def _cleanup(self) -> None:
 		"""Clean up resources."""
+		self.stop_recording()
+		if self._executor is not None:
+			# Running callbacks finish in the background; their results are dropped
+			self._executor.shutdown(wait=False)
+			self._executor = None
+		self._busy_buttons.clear()
 		try:
 			pygame.quit()
 		except Exception:
 			pass
+		# Fonts do not survive pygame.quit()
+		self.fonts.clear()
+		self._font = None
+		self._header_font = None
 		# Don't call sys.exit() here - let the caller handle it
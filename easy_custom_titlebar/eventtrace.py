@@ -0,0 +1,270 @@
+import json
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import pygame
+
+from .profiler import _percentile
+
+# Trace format version, written to the header line
+TRACE_VERSION = 1
+
+# Buffered event lines written per block
+FLUSH_EVERY = 256
+
+_SEPARATORS = (',', ':')
+_SIMPLE = (int, float, str, bool, type(None), tuple, list)
+
+TimedEvent = Tuple[float, pygame.event.Event]
+
+
+def _encode(attrs: Dict[str, Any]) -> Dict[str, Any]:
+	"""Keep the JSON-serializable event attributes (tuples become lists)."""
+	return {key: value for key, value in attrs.items() if isinstance(value, _SIMPLE)}
+
+
+def _decode(attrs: Dict[str, Any]) -> Dict[str, Any]:
+	"""Turn lists back into the tuples pygame uses for pos, rel and buttons."""
+	return {key: tuple(value) if isinstance(value, list) else value for key, value in attrs.items()}
+
+
+class EventRecorder:
+	"""
+	Streams pygame events with their receive times to a JSONL trace.
+	
+	The first line is a header (``trace`` version plus whatever the caller
+	passes, e.g. the window geometry). Every further line is one event as
+	``[t, type, attributes]``, with ``t`` in seconds since recording
+	started. Lines are buffered and written in blocks, so recording costs
+	one small ``json.dumps`` per event.
+	"""
+	
+	def __init__(
+		self,
+		path: str,
+		header: Optional[Dict[str, Any]] = None,
+		skip_types: Iterable[int] = (),
+		flush_every: int = FLUSH_EVERY
+	):
+		"""
+		Open the trace file and write the header.
+		
+		Args:
+			path: Trace file to create (overwritten if it exists)
+			header: Extra header fields (JSON-serializable)
+			skip_types: Event types that are not recorded
+			flush_every: Number of event lines buffered before they are written
+		"""
+		self.path = path
+		self.flush_every = max(1, int(flush_every))
+		self.skip_types = frozenset(skip_types) | {pygame.NOEVENT}
+		self.events_recorded = 0
+		self._lines: List[str] = []
+		self._file = open(path, "w", encoding="utf-8")
+		self._start = time.perf_counter()
+		fields = dict(header or {})
+		fields['trace'] = TRACE_VERSION
+		self._file.write(json.dumps(fields, separators=_SEPARATORS) + "\n")
+	
+	def record(self, event: pygame.event.Event, now: Optional[float] = None) -> None:
+		"""
+		Record one event.
+		
+		Args:
+			event: The event
+			now: Receive time (``time.perf_counter()``; defaults to now)
+		"""
+		if self._file is None or event.type in self.skip_types:
+			return
+		t = (time.perf_counter() if now is None else now) - self._start
+		self._lines.append(json.dumps([round(t, 6), event.type, _encode(event.dict)], separators=_SEPARATORS))
+		self.events_recorded += 1
+		if len(self._lines) >= self.flush_every:
+			self.flush()
+	
+	def record_all(self, events: Iterable[pygame.event.Event]) -> None:
+		"""Record a batch of events received together (they share one timestamp)."""
+		now = time.perf_counter()
+		for event in events:
+			self.record(event, now)
+	
+	def flush(self) -> None:
+		"""Write the buffered event lines."""
+		if self._lines and self._file is not None:
+			self._file.write("\n".join(self._lines) + "\n")
+			self._lines.clear()
+	
+	def close(self) -> None:
+		"""Write the remaining lines and close the file."""
+		if self._file is not None:
+			self.flush()
+			self._file.close()
+			self._file = None
+
+
+def load_trace(path: str) -> Tuple[Dict[str, Any], List[TimedEvent]]:
+	"""
+	Read a trace written by EventRecorder.
+	
+	Args:
+		path: Trace file
+	
+	Returns:
+		The header and the (time, event) pairs in recorded order
+	"""
+	with open(path, "r", encoding="utf-8") as fh:
+		header = json.loads(fh.readline() or "{}")
+		if header.get('trace') != TRACE_VERSION:
+			raise ValueError(f"Unsupported trace version in {path}: {header.get('trace')!r}")
+		events = []
+		for line in fh:
+			if line.strip():
+				t, etype, attrs = json.loads(line)
+				events.append((float(t), pygame.event.Event(int(etype), _decode(attrs))))
+	return header, events
+
+
+def _summary_us(samples: List[int]) -> Dict[str, float]:
+	"""p50/p95/max and total of nanosecond samples, in microseconds."""
+	values = sorted(samples)
+	return {
+		'count': len(values),
+		'p50_us': _percentile(values, 50) / 1000.0,
+		'p95_us': _percentile(values, 95) / 1000.0,
+		'max_us': values[-1] / 1000.0 if values else 0.0,
+		'total_us': sum(values) / 1000.0,
+	}
+
+
+def _batches(events: List[TimedEvent]) -> List[Tuple[float, List[pygame.event.Event]]]:
+	"""Group events recorded with the same timestamp (received together)."""
+	batches: List[Tuple[float, List[pygame.event.Event]]] = []
+	for t, event in events:
+		if batches and batches[-1][0] == t:
+			batches[-1][1].append(event)
+		else:
+			batches.append((t, [event]))
+	return batches
+
+
+def _apply_header(window, header: Dict[str, Any]) -> None:
+	"""
+	Give a window the geometry recorded in a trace header.
+	
+	Scale, titlebar height, left notch width and window size are changed
+	where they differ. Custom buttons cannot be recreated from the header,
+	so a different number of them is only reported.
+	"""
+	if 'scale' in header and float(header['scale']) != window.scale:
+		window.set_scale(float(header['scale']))
+	if ('titlebar_height' in header and
+	        int(header['titlebar_height']) != window._logical_titlebar_height):
+		window.set_titlebar_height(int(header['titlebar_height']))
+	if 'left_notch_width' in header:
+		notch = max(0, int(header['left_notch_width']))
+		if notch != window.left_notch_width:
+			window.left_notch_width = notch
+			window._invalidate_titlebar()
+	
+	size = (int(header.get('width', window.width)), int(header.get('height', window.height)))
+	if size != (window.width, window.height):
+		try:
+			rect = window.backend.get_window_rect(window.hwnd)
+			x, y = (rect[0], rect[1]) if rect else (0, 0)
+			window.backend.set_window_rect(window.hwnd, x, y, size[0], size[1])
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to resize window for trace: {e}")
+			return
+		window.width, window.height = size
+		window._reallocate_display(size)
+	
+	buttons = header.get('custom_buttons')
+	if buttons is not None and int(buttons) != len(window.custom_buttons):
+		print(f"[easy_custom_titlebar] Warning: Trace was recorded with {buttons} custom buttons, "
+		      f"the window has {len(window.custom_buttons)}; clicks may hit other buttons")
+
+
+def replay_trace(
+	window,
+	trace: Union[str, Tuple[Dict[str, Any], List[TimedEvent]]],
+	speed: Optional[float] = None,
+	render: bool = False,
+	coalesce: bool = True,
+	apply_header: bool = True
+) -> Dict[str, Any]:
+	"""
+	Feed a recorded trace into a window and time how it handles each event.
+	
+	Events go through the same handling as in ``run()`` (window controls,
+	button clicks, scrolling). Events recorded with the same timestamp were
+	received together and form a batch; like ``run()``, motion in a batch is
+	coalesced, and after each batch a pending coalesced resize is applied
+	and, with ``render``, a frame is drawn and presented. Replaying stops
+	early if the trace closes the window. Use a window on FakeWindowBackend
+	under the dummy video driver for deterministic runs.
+	
+	Recorded positions only mean the same thing at the recorded geometry,
+	so by default the header's size, scale, titlebar height and left notch
+	width are applied to the window first (a different number of custom
+	buttons is reported with a warning).
+	
+	Args:
+		window: CustomTitleBarWindow to drive
+		trace: Trace file, or a (header, events) pair from load_trace()
+		speed: Replay speed relative to the recording (1.0 = recorded speed),
+			or None to replay as fast as possible
+		render: Draw and present a frame after each batch
+		coalesce: Coalesce motion per batch (False handles every recorded event)
+		apply_header: Give the window the recorded geometry before replaying
+	
+	Returns:
+		Dict with events (handled), batches, duration_s, recorded_duration_s,
+		total_us (all handling), by_type (count, p50_us, p95_us, max_us and
+		total_us per event name) and, with render, frame_us
+	"""
+	header, events = load_trace(trace) if isinstance(trace, str) else trace
+	if apply_header:
+		_apply_header(window, header)
+	by_type: Dict[int, List[int]] = {}
+	frames: List[int] = []
+	batches = 0
+	start = time.perf_counter()
+	
+	for t, batch in _batches(events):
+		if not window.running:
+			break
+		if speed:
+			delay = start + t / speed - time.perf_counter()
+			if delay > 0:
+				time.sleep(delay)
+		batches += 1
+		if coalesce:
+			batch = window._coalesce_motion(batch)
+		for event in batch:
+			began = time.perf_counter_ns()
+			window._process_events([event])
+			elapsed = time.perf_counter_ns() - began
+			samples = by_type.get(event.type)
+			if samples is None:
+				samples = by_type[event.type] = []
+			samples.append(elapsed)
+			if not window.running:
+				break
+		if window.resizing and window.coalesce_resize:
+			window._flush_pending_resize()
+		if render and window.running:
+			began = time.perf_counter_ns()
+			window._render_frame(None)
+			frames.append(time.perf_counter_ns() - began)
+	
+	result: Dict[str, Any] = {
+		'events': sum(len(samples) for samples in by_type.values()),
+		'batches': batches,
+		'duration_s': time.perf_counter() - start,
+		'recorded_duration_s': events[-1][0] if events else 0.0,
+		'total_us': sum(sum(samples) for samples in by_type.values()) / 1000.0,
+		'by_type': {pygame.event.event_name(etype): _summary_us(samples) for etype, samples in by_type.items()},
+	}
+	if render:
+		result['frame_us'] = _summary_us(frames)
+	return result
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+# Maximum number of rendered label surfaces kept by the registry
+LABEL_CACHE_SIZE = 256
+
+FontKey = Tuple[str, int, bool, bool]
+
+
+class FontRegistry:
+	"""
+	Process-wide registry of fonts and rendered labels.
+	
+	Each (family, size, bold, italic) combination is resolved and opened once,
+	instead of going through a system font lookup every time it is needed.
+	Rendered label surfaces are cached per (text, font, color).
+	"""
+	
+	def __init__(self, max_labels: int = LABEL_CACHE_SIZE):
+		"""
+		Initialize the font registry.
+		
+		Args:
+			max_labels: Maximum number of rendered labels to keep (LRU)
+		"""
+		self.max_labels = max(0, int(max_labels))
+		self.font_hits = 0
+		self.font_misses = 0
+		self.label_hits = 0
+		self.label_misses = 0
+		self._fonts: Dict[FontKey, pygame.font.Font] = {}
+		self._labels: "OrderedDict[Tuple, pygame.Surface]" = OrderedDict()
+	
+	def get(self, family: str, size: int, bold: bool = False, italic: bool = False) -> pygame.font.Font:
+		"""
+		Get a font, opening it on first use.
+		
+		Args:
+			family: System font family name
+			size: Font size in pixels
+			bold: Use bold font
+			italic: Use italic font
+		
+		Returns:
+			The shared Font object (pygame's default font if the family fails to load)
+		"""
+		key = (str(family), int(size), bool(bold), bool(italic))
+		font = self._fonts.get(key)
+		if font is not None:
+			self.font_hits += 1
+			return font
+		
+		self.font_misses += 1
+		if not pygame.font.get_init():
+			pygame.font.init()
+		try:
+			font = pygame.font.SysFont(key[0], key[1], bold=key[2], italic=key[3])
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Warning: Failed to load font, using default: {e}")
+			font = pygame.font.Font(None, key[1])
+		self._fonts[key] = font
+		return font
+	
+	def render(
+		self,
+		text: str,
+		family: str,
+		size: int,
+		color: Tuple[int, int, int],
+		bold: bool = False,
+		italic: bool = False
+	) -> pygame.Surface:
+		"""
+		Render antialiased text, reusing a cached surface when possible.
+		
+		Args:
+			text: Text to render
+			family: System font family name
+			size: Font size in pixels
+			color: Text color (RGB tuple)
+			bold: Use bold font
+			italic: Use italic font
+		
+		Returns:
+			Rendered text surface (shared; do not draw onto it)
+		"""
+		key = (text, str(family), int(size), bool(bold), bool(italic), tuple(color))
+		surf = self._labels.get(key)
+		if surf is not None:
+			self._labels.move_to_end(key)
+			self.label_hits += 1
+			return surf
+		
+		self.label_misses += 1
+		surf = self.get(family, size, bold, italic).render(text, True, color)
+		if self.max_labels:
+			while len(self._labels) >= self.max_labels:
+				self._labels.popitem(last=False)
+			self._labels[key] = surf
+		return surf
+	
+	def clear(self) -> None:
+		"""Drop all fonts and labels (required after ``pygame.quit()``)."""
+		self._fonts.clear()
+		self._labels.clear()
+	
+	def stats(self) -> Dict[str, int]:
+		"""Get cache hit/miss counters."""
+		return {
+			'font_hits': self.font_hits,
+			'font_misses': self.font_misses,
+			'label_hits': self.label_hits,
+			'label_misses': self.label_misses,
+			'fonts': len(self._fonts),
+			'labels': len(self._labels),
+		}
+
+
+_shared_registry: Optional[FontRegistry] = None
+
+
+def get_font_registry() -> FontRegistry:
+	"""
+	Get the process-wide font registry shared by all windows.
+	
+	Returns:
+		The shared FontRegistry instance
+	"""
+	global _shared_registry
+	if _shared_registry is None:
+		_shared_registry = FontRegistry()
+	return _shared_registry
@@ -0,0 +1,208 @@
+import bisect
+from typing import List, Optional, Sequence, Tuple, Union
+
+import pygame
+
+# Hit-test regions
+HIT_CLIENT = 'client'
+HIT_RESIZE = 'resize'
+HIT_DRAG = 'drag'
+HIT_BUTTON = 'button'
+
+# Button targets are a custom button index or one of these names
+ButtonTarget = Union[int, str]
+ButtonRects = Tuple[List[pygame.Rect], pygame.Rect, pygame.Rect, pygame.Rect]
+
+
+def compute_button_rects(
+	window_width: int,
+	titlebar_height: int,
+	button_lefts: Sequence[Optional[object]],
+	button_width: int,
+	padding: int,
+	x_offset: int = 0
+) -> ButtonRects:
+	"""
+	Calculate button rectangle positions.
+	
+	Args:
+		window_width: Width of the window area
+		titlebar_height: Height of the titlebar (and buttons)
+		button_lefts: The ``left`` value of each custom button (None to pack it)
+		button_width: Width of every button
+		padding: Gap between packed buttons
+		x_offset: Horizontal offset for buttons
+	
+	Returns:
+		Tuple of (custom_rects, min_rect, max_rect, close_rect)
+	"""
+	top_y = 0
+	window_width = max(button_width * 3, int(window_width))
+	x_offset = int(x_offset)
+	
+	# Standard buttons (always locked to the right)
+	close_x = window_width - button_width
+	close_rect = pygame.Rect(close_x + x_offset, top_y, button_width, titlebar_height)
+	
+	max_x = close_x - padding - button_width
+	max_rect = pygame.Rect(max_x + x_offset, top_y, button_width, titlebar_height)
+	
+	min_x = max_x - padding - button_width
+	min_rect = pygame.Rect(min_x + x_offset, top_y, button_width, titlebar_height)
+	
+	# Custom buttons
+	custom_rects = []
+	packed_index = 0
+	for left in button_lefts:
+		custom_x = None
+		if left is not None:
+			try:
+				custom_x = x_offset + int(left)
+			except (ValueError, TypeError):
+				pass
+		if custom_x is None:
+			custom_x = min_x - (packed_index + 1) * (button_width + padding) + x_offset
+			packed_index += 1
+		custom_rects.append(pygame.Rect(custom_x, top_y, button_width, titlebar_height))
+	
+	return custom_rects, min_rect, max_rect, close_rect
+
+
+class TitlebarLayout:
+	"""
+	Precomputed titlebar geometry and hit-test index.
+	
+	A layout is built for one combination of window size, titlebar height,
+	notch width and button list, and is reused for both drawing and event
+	handling until one of those changes. Button hit-testing uses a sorted
+	interval index, so it stays logarithmic in the number of buttons.
+	"""
+	
+	def __init__(
+		self,
+		width: int,
+		height: int,
+		titlebar_height: int,
+		left_notch_width: int,
+		button_lefts: Sequence[Optional[object]],
+		resize_border: int,
+		button_width: int,
+		padding: int
+	):
+		"""
+		Build the layout.
+		
+		Args:
+			width: Window width in pixels
+			height: Window height in pixels
+			titlebar_height: Titlebar height in pixels
+			left_notch_width: Width of the left notch area
+			button_lefts: The ``left`` value of each custom button (None to pack it)
+			resize_border: Width of the resize border in pixels
+			button_width: Width of every titlebar button
+			padding: Gap between packed buttons
+		"""
+		self.width = int(width)
+		self.height = int(height)
+		self.titlebar_height = int(titlebar_height)
+		self.left_notch_width = int(left_notch_width)
+		self.resize_border = int(resize_border)
+		
+		if self.left_notch_width > 0:
+			self.rects = compute_button_rects(
+				self.width - self.left_notch_width, self.titlebar_height, button_lefts,
+				button_width, padding, x_offset=self.left_notch_width
+			)
+		else:
+			self.rects = compute_button_rects(
+				self.width, self.titlebar_height, button_lefts, button_width, padding
+			)
+		self.custom_rects, self.min_rect, self.max_rect, self.close_rect = self.rects
+		# Every button in drawing order (custom, minimize, maximize, close)
+		self.button_rects = list(self.custom_rects) + [self.min_rect, self.max_rect, self.close_rect]
+		
+		# Priority order matches event handling: custom buttons first, then standard ones
+		intervals: List[Tuple[int, int, ButtonTarget]] = [
+			(rect.left, rect.right, i) for i, rect in enumerate(self.custom_rects)
+		]
+		intervals.append((self.close_rect.left, self.close_rect.right, 'close'))
+		intervals.append((self.max_rect.left, self.max_rect.right, 'maximize'))
+		intervals.append((self.min_rect.left, self.min_rect.right, 'minimize'))
+		self._edges, self._targets = self._build_index(intervals)
+	
+	@staticmethod
+	def _build_index(intervals: List[Tuple[int, int, ButtonTarget]]) -> Tuple[List[int], List[Optional[ButtonTarget]]]:
+		"""
+		Flatten (possibly overlapping) intervals into sorted, disjoint segments.
+		
+		Returns:
+			Sorted segment edges and the winning target of each segment
+		"""
+		edges = sorted({x for left, right, _ in intervals if right > left for x in (left, right)})
+		targets: List[Optional[ButtonTarget]] = []
+		for start in edges[:-1]:
+			winner = None
+			for left, right, target in intervals:
+				if left <= start < right:
+					winner = target
+					break
+			targets.append(winner)
+		return edges, targets
+	
+	def button_at(self, x: int) -> Optional[ButtonTarget]:
+		"""
+		Get the button covering a titlebar x coordinate.
+		
+		Returns:
+			A custom button index, 'minimize', 'maximize', 'close' or None
+		"""
+		i = bisect.bisect_right(self._edges, x) - 1
+		if 0 <= i < len(self._targets):
+			return self._targets[i]
+		return None
+	
+	def resize_edge(self, pos: Tuple[int, int]) -> Optional[str]:
+		"""Get which resize edge a position is on, or None."""
+		x, y = pos
+		border = self.resize_border
+		if x < border:
+			if y < border:
+				return 'topleft'
+			elif y > self.height - border:
+				return 'bottomleft'
+			return 'left'
+		elif x > self.width - border:
+			if y < border:
+				return 'topright'
+			elif y > self.height - border:
+				return 'bottomright'
+			return 'right'
+		elif y < border:
+			return 'top'
+		elif y > self.height - border:
+			return 'bottom'
+		return None
+	
+	def hit_test(self, pos: Tuple[int, int], include_resize: bool = True) -> Tuple[str, Optional[Union[str, int]]]:
+		"""
+		Classify a window position.
+		
+		Args:
+			pos: Position in window coordinates
+			include_resize: Check the resize border first
+		
+		Returns:
+			(region, detail): (HIT_RESIZE, edge), (HIT_BUTTON, target),
+			(HIT_DRAG, None) or (HIT_CLIENT, None)
+		"""
+		if include_resize:
+			edge = self.resize_edge(pos)
+			if edge is not None:
+				return HIT_RESIZE, edge
+		x, y = pos
+		if 0 <= y < self.titlebar_height:
+			target = self.button_at(x)
+			if target is not None:
+				return HIT_BUTTON, target
+			return HIT_DRAG, None
+		return HIT_CLIENT, None
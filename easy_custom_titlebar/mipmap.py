@@ -0,0 +1,66 @@
+from typing import List, Tuple
+
+import pygame
+
+# Smallest level kept in a pyramid (px, shorter side)
+MIN_LEVEL_SIZE = 4
+
+
+class MipPyramid:
+	"""
+	Successively halved copies of an image, for cheap good-quality scaling.
+	
+	Level 0 is the source image; every further level is half the size of
+	the previous one, down to ``min_size``. ``scale()`` starts from the
+	smallest level that is still at least as large as the target, so a
+	resample never reduces by more than 2x (which ``smoothscale`` does
+	well) and never touches the full-size source for small targets.
+	"""
+	
+	def __init__(self, surface: pygame.Surface, min_size: int = MIN_LEVEL_SIZE):
+		"""
+		Build the pyramid.
+		
+		Args:
+			surface: Source image (level 0; not modified)
+			min_size: Stop halving once the shorter side would drop below this
+		"""
+		self.levels: List[pygame.Surface] = [surface]
+		width, height = surface.get_size()
+		while min(width, height) // 2 >= max(1, int(min_size)):
+			width, height = width // 2, height // 2
+			self.levels.append(pygame.transform.smoothscale(self.levels[-1], (width, height)))
+	
+	def level_for(self, size: Tuple[int, int]) -> pygame.Surface:
+		"""
+		Get the smallest level that is at least ``size`` in both dimensions.
+		
+		Args:
+			size: Target (width, height)
+		
+		Returns:
+			The chosen level (level 0 for targets larger than the source)
+		"""
+		chosen = self.levels[0]
+		for level in self.levels[1:]:
+			if level.get_width() < size[0] or level.get_height() < size[1]:
+				break
+			chosen = level
+		return chosen
+	
+	def scale(self, size: Tuple[int, int]) -> pygame.Surface:
+		"""
+		Get a new surface of the image at ``size``.
+		
+		Args:
+			size: Target (width, height)
+		
+		Returns:
+			A copy of a level if one matches exactly, otherwise the nearest
+			larger level smoothscaled to ``size``
+		"""
+		size = (max(1, int(size[0])), max(1, int(size[1])))
+		level = self.level_for(size)
+		if level.get_size() == size:
+			return level.copy()
+		return pygame.transform.smoothscale(level, size)
@@ -0,0 +1,106 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+import pygame
+
+from .custom_titlebar import TitlebarRenderer, TitlebarTheme
+from .layout import TitlebarLayout
+
+# Renderers kept by get_titlebar_renderer() (least recently used are dropped)
+MAX_RENDERERS = 16
+
+# Pointer position used when no button is hovered
+NO_POINTER = (-1, -1)
+
+HoverTarget = Union[None, str, int, Tuple[int, int]]
+
+_renderers: Dict[Tuple, TitlebarRenderer] = {}
+
+
+def get_titlebar_renderer(theme: Optional[TitlebarTheme] = None) -> TitlebarRenderer:
+	"""
+	Get the process-wide renderer for a theme, creating it on first use.
+	
+	Each renderer keeps its own scaled and tinted icons and rendered titles;
+	fonts, the icon atlas and custom button icons are shared by all of them.
+	
+	Args:
+		theme: Titlebar style (defaults to TitlebarTheme())
+	
+	Returns:
+		The renderer (shared; not thread-safe)
+	"""
+	if theme is None:
+		theme = TitlebarTheme()
+	key = theme.key()
+	renderer = _renderers.pop(key, None)
+	if renderer is None:
+		if len(_renderers) >= MAX_RENDERERS:
+			_renderers.pop(next(iter(_renderers)))
+		renderer = TitlebarRenderer(theme)
+	_renderers[key] = renderer
+	return renderer
+
+
+def _hover_position(layout: TitlebarLayout, hover: HoverTarget) -> Tuple[int, int]:
+	"""Get the pointer position that puts the hover target under the mouse."""
+	if hover is None:
+		return NO_POINTER
+	if isinstance(hover, (tuple, list)):
+		return int(hover[0]), int(hover[1])
+	if hover == 'minimize':
+		return layout.min_rect.center
+	if hover in ('maximize', 'restore'):
+		return layout.max_rect.center
+	if hover == 'close':
+		return layout.close_rect.center
+	if isinstance(hover, int) and 0 <= hover < len(layout.custom_rects):
+		return layout.custom_rects[hover].center
+	raise ValueError(f"Unknown hover target: {hover!r}")
+
+
+def render_titlebar(
+	surface: pygame.Surface,
+	width: Optional[int] = None,
+	theme: Optional[TitlebarTheme] = None,
+	title: str = "",
+	buttons: Optional[List[Dict]] = None,
+	hover: HoverTarget = None,
+	pressed: bool = False,
+	maximized: bool = False
+) -> TitlebarLayout:
+	"""
+	Draw a titlebar onto a surface without a window (thumbnails, docs, other apps).
+	
+	Works with any video driver, including ``SDL_VIDEODRIVER=dummy``, and
+	without ``pygame.display.set_mode``. Renderers are shared per theme, so
+	repeated calls reuse scaled icons, fonts and rendered titles.
+	
+	Args:
+		surface: Target surface; the titlebar is drawn at its top-left corner
+			(pass a subsurface to place it elsewhere)
+		width: Titlebar width (defaults to the surface width)
+		theme: Titlebar style (defaults to TitlebarTheme())
+		title: Title text
+		buttons: Custom button dictionaries (only 'icon', 'label' and 'left'
+			are used)
+		hover: Hovered button ('minimize', 'maximize', 'close' or a custom
+			button index), a pointer position, or None
+		pressed: Draw the hovered button pressed
+		maximized: Draw the restore icon instead of maximize
+	
+	Returns:
+		The layout of the rendered titlebar (button rects and hit-testing);
+		its height is ``layout.titlebar_height``
+	"""
+	renderer = get_titlebar_renderer(theme)
+	width = surface.get_width() if width is None else max(1, int(width))
+	buttons = buttons if buttons is not None else []
+	if buttons != renderer.custom_buttons:
+		renderer.set_custom_buttons(buttons)
+	renderer.title = str(title) if title else ""
+	renderer.is_maximized = bool(maximized)
+	
+	layout = renderer._get_layout(width, renderer.titlebar_height)
+	states = renderer._button_states_at(layout.rects, _hover_position(layout, hover), bool(pressed))
+	renderer._render_titlebar(surface, width, layout.rects, states)
+	return layout
@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class FramePacer:
+	"""
+	Fixed-rate frame pacer with an awaitable wait.
+	
+	Unlike ``pygame.time.Clock.tick`` it never blocks the thread:
+	``await pacer.wait()`` sleeps on the asyncio event loop until the next
+	frame is due, so other coroutines and I/O callbacks run in the meantime.
+	Deadlines advance by a fixed interval, so frame timing does not drift;
+	if the loop falls more than a frame behind, the schedule restarts from now
+	instead of rendering a burst of catch-up frames.
+	"""
+	
+	def __init__(self, fps: float):
+		"""
+		Initialize the pacer.
+		
+		Args:
+			fps: Target frames per second (0 = uncapped)
+		"""
+		self.fps = 0.0
+		self.interval = 0.0
+		self._next: Optional[float] = None
+		self.set_fps(fps)
+	
+	def set_fps(self, fps: float) -> None:
+		"""
+		Change the frame rate; the schedule restarts from the next call.
+		
+		Args:
+			fps: Target frames per second (0 = uncapped)
+		"""
+		self.fps = max(0.0, float(fps or 0))
+		self.interval = 1.0 / self.fps if self.fps > 0 else 0.0
+		self._next = None
+	
+	def delay(self) -> float:
+		"""
+		Get the time until the next frame is due and advance the schedule.
+		
+		Returns:
+			Seconds to wait (0 if the frame is already due)
+		"""
+		now = time.perf_counter()
+		if self._next is None or now - self._next > self.interval:
+			self._next = now
+		delay = max(0.0, self._next - now)
+		self._next += self.interval
+		return delay
+	
+	async def wait(self) -> None:
+		"""Yield to the event loop until the next frame is due (always yields at least once)."""
+		await asyncio.sleep(self.delay())
+	
+	def reset(self) -> None:
+		"""Restart the schedule from the next call."""
+		self._next = None
@@ -0,0 +1,149 @@
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+# Frame phases, in the order the main loop runs them
+PHASES = ('titlebar', 'content', 'hud', 'present', 'events', 'sleep')
+
+# Number of frames kept for the rolling statistics
+FRAME_HISTORY = 300
+
+
+def _percentile(sorted_values: List[int], pct: float) -> int:
+	"""Nearest-rank percentile of an already sorted list."""
+	if not sorted_values:
+		return 0
+	index = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+	return sorted_values[index]
+
+
+class FrameProfiler:
+	"""
+	Per-phase frame timer for the main loop.
+	
+	The loop calls ``start_frame()``, then ``mark(phase)`` after each phase
+	and ``end_frame()`` once the frame is done. Time since the previous mark
+	is added to the phase, so each mark costs a single ``perf_counter_ns``
+	call. Rolling statistics cover the last ``history`` frames.
+	
+	A frame counts as dropped when its work (everything except ``sleep``)
+	took longer than the frame budget.
+	"""
+	
+	def __init__(
+		self,
+		frame_budget_ms: float,
+		history: int = FRAME_HISTORY,
+		callback: Optional[Callable[[Dict[str, float]], None]] = None
+	):
+		"""
+		Initialize the profiler.
+		
+		Args:
+			frame_budget_ms: Time available per frame in milliseconds
+			history: Number of frames kept for the statistics
+			callback: Called after every frame with that frame's timings (ms)
+		"""
+		self.frame_budget_ns = int(frame_budget_ms * 1e6)
+		self.callback = callback
+		self.frames = 0
+		self.dropped_frames = 0
+		history = max(1, int(history))
+		self._totals: Deque[int] = deque(maxlen=history)
+		self._work: Deque[int] = deque(maxlen=history)
+		self._phases: Dict[str, Deque[int]] = {phase: deque(maxlen=history) for phase in PHASES}
+		self._current = dict.fromkeys(PHASES, 0)
+		self._frame_start = 0
+		self._last = 0
+	
+	def start_frame(self) -> None:
+		"""Start timing a new frame, discarding any unfinished one."""
+		self._frame_start = self._last = time.perf_counter_ns()
+		current = self._current
+		for phase in PHASES:
+			current[phase] = 0
+	
+	def mark(self, phase: str) -> None:
+		"""Charge the time since the previous mark to ``phase``."""
+		now = time.perf_counter_ns()
+		self._current[phase] += now - self._last
+		self._last = now
+	
+	def end_frame(self) -> None:
+		"""Record the current frame and notify the callback."""
+		total = time.perf_counter_ns() - self._frame_start
+		current = self._current
+		work = total - current['sleep']
+		self.frames += 1
+		dropped = work > self.frame_budget_ns
+		if dropped:
+			self.dropped_frames += 1
+		self._totals.append(total)
+		self._work.append(work)
+		for phase in PHASES:
+			self._phases[phase].append(current[phase])
+		
+		if self.callback is not None:
+			record = {phase: current[phase] / 1e6 for phase in PHASES}
+			record['frame'] = self.frames
+			record['total'] = total / 1e6
+			record['work'] = work / 1e6
+			record['dropped'] = dropped
+			try:
+				self.callback(record)
+			except Exception as e:
+				print(f"[easy_custom_titlebar] Error in frame callback: {e}")
+	
+	def recent_work(self, count: int) -> List[int]:
+		"""Get the work time (ns) of the last ``count`` frames, oldest first."""
+		work = self._work
+		if count >= len(work):
+			return list(work)
+		return list(work)[-count:]
+	
+	def fps(self) -> float:
+		"""Average frames per second over the recorded history."""
+		elapsed = sum(self._totals)
+		if not elapsed:
+			return 0.0
+		return len(self._totals) * 1e9 / elapsed
+	
+	@staticmethod
+	def _summary(values) -> Dict[str, float]:
+		"""Percentiles and max of a sequence of ns timings, in ms."""
+		ordered = sorted(values)
+		return {
+			'p50': _percentile(ordered, 50) / 1e6,
+			'p95': _percentile(ordered, 95) / 1e6,
+			'p99': _percentile(ordered, 99) / 1e6,
+			'max': (ordered[-1] if ordered else 0) / 1e6,
+		}
+	
+	def stats(self) -> Dict:
+		"""
+		Get rolling frame statistics.
+		
+		Returns:
+			Dict with frames, dropped_frames, fps, budget_ms, and p50/p95/p99/max
+			(ms) for ``total``, ``work`` and every phase
+		"""
+		result = {
+			'frames': self.frames,
+			'dropped_frames': self.dropped_frames,
+			'fps': self.fps(),
+			'budget_ms': self.frame_budget_ns / 1e6,
+			'total': self._summary(self._totals),
+			'work': self._summary(self._work),
+		}
+		for phase in PHASES:
+			result[phase] = self._summary(self._phases[phase])
+		return result
+	
+	def reset(self) -> None:
+		"""Clear all recorded frames."""
+		self.frames = 0
+		self.dropped_frames = 0
+		self._totals.clear()
+		self._work.clear()
+		for values in self._phases.values():
+			values.clear()
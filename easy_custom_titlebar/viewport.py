@@ -0,0 +1,269 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import pygame
+
+# Tile cache defaults
+TILE_HEIGHT = 256
+MAX_TILES = 12
+
+# Scrolling defaults
+WHEEL_STEP = 60.0  # Pixels per wheel notch
+KEY_STEP = 10.0  # Pixels per arrow key press
+KINETIC_DECAY = 0.12  # Time constant (s) of the kinetic velocity decay
+MIN_VELOCITY = 5.0  # Kinetic scrolling stops below this speed (px/s)
+
+TileRenderer = Callable[[pygame.Surface, int], None]
+
+
+class ScrollViewport:
+	"""
+	Virtualized vertical scroll area for tall content.
+	
+	The app declares the total content height and a ``draw_tile(surface, top)``
+	function that draws the content rows between ``top`` and
+	``top + surface.get_height()`` onto a tile, offset by ``-top``. Tiles are
+	rendered only when they scroll into view and are kept in a small LRU
+	cache, so scrolling just blits the visible tiles.
+	
+	``scroll_y`` is always clamped to the content bounds. Wheel input adds
+	velocity that decays over time (kinetic scrolling); call ``update()``
+	once per frame to advance it.
+	"""
+	
+	def __init__(
+		self,
+		content_height: int,
+		draw_tile: TileRenderer,
+		tile_height: int = TILE_HEIGHT,
+		max_tiles: int = MAX_TILES,
+		background: Tuple[int, int, int] = (30, 30, 30),
+		kinetic: bool = True,
+		wheel_step: float = WHEEL_STEP
+	):
+		"""
+		Initialize the viewport.
+		
+		Args:
+			content_height: Total height of the content in pixels
+			draw_tile: Function drawing content onto a tile: (surface, top)
+			tile_height: Height of each cached tile in pixels
+			max_tiles: Maximum number of rendered tiles kept (LRU)
+			background: Fill color of tiles and of the area below the content
+			kinetic: Smooth wheel scrolling with decaying velocity
+			wheel_step: Distance scrolled per wheel notch in pixels
+		"""
+		self.draw_tile = draw_tile
+		self.tile_height = max(16, int(tile_height))
+		self.max_tiles = max(1, int(max_tiles))
+		self.background = tuple(background)
+		self.kinetic = bool(kinetic)
+		self.wheel_step = float(wheel_step)
+		self.content_height = max(0, int(content_height))
+		self.view_height = 0
+		self.scroll_y = 0.0
+		self.velocity = 0.0
+		self.tiles_rendered = 0
+		self.tiles_blitted = 0
+		self._tiles: "OrderedDict[int, pygame.Surface]" = OrderedDict()
+		self._tile_width = 0
+		self._last_update: Optional[float] = None
+	
+	@property
+	def max_scroll(self) -> float:
+		"""Largest valid scroll offset for the current view height."""
+		return float(max(0, self.content_height - self.view_height))
+	
+	def _clamp(self) -> None:
+		"""Clamp scroll_y to the content bounds, stopping any motion at an edge."""
+		max_scroll = self.max_scroll
+		if self.scroll_y < 0.0:
+			self.scroll_y = 0.0
+			self.velocity = 0.0
+		elif self.scroll_y > max_scroll:
+			self.scroll_y = max_scroll
+			self.velocity = 0.0
+	
+	def set_content_height(self, content_height: int) -> None:
+		"""
+		Change the content height (e.g. after rows were appended).
+		
+		Tiles fully inside both the old and the new height are kept.
+		
+		Args:
+			content_height: New total height of the content in pixels
+		"""
+		content_height = max(0, int(content_height))
+		if content_height == self.content_height:
+			return
+		first_stale = min(self.content_height, content_height) // self.tile_height
+		for index in [i for i in self._tiles if i >= first_stale]:
+			del self._tiles[index]
+		self.content_height = content_height
+		self._clamp()
+	
+	def invalidate(self, top: int = 0, bottom: Optional[int] = None) -> None:
+		"""
+		Mark content as changed so the affected tiles are rendered again.
+		
+		Args:
+			top: First changed content row
+			bottom: End of the changed range (None for the end of the content)
+		"""
+		first = max(0, int(top)) // self.tile_height
+		last = None if bottom is None else max(0, int(bottom) - 1) // self.tile_height
+		for index in [i for i in self._tiles if i >= first and (last is None or i <= last)]:
+			del self._tiles[index]
+	
+	def scroll_to(self, y: float) -> None:
+		"""Jump to a scroll offset (clamped), stopping kinetic motion."""
+		self.velocity = 0.0
+		self.scroll_y = float(y)
+		self._clamp()
+	
+	def scroll_by(self, dy: float) -> None:
+		"""Scroll by ``dy`` pixels immediately (clamped)."""
+		self.scroll_to(self.scroll_y + dy)
+	
+	def scroll_wheel(self, notches: float) -> None:
+		"""
+		Apply wheel input.
+		
+		Args:
+			notches: Wheel movement, positive to scroll up; fractional values
+				from precise touchpads are supported
+		"""
+		distance = -float(notches) * self.wheel_step
+		if not self.kinetic:
+			self.scroll_by(distance)
+			return
+		# Exponential decay travels velocity * KINETIC_DECAY in total
+		self.velocity += distance / KINETIC_DECAY
+		self._last_update = time.perf_counter()
+	
+	def update(self, now: Optional[float] = None) -> bool:
+		"""
+		Advance kinetic scrolling to ``now``.
+		
+		Returns:
+			True while the viewport is still moving
+		"""
+		if now is None:
+			now = time.perf_counter()
+		last = self._last_update
+		self._last_update = now
+		if self.velocity == 0.0 or last is None:
+			return False
+		
+		dt = min(0.1, max(0.0, now - last))
+		decay = math.exp(-dt / KINETIC_DECAY)
+		# Distance covered while the velocity decays over dt
+		self.scroll_y += self.velocity * KINETIC_DECAY * (1.0 - decay)
+		self.velocity *= decay
+		if abs(self.velocity) < MIN_VELOCITY:
+			self.velocity = 0.0
+		self._clamp()
+		return self.velocity != 0.0
+	
+	def handle_event(self, event: pygame.event.Event) -> bool:
+		"""
+		Handle wheel and scrolling keys.
+		
+		Returns:
+			True if the event scrolled the viewport
+		"""
+		if event.type == pygame.MOUSEWHEEL:
+			notches = getattr(event, 'precise_y', event.y)
+			if getattr(event, 'flipped', False):
+				notches = -notches
+			self.scroll_wheel(notches)
+			return True
+		if event.type == pygame.KEYDOWN:
+			page = max(KEY_STEP, self.view_height - KEY_STEP)
+			steps = {
+				pygame.K_UP: -KEY_STEP,
+				pygame.K_DOWN: KEY_STEP,
+				pygame.K_PAGEUP: -page,
+				pygame.K_PAGEDOWN: page,
+			}
+			if event.key in steps:
+				self.scroll_by(steps[event.key])
+				return True
+			if event.key == pygame.K_HOME:
+				self.scroll_to(0)
+				return True
+			if event.key == pygame.K_END:
+				self.scroll_to(self.max_scroll)
+				return True
+		return False
+	
+	def _tile(self, index: int, width: int) -> pygame.Surface:
+		"""Get a rendered tile, rendering it if it is not cached."""
+		tile = self._tiles.get(index)
+		if tile is not None:
+			self._tiles.move_to_end(index)
+			return tile
+		
+		top = index * self.tile_height
+		height = min(self.tile_height, self.content_height - top)
+		tile = pygame.Surface((width, height))
+		tile.fill(self.background)
+		try:
+			self.draw_tile(tile, top)
+		except Exception as e:
+			print(f"[easy_custom_titlebar] Error in draw_tile: {e}")
+		self.tiles_rendered += 1
+		while len(self._tiles) >= self.max_tiles:
+			self._tiles.popitem(last=False)
+		self._tiles[index] = tile
+		return tile
+	
+	def draw(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
+		"""
+		Draw the visible part of the content into ``rect``.
+		
+		Args:
+			surface: Target surface (usually the screen)
+			rect: Area of the viewport on the target surface
+		"""
+		rect = pygame.Rect(rect)
+		if rect.width != self._tile_width:
+			self._tiles.clear()
+			self._tile_width = rect.width
+		if rect.height != self.view_height:
+			self.view_height = rect.height
+			self._clamp()
+		
+		offset = int(round(self.scroll_y))
+		blitted = 0
+		previous_clip = surface.get_clip()
+		surface.set_clip(rect.clip(previous_clip))
+		try:
+			if self.content_height > 0 and rect.height > 0:
+				first = offset // self.tile_height
+				last = (min(offset + rect.height, self.content_height) - 1) // self.tile_height
+				# Never evict a tile that is needed for this frame
+				self.max_tiles = max(self.max_tiles, last - first + 1)
+				for index in range(first, last + 1):
+					tile = self._tile(index, rect.width)
+					surface.blit(tile, (rect.left, rect.top + index * self.tile_height - offset))
+					blitted += 1
+			content_bottom = rect.top + self.content_height - offset
+			if content_bottom < rect.bottom:
+				surface.fill(self.background, (rect.left, content_bottom, rect.width, rect.bottom - content_bottom))
+		finally:
+			surface.set_clip(previous_clip)
+		self.tiles_blitted = blitted
+	
+	def stats(self) -> Dict[str, float]:
+		"""Get tile and scroll counters."""
+		return {
+			'scroll_y': self.scroll_y,
+			'max_scroll': self.max_scroll,
+			'velocity': self.velocity,
+			'tiles_cached': len(self._tiles),
+			'tiles_rendered': self.tiles_rendered,
+			'tiles_blitted': self.tiles_blitted,
+		}
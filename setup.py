@@ -17,7 +17,7 @@ setup(
     },
     install_requires=[
         "pygame",
-        "pywin32",
+        "pywin32; sys_platform == 'win32'",
     ],
     python_requires=">=3.7",
 ) 
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""Allocation tracking of steady-state frames (run headless under the SDL dummy driver)."""
+import os
+import tracemalloc
+import unittest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from easy_custom_titlebar import CustomTitleBarWindow, FakeWindowBackend
+
+# Frames drawn before tracking starts (fonts, icons and layout are built lazily)
+WARMUP_FRAMES = 5
+
+# Frames tracked per test
+TRACKED_FRAMES = 50
+
+# Short-lived memory a steady retained-mode frame may use: a few small
+# objects such as the screen size and mouse position pygame returns
+# (about 380 bytes with Python 3.11), independent of the button count
+MAX_TRANSIENT_BYTES = 512
+
+
+def draw_content(screen, width, height, scroll_y):
+	screen.fill((40, 40, 60), (20, 60, 200, 100))
+
+
+class SteadyFrameAllocationTest(unittest.TestCase):
+
+	def make_window(self, **kwargs) -> CustomTitleBarWindow:
+		buttons = [{'label': str(i), 'callback': lambda: None} for i in range(5)]
+		window = CustomTitleBarWindow(
+			width=1200, height=700, title="Allocations",
+			custom_buttons=buttons, backend=FakeWindowBackend(), **kwargs
+		)
+		for _ in range(WARMUP_FRAMES):
+			window._render_frame(draw_content)
+		return window
+
+	def track(self, window: CustomTitleBarWindow, frames: int = TRACKED_FRAMES) -> dict:
+		window.track_allocations(frames)
+		for _ in range(frames):
+			window._render_frame(draw_content)
+		stats = window.get_allocation_stats()
+		self.assertTrue(stats['done'])
+		self.assertEqual(stats['frames'], frames)
+		return stats
+
+	def test_retained_titlebar_retains_no_blocks(self):
+		stats = self.track(self.make_window(retained_titlebar=True))
+		self.assertEqual(stats['titlebar']['blocks_per_frame'], 0)
+		self.assertEqual(stats['titlebar']['top'], [])
+
+	def test_immediate_titlebar_retains_no_blocks_per_frame(self):
+		# Values replaced every frame (the repainted pixel count, the last
+		# cache lookup) leave the final frame's objects behind, but their
+		# number must not grow with the number of frames
+		window = self.make_window()
+		short = self.track(window, TRACKED_FRAMES)
+		long = self.track(window, 2 * TRACKED_FRAMES)
+		self.assertLessEqual(
+			long['titlebar']['blocks_per_frame'] * 2 * TRACKED_FRAMES,
+			short['titlebar']['blocks_per_frame'] * TRACKED_FRAMES
+		)
+
+	@unittest.skipUnless(hasattr(tracemalloc, 'reset_peak'), "needs Python 3.9+")
+	def test_retained_frame_transient_bytes_are_bounded(self):
+		stats = self.track(self.make_window(retained_titlebar=True))
+		self.assertLessEqual(stats['max_transient_bytes'], MAX_TRANSIENT_BYTES)
+
+	def test_theme_key_is_cached_until_the_theme_changes(self):
+		window = self.make_window(retained_titlebar=True)
+		key = window._theme_key()
+		window._render_frame(draw_content)
+		self.assertIs(window._theme_key(), key)
+
+		# Assigning a styling attribute is enough to repaint the titlebar
+		window.titlebar_color = (200, 0, 0)
+		window._render_frame(draw_content)
+		self.assertIsNot(window._theme_key(), key)
+		self.assertEqual(tuple(window.screen.get_at((300, 5)))[:3], (200, 0, 0))
+
+
+if __name__ == '__main__':
+	unittest.main()